@@ -0,0 +1,114 @@
+import multiprocessing
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+from django.conf import settings
+from legaldoc_ai.lazy import LazyEngine, warm_engines
+
+
+def _init_pool_process(engines: Optional[Tuple[str, ...]]):
+    """Set up a spawned pool process: configure Django and build the engines its tasks use."""
+    import django
+    django.setup()
+    if engines:
+        warm_engines(engines)
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        # Each pool process is one of the workers; more intra-op threads would oversubscribe the cores
+        torch.set_num_threads(1)
+
+
+class ClauseAnalysisExecutor:
+    """Runs clause analysis tasks serially, on a thread pool or on a process pool.
+
+    map() submits tasks as the caller's iterable produces them and yields their results in
+    submission order, with at most max_pending tasks in flight. The iterable and the loop over
+    the results both run on the calling thread, so tasks must not touch the database: the
+    caller stays the only writer.
+
+    The pool is created on first use and kept until shutdown(), so it serves every document
+    analyzed by the process. Process pools are spawned rather than forked, since the parent
+    already runs torch thread pools and possibly the generation thread; each pool process
+    builds the engines when it starts (unless warm is False) and uses one torch thread.
+    Process mode is refused when LLM generation is on, so that clauses from all callers are
+    batched by the one generation thread of the process.
+    """
+
+    MODES = ('serial', 'thread', 'process')
+    # Engines used by the analysis tasks
+    ENGINES = ('risk', 'rag', 'llm')
+
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 warm: bool = True):
+        """Defaults to settings.ANALYSIS_EXECUTOR and settings.ANALYSIS_WORKERS; one worker runs serially."""
+        mode = mode or settings.ANALYSIS_EXECUTOR
+        if mode not in self.MODES:
+            print(f"Unknown analysis executor '{mode}', analyzing serially")
+            mode = 'serial'
+        if mode == 'process' and settings.LLM_GENERATION:
+            print("The process analysis executor is not used with LLM generation; using a thread pool")
+            mode = 'thread'
+        self.workers = max(1, settings.ANALYSIS_WORKERS if workers is None else workers)
+        self.mode = mode if self.workers > 1 else 'serial'
+        # Two tasks per worker keeps every worker busy while the caller handles a finished one
+        self.max_pending = max_pending or 2 * self.workers
+        self.warm = warm
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.mode == 'thread':
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='clause-analysis')
+                else:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_pool_process, initargs=(self.ENGINES if self.warm else None,)
+                    )
+            return self._pool
+
+    def shutdown(self):
+        """Stop the pool; a later map() starts a new one."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self) -> 'ClauseAnalysisExecutor':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def map(self, fn: Callable[..., Any], tasks: Iterable[tuple]) -> Iterator[Any]:
+        """Yield fn(*task) for each task, in order."""
+        if self.mode == 'serial':
+            for task in tasks:
+                yield fn(*task)
+            return
+        pool = self._get_pool()
+        in_flight = deque()
+        try:
+            for task in tasks:
+                in_flight.append(pool.submit(fn, *task))
+                if len(in_flight) >= self.max_pending:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        except BrokenProcessPool:
+            # A pool process died; start a new pool for the next call
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+# Executor configured by ANALYSIS_EXECUTOR and ANALYSIS_WORKERS, shared by the analyses of the process
+analysis_executor = LazyEngine(ClauseAnalysisExecutor, 'analysis executor')
@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+
+from .explanation_rules import (
+	explanation_matcher, summary_matcher, extract_number, extract_amount, extract_location
+)
+
+# Bump when the features extracted from a clause change, so stored features are recomputed
+FEATURES_VERSION = 1
+
+
+def extract_clause_features(text: str) -> Dict[str, Any]:
+	"""Categories and details of a clause, extracted in one pass over its text.
+	Used by both the rule-based explanation and the document summary, and stored on the
+	clause analysis (JSON-serializable) so that reports do not read the clause text again.
+	Details are only extracted for clauses in a category that uses them.
+	"""
+	explanation = explanation_matcher.categories(text)
+	summary = summary_matcher.categories(text)
+	features = {
+		'version': FEATURES_VERSION,
+		'explanation_categories': sorted(explanation),
+		'summary_categories': sorted(summary),
+	}
+	if 'termination' in explanation and ({'with_notice', 'notice_termination'} & (explanation | summary)):
+		features['notice_period'] = extract_number(text, ["day", "week", "month"])
+	if {'confidentiality', 'non_compete'} & (explanation | summary):
+		features['duration'] = extract_number(text, ["year", "month"])
+	if 'payment' in explanation or 'payment' in summary:
+		features['amount'] = extract_amount(text)
+	if 'governing_law' in explanation or 'governing_law' in summary:
+		features['location'] = extract_location(text)
+	return features
+
+
+def is_current(features: Optional[Dict[str, Any]]) -> bool:
+	return bool(features) and features.get('version') == FEATURES_VERSION
+
+
+def features_of(text: str, features: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+	"""Stored features of a clause if they are current, otherwise features extracted from its text."""
+	if is_current(features):
+		return features
+	return extract_clause_features(text)
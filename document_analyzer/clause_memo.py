@@ -0,0 +1,85 @@
+import hashlib
+from itertools import groupby
+from typing import Dict, Any, Iterable
+from django.conf import settings
+from django.db.models import F, Q, Sum, Count
+from legal_classifier.risk_classifier import risk_model_version
+from .models import ClauseFingerprint
+
+# Bump when the analysis engines change in a way that should invalidate memoized results
+ANALYSIS_VERSION = 1
+
+MEMO_FIELDS = ('simplified_explanation', 'risk_level', 'risk_explanation', 'keywords', 'context_sources')
+
+
+def normalize_clause_text(text: str) -> str:
+    """Collapse whitespace so layout differences between PDFs do not change the fingerprint."""
+    return " ".join(text.split())
+
+
+def clause_fingerprint(text: str) -> str:
+    return hashlib.sha256(normalize_clause_text(text).encode('utf-8')).hexdigest()
+
+
+def model_key() -> str:
+    """Key of the models and rules that produced a memoized result."""
+    parts = [
+        f"analysis={ANALYSIS_VERSION}",
+        f"llm={settings.LLM_MODEL}",
+        f"embedding={settings.EMBEDDING_MODEL}",
+        f"risk={risk_model_version()}",
+    ]
+    # Generated explanations differ from the rule-based ones
+    if settings.LLM_GENERATION:
+        parts.append("explanations=generated")
+    return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+
+def lookup(fingerprints: Iterable[str], key: str) -> Dict[str, Dict[str, Any]]:
+    """Fetch memoized results for the given fingerprints in one query."""
+    rows = ClauseFingerprint.objects.filter(fingerprint__in=set(fingerprints), model_key=key)
+    return {
+        row.fingerprint: {field: getattr(row, field) for field in MEMO_FIELDS}
+        for row in rows
+    }
+
+
+def record_hits(hits: Dict[str, int], key: str):
+    """Add hit counts, issuing one UPDATE per distinct count rather than per fingerprint."""
+    by_count = sorted(hits.items(), key=lambda item: item[1])
+    for count, items in groupby(by_count, key=lambda item: item[1]):
+        ClauseFingerprint.objects.filter(
+            fingerprint__in=[fingerprint for fingerprint, _ in items], model_key=key
+        ).update(hit_count=F('hit_count') + count)
+
+
+def store(results: Dict[str, Dict[str, Any]], key: str):
+    """Memoize the deterministic outputs of clause analyses, keyed by fingerprint, in bulk."""
+    # ignore_conflicts tolerates another worker storing the same clause concurrently
+    ClauseFingerprint.objects.bulk_create([
+        ClauseFingerprint(
+            fingerprint=fingerprint,
+            model_key=key,
+            **{field: result[field] for field in MEMO_FIELDS}
+        )
+        for fingerprint, result in results.items()
+    ], batch_size=settings.ANALYSIS_BULK_BATCH_SIZE, ignore_conflicts=True)
+
+
+def memo_stats() -> Dict[str, Any]:
+    """Hit rates of the clause memo table for the current model key."""
+    totals = ClauseFingerprint.objects.filter(model_key=model_key()).aggregate(
+        entries=Count('id'),
+        hits=Sum('hit_count'),
+        reused_entries=Count('id', filter=Q(hit_count__gt=0))
+    )
+    hits = totals['hits'] or 0
+    # Every entry was created by exactly one miss
+    lookups = hits + totals['entries']
+    return {
+        'entries': totals['entries'],
+        'reused_entries': totals['reused_entries'],
+        'hits': hits,
+        'misses': totals['entries'],
+        'hit_rate': hits / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,50 @@
+import re
+from typing import List, Dict, Any
+
+# Clause headings, matched in a single scan at the start of a line.
+# Lettered subclauses may also start inline after a colon or semicolon.
+HEADING_PATTERN = re.compile(r"""
+    (?:^[ \t]*|(?<=[:;])[ \t]+)
+    (?:
+        ARTICLE\s+[IVXLC]+\.\s          # Article headers: "ARTICLE I. DEFINITIONS."
+      | Section\s+\d+(?:\.\d+)*\.?\s    # Section headers: "Section 1. Term."
+      | \d+(?:\.\d+)*\.\s+(?=[A-Z])     # Numbered sections: "1. TERM." or "4.2. Fees"
+      | \([a-z]\)\s                     # Lettered clauses: "(a) This is a clause."
+    )
+""", re.MULTILINE | re.VERBOSE)
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def _segment(text: str, start: int, end: int) -> Dict[str, Any]:
+    """Trim surrounding whitespace from text[start:end], keeping the offsets in sync."""
+    raw = text[start:end]
+    stripped = raw.strip()
+    start += len(raw) - len(raw.lstrip())
+    return {'text': stripped, 'start': start, 'end': start + len(stripped)}
+
+
+def segment_clauses(text: str) -> List[Dict[str, Any]]:
+    """Split text into non-overlapping clauses in document order.
+    Each clause runs from its heading to the next heading. Returns dicts with
+    'text', 'start' and 'end' (offsets into text); empty if no headings are found.
+    """
+    starts = [match.start() for match in HEADING_PATTERN.finditer(text)]
+    segments = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        segment = _segment(text, start, end)
+        if segment['text']:
+            segments.append(segment)
+    return segments
+
+
+def segment_paragraphs(text: str, min_length: int = 50) -> List[Dict[str, Any]]:
+    """Split text on blank lines, keeping only substantial paragraphs."""
+    segments = []
+    start = 0
+    for separator in PARAGRAPH_BREAK.finditer(text):
+        segments.append(_segment(text, start, separator.start()))
+        start = separator.end()
+    segments.append(_segment(text, start, len(text)))
+    return [s for s in segments if len(s['text']) > min_length]
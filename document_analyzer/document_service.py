@@ -1,37 +1,148 @@
-from .models import Document, Clause, ClauseAnalysis, AnalysisReport
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from .models import Document, Clause, ClauseAnalysis, AnalysisReport, ReportSection
 from .pdf_processor import process_document
-from .llm_processor import explain_legal_clause, summarize_legal_document
-from rag_pipeline.rag_processor import get_legal_context_for_clause
-from legal_classifier.risk_classifier import classify_clause_risk
-from typing import Dict, Any
+from .analysis_executor import ClauseAnalysisExecutor, analysis_executor
+from .clause_features import FEATURES_VERSION, extract_clause_features, features_of, is_current
+from .llm_processor import explain_legal_clause, explain_legal_clauses
+from rag_pipeline.rag_processor import get_legal_context_for_clauses
+from legal_classifier.risk_classifier import classify_clause_risk, classify_clauses_risk, risk_model_version
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Callable, Tuple
+from . import clause_memo, risk_stats, summary_sections
 
 class DocumentService:
     """Service for processing and analyzing legal documents."""
     
+    # Clauses analyzed per batch in analyze_document; progress is reported after each batch
+    analysis_chunk_size = 50
+    
+    @staticmethod
+    def find_duplicate(document: Document) -> Optional[Document]:
+        """Find an already processed document with byte-identical content."""
+        if not document.content_hash:
+            return None
+        return (
+            Document.objects
+            .filter(content_hash=document.content_hash, processed=True)
+            .exclude(pk=document.pk)
+            .annotate(clause_count=Count('clauses'))
+            .filter(clause_count__gt=0)
+            .order_by('-uploaded_at')
+            .first()
+        )
+    
+    @staticmethod
+    @transaction.atomic
+    def clone_document_results(source: Document, target: Document) -> list:
+        """Copy clauses, analyses and the report of source onto target with bulk inserts."""
+        source_clauses = list(source.clauses.select_related('analysis').order_by('position'))
+        clauses = Clause.objects.bulk_create([
+            Clause(
+                document=target,
+                text=c.text,
+                page_number=c.page_number,
+                position=c.position
+            )
+            for c in source_clauses
+        ])
+        
+        analyses = []
+        for source_clause, clause in zip(source_clauses, clauses):
+            try:
+                analysis = source_clause.analysis
+            except ClauseAnalysis.DoesNotExist:
+                continue
+            analyses.append(ClauseAnalysis(
+                clause=clause,
+                simplified_explanation=analysis.simplified_explanation,
+                risk_level=analysis.risk_level,
+                risk_explanation=analysis.risk_explanation,
+                keywords=analysis.keywords,
+                model_version=analysis.model_version,
+                features=analysis.features,
+                in_report=analysis.in_report
+            ))
+        ClauseAnalysis.objects.bulk_create(analyses)
+        
+        try:
+            report = source.report
+            cloned_report = AnalysisReport.objects.create(
+                document=target,
+                summary=report.summary,
+                risk_score=report.risk_score,
+                sections_version=report.sections_version,
+                **{field: getattr(report, field) for field in risk_stats.COUNT_FIELDS}
+            )
+            # Clause positions are the same, so the summary sections carry over as they are
+            ReportSection.objects.bulk_create([
+                ReportSection(report=cloned_report, key=section.key, clauses=section.clauses, text=section.text)
+                for section in report.sections.all()
+            ])
+        except AnalysisReport.DoesNotExist:
+            pass
+        
+        target.processed = True
+        target.save()
+        return clauses
+    
+    @staticmethod
+    @transaction.atomic
+    def _save_clauses(document: Document, extracted_clauses: List[Dict[str, Any]]) -> List[Clause]:
+        """Insert the extracted clauses in batches and mark the document as processed, in one transaction."""
+        clauses = Clause.objects.bulk_create([
+            Clause(
+                document=document,
+                text=clause_data['text'],
+                page_number=clause_data['page_number'],
+                position=clause_data['position']
+            )
+            for clause_data in extracted_clauses
+        ], batch_size=settings.ANALYSIS_BULK_BATCH_SIZE)
+        document.processed = True
+        document.save()
+        return clauses
+    
     @staticmethod
     def process_document(document_id: int) -> Dict[str, Any]:
-        """Process a document and extract clauses."""
+        """Process a document and extract clauses.
+        Byte-identical re-uploads reuse the results of the earlier document instead of being parsed again.
+        A document that was already processed keeps its clauses and is not parsed again.
+        """
         try:
             # Get the document
             document = Document.objects.get(pk=document_id)
             
+            if document.processed:
+                clauses = list(document.clauses.order_by('position').only('id', 'position'))
+                return {
+                    'success': True,
+                    'message': f'Document was already processed into {len(clauses)} clauses.',
+                    'document_id': document_id,
+                    'clauses': [{'id': c.id, 'position': c.position} for c in clauses]
+                }
+            
+            if not document.content_hash:
+                document.content_hash = document.compute_content_hash()
+                document.save(update_fields=['content_hash'])
+            
+            duplicate = DocumentService.find_duplicate(document)
+            if duplicate is not None:
+                clauses = DocumentService.clone_document_results(duplicate, document)
+                return {
+                    'success': True,
+                    'message': f'Reused results of identical document {duplicate.id} for {len(clauses)} clauses.',
+                    'document_id': document_id,
+                    'cloned_from': duplicate.id,
+                    'clauses': [{'id': c.id, 'position': c.position} for c in clauses]
+                }
+            
             # Process the document to extract clauses
             extracted_clauses = process_document(document)
             
-            # Save the extracted clauses
-            clauses = []
-            for clause_data in extracted_clauses:
-                clause = Clause.objects.create(
-                    document=document,
-                    text=clause_data['text'],
-                    page_number=clause_data['page_number'],
-                    position=clause_data['position']
-                )
-                clauses.append(clause)
-            
-            # Mark the document as processed
-            document.processed = True
-            document.save()
+            # Save the extracted clauses and mark the document as processed
+            clauses = DocumentService._save_clauses(document, extracted_clauses)
             
             return {
                 'success': True,
@@ -51,38 +162,201 @@ class DocumentService:
             }
     
     @staticmethod
-    def analyze_clause(clause_id: int) -> Dict[str, Any]:
-        """Analyze a clause using LLM, RAG, and risk classification."""
+    def _run_engines(clause_text: str, legal_context: Dict[str, Any], risk_analysis: Optional[Dict[str, Any]] = None,
+                     explanation: Optional[str] = None) -> Dict[str, Any]:
+        """Run risk classification and explanation for a clause.
+        A risk classification and explanation computed in advance (e.g. in a batch) can be passed in.
+        """
+        # Classify risk
+        if risk_analysis is None:
+            risk_analysis = classify_clause_risk(clause_text)
+        
+        # Generate explanation
+        if explanation is None:
+            explanation = explain_legal_clause(clause_text, legal_context)
+        
+        return {
+            'simplified_explanation': explanation,
+            'risk_level': risk_analysis['risk_level'],
+            'risk_explanation': risk_analysis['explanation'],
+            'keywords': risk_analysis['keywords'],
+            'context_sources': legal_context.get('sources', [])
+        }
+    
+    @staticmethod
+    def _compute_results(texts: List[str], legal_contexts: List[Optional[Dict[str, Any]]],
+                         features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run the engines on a batch of clauses; RAG retrieval, risk classification and explanation run in one batch each.
+        Clauses without a legal context (None) get theirs retrieved. Touches no database.
+        """
+        legal_contexts = list(legal_contexts)
+        need_context = [i for i, context in enumerate(legal_contexts) if context is None]
+        for i, context in zip(need_context, get_legal_context_for_clauses([texts[i] for i in need_context])):
+            legal_contexts[i] = context
+        risk_analyses = classify_clauses_risk(texts)
+        explanations = explain_legal_clauses(texts, legal_contexts, features)
+        return [
+            DocumentService._run_engines(text, legal_context, risk_analysis, explanation)
+            for text, legal_context, risk_analysis, explanation in zip(texts, legal_contexts, risk_analyses, explanations)
+        ]
+    
+    @staticmethod
+    def _analyses_for(clauses: List[Clause], fingerprints: List[str], features: List[Dict[str, Any]],
+                      results: Dict[str, Dict[str, Any]]) -> List[ClauseAnalysis]:
+        """Unsaved ClauseAnalysis objects of the clauses that have a result."""
+        # The memo key includes the risk model version, so reused results come from the current model too
+        model_version = risk_model_version()
+        return [
+            ClauseAnalysis(
+                clause=clause,
+                simplified_explanation=results[fingerprint]['simplified_explanation'],
+                risk_level=results[fingerprint]['risk_level'],
+                risk_explanation=results[fingerprint]['risk_explanation'],
+                keywords=results[fingerprint]['keywords'],
+                model_version=model_version,
+                features=clause_features
+            )
+            for clause, fingerprint, clause_features in zip(clauses, fingerprints, features)
+            if fingerprint in results
+        ]
+    
+    @staticmethod
+    def _record_hits(fingerprints: List[str], computed: Iterable[str], key: str):
+        """Every occurrence of a clause except the one that was just computed is a memo hit."""
+        computed = set(computed)
+        hits = {fp: n - (fp in computed) for fp, n in Counter(fingerprints).items()}
+        clause_memo.record_hits({fp: n for fp, n in hits.items() if n}, key)
+    
+    @staticmethod
+    def _build_analyses(clauses: List[Clause], legal_contexts: Optional[Dict[int, Dict[str, Any]]] = None) -> List[ClauseAnalysis]:
+        """Analyze a batch of clauses, returning unsaved ClauseAnalysis objects.
+        Clauses whose normalized text was analyzed before under the same model key reuse the
+        memoized result; the rest go through the engines in one batch.
+        """
+        legal_contexts = legal_contexts or {}
+        key = clause_memo.model_key()
+        fingerprints = [clause_memo.clause_fingerprint(c.text) for c in clauses]
+        results = clause_memo.lookup(fingerprints, key)
+        # One categorization pass per clause, shared by the explanation and stored for reports
+        features = [extract_clause_features(c.text) for c in clauses]
+        
+        # The clauses that still need the engines
+        misses = {}
+        for i, fingerprint in enumerate(fingerprints):
+            if fingerprint not in results and fingerprint not in misses:
+                misses[fingerprint] = i
+        computed = dict(zip(misses, DocumentService._compute_results(
+            [clauses[i].text for i in misses.values()],
+            [legal_contexts.get(clauses[i].id) for i in misses.values()],
+            [features[i] for i in misses.values()]
+        )))
+        results.update(computed)
+        clause_memo.store(computed, key)
+        DocumentService._record_hits(fingerprints, computed, key)
+        return DocumentService._analyses_for(clauses, fingerprints, features, results)
+    
+    @staticmethod
+    def _analyze_chunk(clause_ids: List[int], texts: List[str],
+                       compute: List[int]) -> Tuple[List[Dict[str, Any]], Dict[int, Optional[Dict[str, Any]]]]:
+        """Features of every clause of a chunk, and engine results of the clauses at the indexes in compute.
+        Touches no database, so chunks can be analyzed on pool threads or processes. A clause
+        whose analysis fails gets None instead of a result.
+        """
+        features = [extract_clause_features(text) for text in texts]
+        try:
+            results = DocumentService._compute_results(
+                [texts[i] for i in compute], [None] * len(compute), [features[i] for i in compute]
+            )
+            return features, dict(zip(compute, results))
+        except Exception:
+            # Fall back to one clause at a time so a single failure does not stop the rest
+            results = {}
+            for i in compute:
+                try:
+                    results[i] = DocumentService._compute_results([texts[i]], [None], [features[i]])[0]
+                except Exception as e:
+                    print(f"Error analyzing clause {clause_ids[i]}: {e}")
+                    results[i] = None
+            return features, results
+    
+    @staticmethod
+    def _analyze_pending(clauses: List[Clause], executor: ClauseAnalysisExecutor,
+                         progress_callback: Optional[Callable[[int, int], None]] = None) -> List[ClauseAnalysis]:
+        """Analyze the clauses of a document in chunks of analysis_chunk_size, fanned out over the executor.
+        Memo lookups and stores run on the calling thread as chunks are submitted and completed,
+        so that thread is the only one to use the database. A clause repeated in later chunks is
+        only computed by the first chunk it appears in.
+        """
+        key = clause_memo.model_key()
+        chunk_size = DocumentService.analysis_chunk_size
+        fingerprints = [clause_memo.clause_fingerprint(c.text) for c in clauses]
+        results: Dict[str, Dict[str, Any]] = {}
+        claimed = set()
+        
+        def tasks():
+            for start in range(0, len(clauses), chunk_size):
+                chunk = clauses[start:start + chunk_size]
+                unknown = [fp for fp in fingerprints[start:start + chunk_size] if fp not in results and fp not in claimed]
+                if unknown:
+                    results.update(clause_memo.lookup(unknown, key))
+                compute = []
+                for i, fingerprint in enumerate(fingerprints[start:start + chunk_size]):
+                    if fingerprint not in results and fingerprint not in claimed:
+                        claimed.add(fingerprint)
+                        compute.append(i)
+                yield [c.id for c in chunk], [c.text for c in chunk], compute
+        
+        features = []
+        computed_fingerprints = set()
+        for chunk_features, chunk_results in executor.map(DocumentService._analyze_chunk, tasks()):
+            start = len(features)
+            computed = {
+                fingerprints[start + i]: result for i, result in chunk_results.items() if result is not None
+            }
+            results.update(computed)
+            clause_memo.store(computed, key)
+            computed_fingerprints.update(computed)
+            features.extend(chunk_features)
+            if progress_callback:
+                progress_callback(len(features), len(clauses))
+        DocumentService._record_hits(
+            [fp for fp in fingerprints if fp in results], computed_fingerprints, key
+        )
+        return DocumentService._analyses_for(clauses, fingerprints, features, results)
+    
+    @staticmethod
+    @transaction.atomic
+    def _save_analyses(analyses: List[ClauseAnalysis]) -> List[ClauseAnalysis]:
+        """Insert clause analyses in batches and update the report risk counts, within one transaction."""
+        analyses = ClauseAnalysis.objects.bulk_create(analyses, batch_size=settings.ANALYSIS_BULK_BATCH_SIZE)
+        risk_stats.record_analyses(analyses)
+        return analyses
+    
+    @staticmethod
+    def _analyze_clauses(clauses: List[Clause], legal_contexts: Optional[Dict[int, Dict[str, Any]]] = None) -> List[ClauseAnalysis]:
+        """Analyze and save a batch of clauses."""
+        return DocumentService._save_analyses(DocumentService._build_analyses(clauses, legal_contexts))
+    
+    @staticmethod
+    def analyze_clause(clause_id: int, legal_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Analyze a clause using LLM, RAG, and risk classification.
+        A legal context retrieved in advance (e.g. in a batch) can be passed in to skip retrieval.
+        """
         try:
             # Get the clause
             clause = Clause.objects.get(pk=clause_id)
             
-            # Get legal context using RAG
-            legal_context = get_legal_context_for_clause(clause.text)
-            
-            # Classify risk
-            risk_analysis = classify_clause_risk(clause.text)
-            
-            # Generate explanation
-            explanation = explain_legal_clause(clause.text, legal_context)
-            
-            # Save the analysis
-            analysis = ClauseAnalysis.objects.create(
-                clause=clause,
-                simplified_explanation=explanation,
-                risk_level=risk_analysis['risk_level'],
-                risk_explanation=risk_analysis['explanation'],
-                keywords=risk_analysis['keywords']
-            )
+            legal_contexts = {clause.id: legal_context} if legal_context is not None else None
+            analysis = DocumentService._analyze_clauses([clause], legal_contexts)[0]
             
             return {
                 'success': True,
                 'message': 'Successfully analyzed clause.',
                 'clause_id': clause_id,
                 'analysis_id': analysis.id,
-                'explanation': explanation,
-                'risk_level': risk_analysis['risk_level'],
-                'risk_explanation': risk_analysis['explanation']
+                'explanation': analysis.simplified_explanation,
+                'risk_level': analysis.risk_level,
+                'risk_explanation': analysis.risk_explanation
             }
         except Clause.DoesNotExist:
             return {
@@ -95,58 +369,113 @@ class DocumentService:
                 'message': f'Error analyzing clause: {str(e)}'
             }
     
+    @staticmethod
+    @transaction.atomic
+    def _build_summary(document: Document, report: Optional[AnalysisReport]) -> Optional[Tuple[AnalysisReport, str]]:
+        """Build all summary sections of the document's report from the stored features of every clause.
+        Saves and returns the report (created if needed) and its summary, or None when the document has no clauses.
+        """
+        # Stored features of all clauses; only clauses without current features are read again
+        clause_rows = list(
+            Clause.objects.filter(document=document).order_by('position')
+            .values_list('pk', 'position', 'analysis__features')
+        )
+        if not clause_rows:
+            return None
+        missing = [pk for pk, _, features in clause_rows if not is_current(features)]
+        texts = dict(Clause.objects.filter(pk__in=missing).values_list('pk', 'text')) if missing else {}
+        if report is None:
+            report = AnalysisReport.objects.create(document=document, summary='')
+        else:
+            report.sections.all().delete()
+        
+        sections = {key: ReportSection(report=report, key=key, clauses={}) for key in summary_sections.SECTION_KEYS}
+        for pk, position, features in clause_rows:
+            keys, entry = summary_sections.clause_entry(features_of(texts.get(pk, ''), features))
+            for key in keys:
+                sections[key].clauses[str(position)] = entry
+        for section in sections.values():
+            section.text = summary_sections.render_section(section.key, section.entries())
+        
+        ReportSection.objects.bulk_create(sections.values())
+        ClauseAnalysis.objects.filter(clause__document=document, in_report=False).update(in_report=True)
+        summary = summary_sections.compose(len(clause_rows), {key: section.text for key, section in sections.items()})
+        AnalysisReport.objects.filter(pk=report.pk).update(summary=summary, sections_version=FEATURES_VERSION)
+        return report, summary
+    
+    @staticmethod
+    @transaction.atomic
+    def _update_summary(report: AnalysisReport) -> Optional[str]:
+        """Add the analyses saved since the report was last generated to its summary sections.
+        Only the sections whose clause entries changed are recomposed. Returns the summary, or
+        None when the stored sections are incomplete and it has to be built from scratch.
+        """
+        pending = list(
+            ClauseAnalysis.objects.filter(clause__document_id=report.document_id, in_report=False)
+            .values_list('pk', 'clause_id', 'clause__position', 'features')
+        )
+        if not pending:
+            return report.summary
+        sections = {section.key: section for section in report.sections.all()}
+        if set(sections) != set(summary_sections.SECTION_KEYS):
+            return None
+        missing = [clause_id for _, clause_id, _, features in pending if not is_current(features)]
+        texts = dict(Clause.objects.filter(pk__in=missing).values_list('pk', 'text')) if missing else {}
+        
+        changed = {}
+        for _, clause_id, position, features in pending:
+            keys, entry = summary_sections.clause_entry(features_of(texts.get(clause_id, ''), features))
+            position = str(position)
+            for key, section in sections.items():
+                new_entry = entry if key in keys else None
+                if section.clauses.get(position) == new_entry:
+                    continue
+                if new_entry is None:
+                    del section.clauses[position]
+                else:
+                    section.clauses[position] = new_entry
+                changed[key] = section
+        ClauseAnalysis.objects.filter(pk__in=[pk for pk, _, _, _ in pending]).update(in_report=True)
+        if not changed:
+            return report.summary
+        for section in changed.values():
+            section.text = summary_sections.render_section(section.key, section.entries())
+        ReportSection.objects.bulk_update(changed.values(), ['clauses', 'text'])
+        
+        total_clauses = Clause.objects.filter(document_id=report.document_id).count()
+        summary = summary_sections.compose(total_clauses, {key: section.text for key, section in sections.items()})
+        AnalysisReport.objects.filter(pk=report.pk).update(summary=summary)
+        return summary
+    
     @staticmethod
     def generate_document_report(document_id: int) -> Dict[str, Any]:
-        """Generate an overall report for the document."""
+        """Generate an overall report for the document.
+        Once a report has been generated, later calls only add the clause analyses saved since:
+        risk counts are kept up to date as analyses are saved, and only the summary sections of
+        the changed clauses are recomposed.
+        """
         try:
             # Get the document
             document = Document.objects.get(pk=document_id)
+            report = AnalysisReport.objects.filter(document=document).first()
             
-            # Get all clauses
-            clauses = Clause.objects.filter(document=document).order_by('position')
-            
-            if not clauses:
-                return {
-                    'success': False,
-                    'message': 'No clauses found for this document.'
-                }
-            
-            # Get all analyses
-            analyses = []
-            for clause in clauses:
-                try:
-                    analysis = ClauseAnalysis.objects.get(clause=clause)
-                    analyses.append({
-                        'clause_id': clause.id,
-                        'risk_level': analysis.risk_level,
-                        'explanation': analysis.simplified_explanation
-                    })
-                except ClauseAnalysis.DoesNotExist:
-                    continue
-            
-            # Calculate overall risk score
-            risk_scores = {'low': 0, 'medium': 1, 'high': 2}
-            if analyses:
-                avg_risk_score = sum(risk_scores[a['risk_level']] for a in analyses) / len(analyses)
+            summary = None
+            if report is not None and report.summary and report.sections_version == FEATURES_VERSION:
+                summary = DocumentService._update_summary(report)
+            if summary is not None:
+                # Risk counts were kept up to date as the analyses were saved
+                risk_totals = {field: getattr(report, field) for field in risk_stats.COUNT_FIELDS + ('risk_score',)}
             else:
-                avg_risk_score = 0
-            
-            # Generate document summary
-            clause_texts = [{'text': c.text} for c in clauses]
-            summary = summarize_legal_document(clause_texts)
-            
-            # Create or update report
-            try:
-                report = AnalysisReport.objects.get(document=document)
-                report.summary = summary
-                report.risk_score = avg_risk_score
-                report.save()
-            except AnalysisReport.DoesNotExist:
-                report = AnalysisReport.objects.create(
-                    document=document,
-                    summary=summary,
-                    risk_score=avg_risk_score
-                )
+                built = DocumentService._build_summary(document, report)
+                if built is None:
+                    return {
+                        'success': False,
+                        'message': 'No clauses found for this document.'
+                    }
+                report, summary = built
+                # Risk counts and overall risk score (low=0, medium=1, high=2) in a single aggregate query
+                risk_totals = risk_stats.aggregate_risk(document.id)
+                AnalysisReport.objects.filter(pk=report.pk).update(**risk_totals)
             
             return {
                 'success': True,
@@ -154,8 +483,8 @@ class DocumentService:
                 'document_id': document_id,
                 'report_id': report.id,
                 'summary': summary,
-                'risk_score': avg_risk_score,
-                'analyses_count': len(analyses)
+                'risk_score': risk_totals['risk_score'],
+                'analyses_count': risk_totals['analyzed_count']
             }
         except Document.DoesNotExist:
             return {
@@ -169,20 +498,41 @@ class DocumentService:
             }
     
     @staticmethod
-    def analyze_document(document_id: int) -> Dict[str, Any]:
-        """Process and analyze an entire document."""
+    def analyze_document(document_id: int, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                         executor: Optional[ClauseAnalysisExecutor] = None) -> Dict[str, Any]:
+        """Process and analyze an entire document.
+        progress_callback(completed, total, message) is called as batches of clauses are analyzed.
+        Batches are analyzed by executor (by default the shared one configured by ANALYSIS_EXECUTOR and ANALYSIS_WORKERS).
+        """
+        def report_progress(completed: int, total: int, message: str):
+            if progress_callback:
+                progress_callback(completed, total, message)
+        
         # Process the document
         process_result = DocumentService.process_document(document_id)
         if not process_result['success']:
             return process_result
         
-        # Analyze each clause
+        # Analyze the clauses still lacking an analysis (cloned ones already have theirs) in batches
         clauses = process_result.get('clauses', [])
-        for clause in clauses:
-            DocumentService.analyze_clause(clause['id'])
+        pending = list(
+            Clause.objects.filter(pk__in=[c['id'] for c in clauses], analysis__isnull=True)
+            .order_by('position')
+        )
+        total = len(pending)
+        report_progress(0, total, f'Extracted {len(clauses)} clauses.')
+        analyses = DocumentService._analyze_pending(
+            pending, executor or analysis_executor.get(),
+            lambda completed, total: report_progress(completed, total, f'Analyzed {completed} of {total} clauses.')
+        )
+        # Persist all analyses of the document in one transaction
+        DocumentService._save_analyses(analyses)
         
-        # Generate report
-        report_result = DocumentService.generate_document_report(document_id)
+        # Generate report, unless a cloned one is already complete
+        if pending or not AnalysisReport.objects.filter(document_id=document_id).exists():
+            report_result = DocumentService.generate_document_report(document_id)
+        else:
+            report_result = {'success': True, 'document_id': document_id, 'cloned_from': process_result.get('cloned_from')}
         
         return {
             'success': True,
@@ -0,0 +1,298 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from legal_classifier.keyword_matcher import KeywordMatcher
+
+# Keywords (matched as substrings) that select the parts of a fallback explanation
+EXPLANATION_KEYWORDS = {
+	'termination': ['terminat'],
+	'immediate': ['without notice', 'immediate'],
+	'with_notice': ['with notice', 'days', 'weeks'],
+	'confidentiality': ['confidential', 'non-disclosure'],
+	'indemnification': ['indemni'],
+	'payment': ['payment', 'fee', 'compensation'],
+	'monthly': ['monthly', 'per month'],
+	'annual': ['annual', 'per year'],
+	'due': ['due'],
+	'arbitration': ['arbitration'],
+	'dispute': ['disput', 'disagreement'],
+	'liability': ['liability', 'liable'],
+	'limited': ['limit', 'maximum'],
+	'waiver': ['waive', 'waiver'],
+	'non_compete': ['non-compete', 'non compete'],
+	'intellectual_property': ['intellectual property', 'copyright', 'patent'],
+	'governing_law': ['governing law', 'laws of', 'jurisdiction'],
+	'amendment': ['amend', 'modif', 'change'],
+	'force_majeure': ['force majeure', 'act of god'],
+	'severability': ['severability', 'severable'],
+	'entire_agreement': ['entire agreement', 'complete agreement'],
+}
+
+# Keywords that categorize clauses for the executive summary, followed by the details it mentions
+SUMMARY_KEYWORDS = {
+	'termination': ['terminat'],
+	'payment': ['payment', 'fee', 'compensation', 'salary', 'wage'],
+	'confidentiality': ['confidential', 'non-disclosure', 'nda'],
+	'indemnification': ['indemni'],
+	'liability': ['liability', 'liable'],
+	'dispute_resolution': ['arbitration', 'disput', 'litigation'],
+	'non_compete': ['non-compete', 'non compete'],
+	'intellectual_property': ['intellectual property', 'copyright', 'patent', 'trademark'],
+	'governing_law': ['governing law', 'laws of', 'jurisdiction'],
+	'amendment': ['amend', 'modif'],
+	'force_majeure': ['force majeure', 'act of god'],
+	'immediate_termination': ['without notice', 'immediate'],
+	'notice_termination': ['with notice'],
+	'monthly': ['monthly'],
+	'annual': ['annual', 'yearly'],
+	'limited': ['limit', 'maximum'],
+	'waiver': ['waive'],
+	'arbitration': ['arbitration'],
+	'court': ['litigation', 'court'],
+	'severability': ['severability'],
+	'entire_agreement': ['entire agreement'],
+	'notice': ['notice'],
+	'termination_term': ['termination'],
+	'assignment': ['assignment'],
+}
+
+# Categories a clause is filed under in the summary; the rest only refine the wording
+SUMMARY_CATEGORIES = [
+	'termination', 'payment', 'confidentiality', 'indemnification', 'liability', 'dispute_resolution',
+	'non_compete', 'intellectual_property', 'governing_law', 'amendment', 'force_majeure',
+]
+
+explanation_matcher = KeywordMatcher(EXPLANATION_KEYWORDS)
+summary_matcher = KeywordMatcher(SUMMARY_KEYWORDS)
+
+
+# Rule-based clause explanations.
+#
+# EXPLANATION_RULES is evaluated once per clause against the categories found by the
+# explanation keyword matcher and the details extracted from the clause (see clause_features).
+# Each rule is a list of cases tried in order: the first case whose categories are all present,
+# and whose extractor (if any) finds a value, adds its sentence with the value substituted for
+# {value}. Rules are applied in table order.
+
+Case = Tuple[Set[str], Optional[str], str]
+
+EXPLANATION_RULES: List[List[Case]] = [
+	# Termination
+	[
+		({'termination', 'immediate'}, None,
+			"This clause allows either party to end the agreement immediately without giving advance notice."),
+		({'termination', 'with_notice'}, 'notice_period',
+			"This clause allows either party to end the agreement by giving {value} advance notice."),
+		({'termination', 'with_notice'}, None,
+			"This clause describes how and when the agreement can be ended by either party with advance notice."),
+		({'termination'}, None,
+			"This clause explains the conditions and process for ending this agreement."),
+	],
+	# Confidentiality
+	[
+		({'confidentiality'}, 'duration',
+			"This clause requires both parties to keep sensitive information private and not share it with others for {value}."),
+		({'confidentiality'}, None,
+			"This clause requires both parties to keep sensitive information private and not share it with others."),
+	],
+	# Indemnification
+	[
+		({'indemnification'}, None,
+			"This clause means that one party agrees to pay for any losses or damages that the other party might face because of this agreement."),
+	],
+	# Payment and fees
+	[
+		({'payment'}, 'payment_terms', "This clause specifies payment terms: {value}."),
+		({'payment'}, None, "This clause explains the payment terms, amounts, and when payments are due."),
+	],
+	# Arbitration and dispute resolution
+	[
+		({'arbitration'}, None,
+			"This clause means that if there are any disagreements, they will be resolved through arbitration (a private process) instead of going to court."),
+		({'dispute'}, None,
+			"This clause explains how any disagreements or disputes between the parties will be resolved."),
+	],
+	# Liability
+	[
+		({'liability', 'limited'}, None,
+			"This clause limits how much one party can be held responsible for damages or losses."),
+		({'liability'}, None,
+			"This clause explains the responsibilities and liabilities of each party."),
+	],
+	# Waiver
+	[
+		({'waiver'}, None, "This clause means that one or both parties are giving up certain rights or claims."),
+	],
+	# Non-compete
+	[
+		({'non_compete'}, 'duration',
+			"This clause prevents one party from working with or starting a competing business for {value} after the agreement ends."),
+		({'non_compete'}, None,
+			"This clause restricts one party from competing with the other party's business."),
+	],
+	# Intellectual property
+	[
+		({'intellectual_property'}, None,
+			"This clause explains who owns the rights to ideas, inventions, or creative work created during this agreement."),
+	],
+	# Governing law
+	[
+		({'governing_law'}, 'location', "This clause states that the laws of {value} will apply to this agreement."),
+		({'governing_law'}, None,
+			"This clause specifies which state or country's laws will govern this agreement."),
+	],
+	# Amendment and modification
+	[
+		({'amendment'}, None, "This clause explains how this agreement can be changed or updated in the future."),
+	],
+	# Force majeure
+	[
+		({'force_majeure'}, None,
+			"This clause explains what happens if events outside of either party's control (like natural disasters) prevent them from fulfilling their obligations."),
+	],
+	# Severability
+	[
+		({'severability'}, None,
+			"This clause means that if one part of the agreement is found to be invalid, the rest of the agreement will still be valid."),
+	],
+	# Entire agreement
+	[
+		({'entire_agreement'}, None,
+			"This clause states that this document contains the complete agreement between the parties and replaces any previous agreements."),
+	],
+]
+
+
+@lru_cache(maxsize=None)
+def _number_pattern(unit: str) -> 're.Pattern':
+	return re.compile(r'(\d+)\s*' + unit, re.IGNORECASE)
+
+
+AMOUNT_PATTERNS = [
+	re.compile(r'\$[\d,]+\.?\d*', re.IGNORECASE),  # $1,000 or $1000.50
+	re.compile(r'[\d,]+\.?\d*\s*(dollars|USD|rupees|INR)', re.IGNORECASE),  # 1000 dollars
+]
+
+# "laws of [location]" or "governed by [location]"
+LOCATION_PATTERNS = [
+	re.compile(r'laws of ([A-Z][a-zA-Z\s]+?)(?:\.|,|$)'),
+	re.compile(r'governed by.*?([A-Z][a-zA-Z\s]+?)(?:\.|,|$)'),
+]
+
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+')
+
+
+def extract_number(text: str, units: List[str]) -> str:
+	"""Extract a number with unit from text, trying the units in order."""
+	for unit in units:
+		match = _number_pattern(unit).search(text)
+		if match:
+			number = match.group(1)
+			return f"{number} {unit}{'s' if int(number) != 1 else ''}"
+	return ""
+
+
+def extract_amount(text: str) -> str:
+	"""Extract monetary amount from text."""
+	for pattern in AMOUNT_PATTERNS:
+		match = pattern.search(text)
+		if match:
+			return match.group(0)
+	return ""
+
+
+def extract_location(text: str) -> str:
+	"""Extract location from governing law clause."""
+	for pattern in LOCATION_PATTERNS:
+		match = pattern.search(text)
+		if match:
+			location = match.group(1).strip()
+			# Limit to reasonable length
+			if len(location) < 50:
+				return location
+	return ""
+
+
+def _payment_terms(features: Dict[str, Any], found: Set[str]) -> str:
+	amount = features.get('amount')
+	if not amount:
+		return ""
+	terms = [term for category, term in
+		(('monthly', "monthly"), ('annual', "annually"), ('due', "when payment is due")) if category in found]
+	return f"{amount} {' and '.join(terms)}"
+
+
+# Values substituted into the rule templates, read from the clause features
+EXTRACTORS: Dict[str, Callable[[Dict[str, Any], Set[str]], str]] = {
+	'notice_period': lambda features, found: features.get('notice_period'),
+	'duration': lambda features, found: features.get('duration'),
+	'payment_terms': _payment_terms,
+	'location': lambda features, found: features.get('location'),
+}
+
+
+def _compile_rules(rules: List[List[Case]]):
+	"""Resolve extractor names and index each rule by the categories that can trigger it."""
+	compiled = []
+	for rule in rules:
+		cases = [(frozenset(categories), extractor and EXTRACTORS[extractor], template)
+			for categories, extractor, template in rule]
+		compiled.append((frozenset().union(*(categories for categories, _, _ in cases)), cases))
+	return compiled
+
+
+_COMPILED_RULES = _compile_rules(EXPLANATION_RULES)
+
+
+def apply_rules(features: Dict[str, Any], found: Set[str]) -> List[str]:
+	"""Sentences of the explanation rules that apply to a clause with the given features and categories."""
+	sentences = []
+	for triggers, cases in _COMPILED_RULES:
+		if triggers.isdisjoint(found):
+			continue
+		for categories, extractor, template in cases:
+			if not categories <= found:
+				continue
+			if extractor is None:
+				sentences.append(template)
+				break
+			value = extractor(features, found)
+			if value:
+				sentences.append(template.format(value=value))
+				break
+	return sentences
+
+
+# Legal terms and their plain English equivalents. Each term is replaced in its lowercase and
+# capitalized form, one term after another, so a term only matches text left by earlier ones
+# ("therein" is never replaced: "herein" has already turned it into "tin this document").
+SIMPLIFICATIONS = [
+	('shall', 'must'),
+	('may', 'can'),
+	('herein', 'in this document'),
+	('thereof', 'of it'),
+	('thereto', 'to it'),
+	('therein', 'in it'),
+	('pursuant to', 'according to'),
+	('notwithstanding', 'despite'),
+	('whereas', 'given that'),
+	('party of the first part', 'first party'),
+	('party of the second part', 'second party'),
+]
+
+# Built once rather than on every call
+SIMPLIFICATION_STEPS = [
+	step
+	for legal_term, simple_term in SIMPLIFICATIONS
+	for step in ((legal_term, simple_term), (legal_term.capitalize(), simple_term.capitalize()))
+]
+
+
+def simplify_language(text: str) -> str:
+	"""Simplify legal language to plain English."""
+	# A chain of str.replace calls beats a single regex alternation here: re does not optimize
+	# alternations of literals, and one pass would also have to reproduce the order dependence
+	for legal_term, simple_term in SIMPLIFICATION_STEPS:
+		text = text.replace(legal_term, simple_term)
+	return text
@@ -0,0 +1,79 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+_STOP = object()
+
+
+class GenerationWorker:
+	"""Runs text generation on a dedicated thread, batching prompts from all callers.
+
+	Callers submit prompts and get futures back, so they can wait with a timeout instead of
+	blocking on the model. The worker takes the first queued prompt, waits up to max_wait
+	seconds for more, and runs up to batch_size prompts through generate in one call.
+	"""
+
+	def __init__(self, generate: Callable[[List[str]], List[str]], batch_size: int = 8, max_wait: float = 0.05):
+		self.generate = generate
+		self.batch_size = batch_size
+		self.max_wait = max_wait
+		self.requests: queue.Queue = queue.Queue()
+		self.batches_run = 0
+		self._thread: Optional[threading.Thread] = None
+		self._lock = threading.Lock()
+
+	def _ensure_started(self):
+		with self._lock:
+			if self._thread is None or not self._thread.is_alive():
+				self._thread = threading.Thread(target=self._run, name='llm-generation', daemon=True)
+				self._thread.start()
+
+	def submit(self, prompt: str) -> Future:
+		"""Queue a prompt; the future resolves to its generated text."""
+		self._ensure_started()
+		future = Future()
+		self.requests.put((prompt, future))
+		return future
+
+	def submit_many(self, prompts: List[str]) -> List[Future]:
+		return [self.submit(prompt) for prompt in prompts]
+
+	def stop(self):
+		"""Stop the worker thread once the prompts queued so far have been processed."""
+		if self._thread is not None and self._thread.is_alive():
+			self.requests.put(_STOP)
+			self._thread.join()
+
+	def _next_batch(self):
+		"""Block for one request, then collect more for up to max_wait seconds."""
+		batch = []
+		item = self.requests.get()
+		while item is not _STOP:
+			prompt, future = item
+			# Callers that gave up cancel their futures; skip them
+			if future.set_running_or_notify_cancel():
+				batch.append((prompt, future))
+			if len(batch) >= self.batch_size:
+				break
+			try:
+				item = self.requests.get(timeout=self.max_wait) if batch else self.requests.get()
+			except queue.Empty:
+				break
+		return batch, item is _STOP
+
+	def _run(self):
+		while True:
+			batch, stopping = self._next_batch()
+			if batch:
+				try:
+					outputs = self.generate([prompt for prompt, _ in batch])
+					for (_, future), output in zip(batch, outputs):
+						future.set_result(output)
+				except Exception as e:
+					print(f"Error generating explanations: {e}")
+					for _, future in batch:
+						future.set_exception(e)
+				self.batches_run += 1
+			if stopping:
+				return
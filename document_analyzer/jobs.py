@@ -0,0 +1,125 @@
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from typing import Optional
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Document, AnalysisJob
+from .document_service import DocumentService
+
+
+def _active_jobs(document: Document):
+    """Queued jobs of a document, and running jobs whose worker has reported within the lease."""
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYSIS_JOB_LEASE)
+    return AnalysisJob.objects.filter(
+        Q(status='queued') | Q(status='running', heartbeat_at__gte=cutoff), document=document
+    ).order_by('-created_at')
+
+
+def failed_attempts(document: Document) -> int:
+    """Number of failed jobs of a document since its last successful one."""
+    jobs = AnalysisJob.objects.filter(document=document, status='failed')
+    last_success = AnalysisJob.objects.filter(document=document, status='succeeded').order_by('-created_at').first()
+    if last_success is not None:
+        jobs = jobs.filter(created_at__gt=last_success.created_at)
+    return jobs.count()
+
+
+def enqueue_analysis(document: Document) -> AnalysisJob:
+    """Queue analysis of a document, reusing a job that is already queued or running.
+    After ANALYSIS_MAX_ATTEMPTS failed jobs in a row, the last failed job is returned instead.
+    """
+    job = _active_jobs(document).first()
+    if job is None:
+        if failed_attempts(document) >= settings.ANALYSIS_MAX_ATTEMPTS:
+            return AnalysisJob.objects.filter(document=document, status='failed').order_by('-created_at').first()
+        job = AnalysisJob.objects.create(document=document, message='Waiting for a worker.')
+    return job
+
+
+def active_job(document: Document) -> Optional[AnalysisJob]:
+    return _active_jobs(document).first()
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def expire_stale_jobs():
+    """Requeue running jobs whose worker stopped reporting for longer than ANALYSIS_JOB_LEASE seconds.
+    Jobs that already ran ANALYSIS_MAX_ATTEMPTS times are failed instead.
+    """
+    stale = AnalysisJob.objects.filter(
+        Q(heartbeat_at__lt=timezone.now() - timedelta(seconds=settings.ANALYSIS_JOB_LEASE)) | Q(heartbeat_at__isnull=True),
+        status='running'
+    )
+    stale.filter(attempts__lt=settings.ANALYSIS_MAX_ATTEMPTS).update(
+        status='queued', message='The analysis worker stopped responding; waiting for another worker.'
+    )
+    stale.filter(attempts__gte=settings.ANALYSIS_MAX_ATTEMPTS).update(
+        status='failed', finished_at=timezone.now(), message='The analysis worker stopped responding.',
+        error='Lease expired after the last attempt.'
+    )
+
+
+def claim_next_job(worker: str) -> Optional[AnalysisJob]:
+    """Atomically move the oldest queued job to running, after requeuing jobs of unresponsive workers.
+    The conditional UPDATE makes sure only one worker wins each job, without row locks.
+    """
+    expire_stale_jobs()
+    while True:
+        job = AnalysisJob.objects.filter(status='queued').order_by('created_at').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = AnalysisJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running', started_at=now, heartbeat_at=now, attempts=F('attempts') + 1,
+            worker=worker, message='Starting analysis.'
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job: AnalysisJob) -> AnalysisJob:
+    """Run a claimed job, recording progress as clauses are analyzed.
+    Each progress report renews the job's lease. Updates only apply while the job is still this
+    worker's, so a worker that outlived its lease does not overwrite the job's new run.
+    """
+    owned = AnalysisJob.objects.filter(pk=job.pk, status='running', worker=job.worker, attempts=job.attempts)
+
+    def report_progress(completed: int, total: int, message: str):
+        owned.update(completed_steps=completed, total_steps=total, message=message, heartbeat_at=timezone.now())
+
+    try:
+        result = DocumentService.analyze_document(job.document_id, progress_callback=report_progress)
+        fields = {'result': result, 'message': result.get('message', '')}
+        fields['status'] = 'succeeded' if result.get('success') else 'failed'
+        if not result.get('success'):
+            fields['error'] = result.get('message', '')
+    except Exception as e:
+        fields = {'status': 'failed', 'message': f'Error analyzing document: {e}', 'error': traceback.format_exc()}
+    owned.update(finished_at=timezone.now(), **fields)
+    job.refresh_from_db()
+    return job
+
+
+def run_worker(poll_interval: float = 2.0, once: bool = False, max_jobs: Optional[int] = None) -> int:
+    """Process queued jobs until stopped. Returns the number of jobs run."""
+    worker = worker_id()
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        close_old_connections()
+        job = claim_next_job(worker)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from document_analyzer.analysis_executor import ClauseAnalysisExecutor
+from document_analyzer.document_service import DocumentService
+from legal_classifier.management.commands.benchmark_risk_backends import default_corpus
+from legaldoc_ai.lazy import warm_engines
+
+
+def _chunks(corpus, count, chunk_size):
+    """Tasks for DocumentService._analyze_chunk over count clauses, all of which go through the engines."""
+    # Numbered so repeated corpus clauses are still distinct clauses
+    texts = [f'{corpus[i % len(corpus)]} ({i + 1})' for i in range(count)]
+    for start in range(0, count, chunk_size):
+        chunk = texts[start:start + chunk_size]
+        yield list(range(start, start + len(chunk))), chunk, list(range(len(chunk)))
+
+
+class Command(BaseCommand):
+    help = ('Measure clause analysis throughput (clauses per second) of the serial, thread pool and '
+            'process pool executors for several worker counts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', default=['thread', 'process'], choices=['thread', 'process'])
+        parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, 8])
+        parser.add_argument('--clauses', type=int, default=400, help='Number of clauses to analyze per run.')
+        parser.add_argument('--chunk-size', type=int, default=DocumentService.analysis_chunk_size)
+        parser.add_argument('--corpus', help='Text file with one clause per line (defaults to a built-in corpus).')
+
+    def handle(self, *args, **options):
+        if options['corpus']:
+            with open(options['corpus'], encoding='utf-8') as f:
+                corpus = [line.strip() for line in f if line.strip()]
+        else:
+            corpus = default_corpus()
+        count = options['clauses']
+        self.stdout.write(f"Corpus: {len(corpus)} clauses, {count} analyzed per run")
+
+        # Build the engines of the serial baseline; pool processes build theirs when they start
+        for name, seconds in warm_engines().items():
+            self.stdout.write(f"Warmed {name} engine in {seconds:.2f}s")
+
+        def run(executor):
+            started = time.perf_counter()
+            for _ in executor.map(DocumentService._analyze_chunk, _chunks(corpus, count, options['chunk_size'])):
+                pass
+            return count / (time.perf_counter() - started)
+
+        # An untimed run first, so that caches filled on first use do not favour later runs
+        run(ClauseAnalysisExecutor('serial'))
+        baseline = run(ClauseAnalysisExecutor('serial'))
+        self.stdout.write(f"{'mode':>8} {'workers':>8} {'clauses/s':>10} {'speedup':>8}")
+        self.stdout.write(f"{'serial':>8} {1:>8} {baseline:>10.1f} {1.0:>7.2f}x")
+        for mode in options['modes']:
+            for workers in options['workers']:
+                with ClauseAnalysisExecutor(mode, workers=workers) as executor:
+                    # One worker runs serially; report it under the requested mode all the same
+                    executor.mode = mode
+                    # The pool is kept across documents, so its start-up is left out of the timing
+                    run(executor)
+                    throughput = run(executor)
+                self.stdout.write(f"{mode:>8} {workers:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
@@ -0,0 +1,75 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from document_analyzer.document_service import DocumentService
+from document_analyzer.models import Document, Clause, ClauseAnalysis
+
+
+def _extracted_clauses(count):
+    return [
+        {'text': f'{i + 1}. Clause {i + 1}. The parties agree to the terms of section {i + 1}.',
+         'page_number': i // 20 + 1, 'position': i}
+        for i in range(count)
+    ]
+
+
+def _analysis_fields(i):
+    return {
+        'simplified_explanation': f'Plain English explanation {i}.',
+        'risk_level': ('low', 'medium', 'high')[i % 3],
+        'risk_explanation': 'Benchmark row.',
+        'keywords': ['terminate', 'liability'],
+    }
+
+
+def _write_row_by_row(document, extracted):
+    """The original write path: one INSERT, in its own implicit transaction, per row."""
+    for i, clause_data in enumerate(extracted):
+        clause = Clause.objects.create(document=document, **clause_data)
+        ClauseAnalysis.objects.create(clause=clause, **_analysis_fields(i))
+    document.processed = True
+    document.save()
+
+
+def _write_bulk(document, extracted):
+    """The DocumentService write path: batched bulk_create inside one transaction per step."""
+    clauses = DocumentService._save_clauses(document, extracted)
+    DocumentService._save_analyses([
+        ClauseAnalysis(clause=clause, **_analysis_fields(i)) for i, clause in enumerate(clauses)
+    ])
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/second of row-by-row and bulk clause/analysis writes on the configured database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 5000],
+                            help='Clause counts per simulated document.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per size; the best is reported.')
+
+    def handle(self, *args, **options):
+        user, created = User.objects.get_or_create(username='__benchmark_bulk_writes__')
+        writers = [('row-by-row', _write_row_by_row), ('bulk', _write_bulk)]
+        try:
+            self.stdout.write(f"{'clauses':>8} {'writer':>12} {'seconds':>9} {'rows/s':>10}")
+            for size in options['sizes']:
+                extracted = _extracted_clauses(size)
+                best = {}
+                for _ in range(options['repeat']):
+                    for name, writer in writers:
+                        document = Document.objects.create(title='Benchmark', file='benchmark.pdf', user=user)
+                        started = time.perf_counter()
+                        writer(document, extracted)
+                        elapsed = time.perf_counter() - started
+                        best[name] = min(best.get(name, elapsed), elapsed)
+                        document.delete()
+                for name, _ in writers:
+                    # Each clause is written with its analysis: two rows
+                    rows_per_second = 2 * size / best[name]
+                    self.stdout.write(f"{size:>8} {name:>12} {best[name]:>9.3f} {rows_per_second:>10.0f}")
+                self.stdout.write(f"{size:>8} {'speedup':>12} {best['row-by-row'] / best['bulk']:>9.1f}x")
+        finally:
+            if created:
+                user.delete()
@@ -0,0 +1,58 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from legaldoc_ai.lazy import ENGINES
+
+# Run in a fresh interpreter so that nothing is already imported or loaded
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+timings = {"django.setup": time.perf_counter() - started}
+for module in sys.argv[1].split(","):
+    started = time.perf_counter()
+    __import__(module)
+    timings["import " + module] = time.perf_counter() - started
+if sys.argv[2]:
+    from legaldoc_ai.lazy import warm_engines
+    for name, seconds in warm_engines(sys.argv[2].split(",")).items():
+        timings["first use " + name] = seconds
+print("TIMINGS " + json.dumps(timings))
+'''
+
+DEFAULT_MODULES = ['document_analyzer.views', 'document_analyzer.document_service']
+
+
+class Command(BaseCommand):
+    help = ('Measure how long a fresh process takes to import the application modules, '
+            'and how long each engine then takes to build on first use.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES, help='Modules to import, in order.')
+        parser.add_argument('--engines', nargs='*', default=[], choices=list(ENGINES),
+                            help='Engines to warm up after the imports (none by default).')
+        parser.add_argument('--repeat', type=int, default=3, help='Fresh processes to run; the median is reported.')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'legaldoc_ai.settings'))
+        runs = []
+        for _ in range(options['repeat']):
+            result = subprocess.run(
+                [sys.executable, '-c', PROBE, ','.join(options['modules']), ','.join(options['engines'])],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+            )
+            lines = [line for line in result.stdout.splitlines() if line.startswith('TIMINGS ')]
+            if result.returncode != 0 or not lines:
+                raise CommandError(f"Import probe failed:\n{result.stderr}")
+            runs.append(json.loads(lines[-1][len('TIMINGS '):]))
+
+        self.stdout.write(f"Median of {len(runs)} fresh process(es):")
+        for step in runs[0]:
+            self.stdout.write(f"{step:>45}: {statistics.median(run[step] for run in runs):.3f}s")
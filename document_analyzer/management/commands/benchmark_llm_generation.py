@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from document_analyzer.llm_processor import LLMProcessor
+from legal_classifier.management.commands.benchmark_risk_backends import default_corpus
+
+
+class Command(BaseCommand):
+    help = ('Measure LLM explanation throughput (clauses per second) on CPU for several '
+            'generation batch sizes, against the rule-based explanations.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=settings.LLM_MODEL, help='Model name or path (defaults to LLM_MODEL).')
+        parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 4, 8, 16])
+        parser.add_argument('--max-new-tokens', type=int, default=settings.LLM_MAX_NEW_TOKENS)
+        parser.add_argument('--corpus', help='Text file with one clause per line (defaults to a built-in corpus).')
+        parser.add_argument('--limit', type=int, default=64, help='Number of clauses to explain.')
+        parser.add_argument('--timeout', type=float, default=3600.0,
+                            help='Seconds to wait for each run before falling back to rule-based explanations.')
+
+    def handle(self, *args, **options):
+        if options['corpus']:
+            with open(options['corpus'], encoding='utf-8') as f:
+                corpus = [line.strip() for line in f if line.strip()]
+        else:
+            corpus = default_corpus()
+        corpus = corpus[:options['limit']]
+        self.stdout.write(f"Corpus: {len(corpus)} clauses")
+
+        processor = LLMProcessor(model_name=options['model'], generation=True)
+        if processor.worker is None:
+            raise CommandError(f"Could not load {options['model']} for generation")
+        processor.max_new_tokens = options['max_new_tokens']
+
+        started = time.perf_counter()
+        rule_based = [processor._fallback_explanation(text) for text in corpus]
+        rows = [('rules', len(corpus) / (time.perf_counter() - started), 0, 0.0)]
+
+        for batch_size in options['batch_sizes']:
+            processor.worker.batch_size = batch_size
+            batches_before = processor.worker.batches_run
+            started = time.perf_counter()
+            explanations = processor.explain_clauses(corpus, timeout=options['timeout'])
+            elapsed = time.perf_counter() - started
+            fallbacks = sum(generated == rule for generated, rule in zip(explanations, rule_based))
+            rows.append((
+                f'batch {batch_size}',
+                len(corpus) / elapsed,
+                processor.worker.batches_run - batches_before,
+                fallbacks / len(corpus),
+            ))
+        processor.worker.stop()
+
+        self.stdout.write(f"{'mode':>10} {'clauses/s':>10} {'batches':>8} {'rule-based':>11}")
+        for mode, throughput, batches, fallback_share in rows:
+            self.stdout.write(f"{mode:>10} {throughput:>10.1f} {batches:>8} {fallback_share:>11.0%}")
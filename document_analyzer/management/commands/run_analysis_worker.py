@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from document_analyzer.jobs import run_worker
+from legaldoc_ai.lazy import preload_engines
+
+
+class Command(BaseCommand):
+    help = 'Run queued document analysis jobs from the database-backed queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty instead of polling.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait between polls of an empty queue.')
+        parser.add_argument('--max-jobs', type=int, default=None, help='Exit after running this many jobs.')
+
+    def handle(self, *args, **options):
+        preload_engines()
+        processed = run_worker(
+            poll_interval=options['poll_interval'],
+            once=options['once'],
+            max_jobs=options['max_jobs'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s).'))
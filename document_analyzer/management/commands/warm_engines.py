@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from legaldoc_ai.lazy import ENGINES, warm_engines
+
+
+class Command(BaseCommand):
+    help = ('Build the AI engines (risk classifier, RAG processor, LLM) and load their models, '
+            'e.g. to check a deployment or fill on-disk caches before starting workers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('engines', nargs='*', choices=list(ENGINES), help='Engines to warm up (all by default).')
+
+    def handle(self, *args, **options):
+        try:
+            timings = warm_engines(options['engines'] or None)
+        except ValueError as e:
+            raise CommandError(str(e))
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name:>6}: {seconds:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"Warmed up {len(timings)} engine(s)."))
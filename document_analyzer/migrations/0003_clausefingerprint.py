@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_analyzer', '0002_document_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClauseFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('model_key', models.CharField(max_length=64)),
+                ('simplified_explanation', models.TextField()),
+                ('risk_level', models.CharField(choices=[('low', 'Low Risk'), ('medium', 'Medium Risk'), ('high', 'High Risk')], default='low', max_length=10)),
+                ('risk_explanation', models.TextField(blank=True)),
+                ('keywords', models.JSONField(default=list)),
+                ('context_sources', models.JSONField(default=list)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('fingerprint', 'model_key')},
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:25
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_risk_counts(apps, schema_editor):
+    """Fill the new counts of existing reports, annotated in a single query."""
+    AnalysisReport = apps.get_model('document_analyzer', 'AnalysisReport')
+    level = 'document__clauses__analysis__risk_level'
+    reports = AnalysisReport.objects.annotate(
+        low=Count('document__clauses__analysis', filter=Q(**{level: 'low'})),
+        medium=Count('document__clauses__analysis', filter=Q(**{level: 'medium'})),
+        high=Count('document__clauses__analysis', filter=Q(**{level: 'high'})),
+        analyzed=Count('document__clauses__analysis'),
+    )
+    for report in reports:
+        report.low_risk_count = report.low
+        report.medium_risk_count = report.medium
+        report.high_risk_count = report.high
+        report.analyzed_count = report.analyzed
+    AnalysisReport.objects.bulk_update(
+        reports, ['low_risk_count', 'medium_risk_count', 'high_risk_count', 'analyzed_count'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_analyzer', '0004_analysisjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisreport',
+            name='analyzed_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='high_risk_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='low_risk_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='medium_risk_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_risk_counts, migrations.RunPython.noop),
+    ]
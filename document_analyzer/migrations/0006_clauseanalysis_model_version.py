@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_analyzer', '0005_analysisreport_risk_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clauseanalysis',
+            name='model_version',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
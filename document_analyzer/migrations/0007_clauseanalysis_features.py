@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_analyzer', '0006_clauseanalysis_model_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clauseanalysis',
+            name='features',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_analyzer', '0007_clauseanalysis_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisreport',
+            name='sections_version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='clauseanalysis',
+            name='in_report',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ReportSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32)),
+                ('clauses', models.JSONField(default=dict)),
+                ('text', models.TextField(blank=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='document_analyzer.analysisreport')),
+            ],
+            options={
+                'unique_together': {('report', 'key')},
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+import hashlib
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -8,9 +9,22 @@ class Document(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     processed = models.BooleanField(default=False)
+    # SHA-256 of the uploaded file, used to reuse results for byte-identical uploads
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     
     def __str__(self):
         return self.title
+    
+    def compute_content_hash(self) -> str:
+        """Hash the uploaded file contents in chunks."""
+        digest = hashlib.sha256()
+        self.file.open('rb')
+        try:
+            for chunk in self.file.chunks():
+                digest.update(chunk)
+        finally:
+            self.file.close()
+        return digest.hexdigest()
 
 class Clause(models.Model):
     """Model for storing individual clauses extracted from documents."""
@@ -35,17 +49,113 @@ class ClauseAnalysis(models.Model):
     risk_level = models.CharField(max_length=10, choices=RISK_LEVELS, default='low')
     risk_explanation = models.TextField(blank=True)
     keywords = models.JSONField(default=dict)
+    # Risk model that produced risk_level; analyses from older models can be found and redone
+    model_version = models.CharField(max_length=64, blank=True, db_index=True)
+    # Categories and details extracted from the clause text (see clause_features), used by reports
+    features = models.JSONField(default=dict, blank=True)
+    # Whether the report's summary sections include this analysis; new analyses are added on the next report
+    in_report = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"Analysis for {self.clause}"
 
+class ClauseFingerprint(models.Model):
+    """Memoized analysis outputs for a normalized clause text under a given model/version key."""
+    fingerprint = models.CharField(max_length=64)
+    model_key = models.CharField(max_length=64)
+    simplified_explanation = models.TextField()
+    risk_level = models.CharField(max_length=10, choices=ClauseAnalysis.RISK_LEVELS, default='low')
+    risk_explanation = models.TextField(blank=True)
+    keywords = models.JSONField(default=list)
+    context_sources = models.JSONField(default=list)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('fingerprint', 'model_key')
+    
+    def __str__(self):
+        return f"Fingerprint {self.fingerprint[:12]} ({self.hit_count} hits)"
+
 class AnalysisReport(models.Model):
     """Model for storing overall document analysis reports."""
     document = models.OneToOneField(Document, related_name='report', on_delete=models.CASCADE)
     summary = models.TextField()
+    # Average risk (low=0, medium=1, high=2) and per-level counts, kept up to date as analyses are saved
     risk_score = models.FloatField(default=0.0)
+    low_risk_count = models.IntegerField(default=0)
+    medium_risk_count = models.IntegerField(default=0)
+    high_risk_count = models.IntegerField(default=0)
+    analyzed_count = models.IntegerField(default=0)
+    # FEATURES_VERSION the stored summary sections were built from; 0 until they are built
+    sections_version = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"Report for {self.document}"
+    
+    @property
+    def risk_percent(self) -> float:
+        """Risk score mapped onto 0-100 for the risk meter."""
+        return min(100, max(0, round(float(self.risk_score or 0) * 50.0, 2)))
+
+class ReportSection(models.Model):
+    """One section of a report's executive summary, with the entries of the clauses it covers.
+    Sections are recomposed one at a time when the clauses they cover change.
+    """
+    report = models.ForeignKey(AnalysisReport, related_name='sections', on_delete=models.CASCADE)
+    key = models.CharField(max_length=32)
+    # Entry of each clause in the section (see summary_sections.clause_entry), keyed by clause position
+    clauses = models.JSONField(default=dict)
+    text = models.TextField(blank=True)
+    
+    class Meta:
+        unique_together = ('report', 'key')
+    
+    def __str__(self):
+        return f"{self.key} section of {self.report}"
+    
+    def entries(self) -> list:
+        """Entries of the section's clauses in document order."""
+        return [self.clauses[position] for position in sorted(self.clauses, key=int)]
+
+class AnalysisJob(models.Model):
+    """Queued document analysis, run by the run_analysis_worker management command."""
+    STATUSES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+    ACTIVE_STATUSES = ('queued', 'running')
+    
+    document = models.ForeignKey(Document, related_name='jobs', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUSES, default='queued', db_index=True)
+    total_steps = models.IntegerField(default=0)
+    completed_steps = models.IntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Renewed by the worker as it reports progress; a running job without a recent heartbeat is requeued
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"Job {self.pk} for {self.document} ({self.status})"
+    
+    @property
+    def progress(self) -> float:
+        """Completion percentage (0-100)."""
+        if self.status == 'succeeded':
+            return 100.0
+        if not self.total_steps:
+            return 0.0
+        return round(100.0 * self.completed_steps / self.total_steps, 2)
@@ -0,0 +1,97 @@
+import time
+import fitz  # PyMuPDF
+import pdfplumber
+from collections import Counter
+from typing import List, Dict, Any, Tuple, Iterator, Optional
+
+
+class PageExtractor:
+    """Per-page PDF text extraction shared by the document analyzer and the RAG loader.
+
+    Every page is read with PyMuPDF (fast); pdfplumber (slower but more accurate) is only
+    opened for pages where PyMuPDF raises or returns no text. The backend and time taken
+    for each page are recorded in self.stats.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.stats: List[Dict[str, Any]] = []
+        self._plumber = None
+
+    def _plumber_page_text(self, page_num: int) -> str:
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(self.file_path)
+        return self._plumber.pages[page_num].extract_text() or ""
+
+    def _page_count(self, doc) -> int:
+        if doc is not None:
+            return len(doc)
+        self._plumber = pdfplumber.open(self.file_path)
+        return len(self._plumber.pages)
+
+    def iter_pages(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (page_number, text) for pages [start, stop), holding one page in memory at a time."""
+        try:
+            doc = fitz.open(self.file_path)
+        except Exception as e:
+            print(f"Error with PyMuPDF: {e}")
+            doc = None
+        try:
+            try:
+                page_count = self._page_count(doc)
+            except Exception as e2:
+                print(f"Error with pdfplumber: {e2}")
+                raise Exception(f"Failed to extract text from PDF: {e2}")
+            if stop is not None:
+                page_count = min(stop, page_count)
+            for page_num in range(start, page_count):
+                started = time.perf_counter()
+                text = None
+                backend = 'pymupdf'
+                if doc is not None:
+                    try:
+                        text = doc.load_page(page_num).get_text()
+                    except Exception as e:
+                        print(f"Error with PyMuPDF on page {page_num + 1}: {e}")
+                if not text or not text.strip():
+                    try:
+                        fallback_text = self._plumber_page_text(page_num)
+                        if fallback_text.strip() or text is None:
+                            text = fallback_text
+                            backend = 'pdfplumber'
+                    except Exception as e2:
+                        print(f"Error with pdfplumber on page {page_num + 1}: {e2}")
+                        if text is None:
+                            raise Exception(f"Failed to extract text from PDF: {e2}")
+                self.stats.append({
+                    'page_number': page_num + 1,
+                    'backend': backend,
+                    'seconds': time.perf_counter() - started,
+                    'chars': len(text),
+                })
+                yield page_num + 1, text
+        finally:
+            if doc is not None:
+                doc.close()
+            if self._plumber is not None:
+                self._plumber.close()
+                self._plumber = None
+
+
+def summarize_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-page extraction stats into page counts and time per backend."""
+    backends = Counter(s['backend'] for s in stats)
+    seconds = Counter()
+    for s in stats:
+        seconds[s['backend']] += s['seconds']
+    return {
+        'pages': len(stats),
+        'pages_by_backend': dict(backends),
+        'seconds_by_backend': dict(seconds),
+        'total_seconds': sum(seconds.values()),
+    }
+
+
+def extract_pdf_text(file_path: str, separator: str = "") -> str:
+    """Extract the text of a whole PDF with per-page fallback."""
+    return separator.join(text for _, text in PageExtractor(file_path).iter_pages())
@@ -1,85 +1,115 @@
-import re
+import bisect
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import fitz  # PyMuPDF
-import pdfplumber
-from typing import List, Dict, Any, Tuple
+from django.conf import settings
+from typing import List, Dict, Any, Tuple, Iterator, Optional
+from .page_extraction import PageExtractor, summarize_stats
+from .clause_segmenter import segment_clauses, segment_paragraphs
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> Tuple[List[Tuple[int, str]], List[Dict[str, Any]]]:
+    """Extract pages [start, stop) in a pool worker, which opens the file itself."""
+    extractor = PageExtractor(file_path)
+    pages = list(extractor.iter_pages(start, stop))
+    return pages, extractor.stats
+
 
 class PDFProcessor:
     """Class for processing PDF documents and extracting clauses."""
     
-    def __init__(self, file_path: str):
-        """Initialize with the path to the PDF file."""
+    def __init__(self, file_path: str, workers: Optional[int] = None):
+        """Initialize with the path to the PDF file.
+        workers > 1 extracts large documents across a process pool (defaults to settings.PDF_EXTRACTION_WORKERS).
+        """
         self.file_path = file_path
-        
+        # Per-page backend and timing stats of the last extraction
+        self.page_stats: List[Dict[str, Any]] = []
+        self.workers = settings.PDF_EXTRACTION_WORKERS if workers is None else workers
+        self.parallel_min_pages = settings.PDF_PARALLEL_MIN_PAGES
+    
+    def _page_ranges(self) -> List[Tuple[int, int]]:
+        """Page ranges to hand to the process pool, or [] if the document should be read inline."""
+        if self.workers <= 1:
+            return []
+        try:
+            with fitz.open(self.file_path) as doc:
+                page_count = len(doc)
+        except Exception:
+            return []
+        if page_count < self.parallel_min_pages:
+            return []
+        # A few ranges per worker keeps the pool balanced when some pages are slower than others
+        step = max(1, -(-page_count // (self.workers * 4)))
+        return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    
+    def _iter_page_texts(self) -> Iterator[Tuple[int, str]]:
+        """Yield (page_number, text) for each page, in page order."""
+        self.page_stats = []
+        ranges = self._page_ranges()
+        if not ranges:
+            extractor = PageExtractor(self.file_path)
+            extractor.stats = self.page_stats
+            yield from extractor.iter_pages()
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            starts, stops = zip(*ranges)
+            # executor.map returns results in submission order, i.e. page order
+            for pages, stats in executor.map(_extract_page_range, repeat(self.file_path), starts, stops):
+                self.page_stats.extend(stats)
+                yield from pages
+    
+    def iter_pages(self) -> Iterator[Tuple[int, str, int]]:
+        """Yield (page_number, text, char_offset) per page.
+        char_offset is the position of the page's first character in the text returned by extract_text.
+        """
+        offset = 0
+        for page_number, text in self._iter_page_texts():
+            yield page_number, text, offset
+            offset += len(text)
+    
     def extract_text(self) -> str:
         """Extract all text from the PDF document."""
-        text = ""
-        try:
-            # Using PyMuPDF (faster but sometimes less accurate)
-            doc = fitz.open(self.file_path)
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text += page.get_text()
-            doc.close()
-        except Exception as e:
-            print(f"Error with PyMuPDF: {e}")
-            # Fallback to pdfplumber (slower but more accurate)
-            try:
-                with pdfplumber.open(self.file_path) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() or ""
-            except Exception as e2:
-                print(f"Error with pdfplumber: {e2}")
-                raise Exception(f"Failed to extract text from PDF: {e2}")
-        
-        return text
+        return "".join(text for _, text, _ in self.iter_pages())
+    
+    def _read_pages(self) -> Tuple[str, List[int], List[int]]:
+        """Read the document once, returning its text with the start offset and number of every page."""
+        parts = []
+        page_offsets = []
+        page_numbers = []
+        for page_number, text, offset in self.iter_pages():
+            parts.append(text)
+            page_offsets.append(offset)
+            page_numbers.append(page_number)
+        return "".join(parts), page_offsets, page_numbers
+    
+    @staticmethod
+    def _page_at(offset: int, page_offsets: List[int], page_numbers: List[int]) -> int:
+        """Map a character offset in the document text to its page number."""
+        if not page_offsets:
+            return 1
+        return page_numbers[max(0, bisect.bisect_right(page_offsets, offset) - 1)]
     
     def extract_clauses(self) -> List[Dict[str, Any]]:
-        """Extract clauses from the PDF document."""
-        text = self.extract_text()
-        clauses = []
+        """Extract clauses from the PDF document in document order."""
+        text, page_offsets, page_numbers = self._read_pages()
         
-        # Extract clauses based on patterns (this is a simplified approach)
-        # In a real implementation, you might use more sophisticated NLP techniques
+        # Split on clause headings in one pass; fall back to paragraphs if there are none
+        segments = segment_clauses(text) or segment_paragraphs(text)
         
-        # Simple pattern: numbered sections, paragraphs, or clauses
-        patterns = [
-            r'(\d+\.\s+[A-Z][^.]+\.)',  # Numbered sections: "1. TERM."
-            r'(Section\s+\d+\.\s+[^.]+\.)',  # Section headers: "Section 1. Term."
-            r'(\([a-z]\)\s+[^.]+\.)',  # Lettered clauses: "(a) This is a clause."
-            r'(ARTICLE\s+[IVX]+\.\s+[^.]+\.)'  # Article headers: "ARTICLE I. DEFINITIONS."
+        return [
+            {
+                'text': segment['text'],
+                'page_number': self._page_at(segment['start'], page_offsets, page_numbers),
+                'position': position,
+                'start_offset': segment['start'],
+                'end_offset': segment['end']
+            }
+            for position, segment in enumerate(segments)
         ]
-        
-        page_num = 1  # Default to page 1 if we can't determine actual page
-        position = 0
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.MULTILINE)
-            for match in matches:
-                clause_text = match.group(0)
-                # Try to get more context by including the next paragraph
-                next_text = text[match.end():match.end() + 500]
-                if next_text:
-                    clause_text += " " + next_text
-                
-                clauses.append({
-                    'text': clause_text.strip(),
-                    'page_number': page_num,
-                    'position': position
-                })
-                position += 1
-        
-        # If no clauses found with patterns, fall back to paragraph splitting
-        if not clauses:
-            paragraphs = re.split(r'\n\s*\n', text)
-            for i, para in enumerate(paragraphs):
-                if len(para.strip()) > 50:  # Only include substantial paragraphs
-                    clauses.append({
-                        'text': para.strip(),
-                        'page_number': page_num,
-                        'position': i
-                    })
-        
-        return clauses
+    
+    def extraction_stats(self) -> Dict[str, Any]:
+        """Pages and time per backend for the last extraction."""
+        return summarize_stats(self.page_stats)
     
     def get_document_metadata(self) -> Dict[str, Any]:
         """Extract metadata from the PDF document."""
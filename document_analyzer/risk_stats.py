@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Dict, Any, Iterable
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
+from .models import ClauseAnalysis, AnalysisReport
+
+# Weights used for the average risk score: low=0, medium=1, high=2
+RISK_WEIGHTS = {'low': 0, 'medium': 1, 'high': 2}
+
+COUNT_FIELDS = ('low_risk_count', 'medium_risk_count', 'high_risk_count', 'analyzed_count')
+
+
+def risk_score(counts: Dict[str, int]) -> float:
+    """Average risk of the analyses described by per-level counts."""
+    if not counts['analyzed_count']:
+        return 0.0
+    weighted = (
+        RISK_WEIGHTS['medium'] * counts['medium_risk_count']
+        + RISK_WEIGHTS['high'] * counts['high_risk_count']
+    )
+    return weighted / counts['analyzed_count']
+
+
+def aggregate_risk(document_id: int) -> Dict[str, Any]:
+    """Risk counts and average score of a document's analyses in a single aggregate query."""
+    totals = ClauseAnalysis.objects.filter(clause__document_id=document_id).aggregate(
+        low_risk_count=Count('id', filter=Q(risk_level='low')),
+        medium_risk_count=Count('id', filter=Q(risk_level='medium')),
+        high_risk_count=Count('id', filter=Q(risk_level='high')),
+        analyzed_count=Count('id')
+    )
+    totals['risk_score'] = risk_score(totals)
+    return totals
+
+
+def recompute(document_id: int) -> Dict[str, Any]:
+    """Rebuild the stored risk statistics of a document's report from its analyses."""
+    totals = aggregate_risk(document_id)
+    AnalysisReport.objects.filter(document_id=document_id).update(**totals)
+    return totals
+
+
+def record_analyses(analyses: Iterable[ClauseAnalysis]):
+    """Add newly saved analyses to their documents' report statistics.
+    Counts are incremented with F() expressions, so concurrent writers do not lose updates,
+    and a report with an empty summary is created for documents that do not have one yet.
+    """
+    by_document: Dict[int, Counter] = {}
+    for analysis in analyses:
+        by_document.setdefault(analysis.clause.document_id, Counter())[analysis.risk_level] += 1
+
+    for document_id, levels in by_document.items():
+        AnalysisReport.objects.get_or_create(document_id=document_id, defaults={'summary': ''})
+        # The SET clause sees the old column values, so the score is computed from the new totals directly
+        medium = F('medium_risk_count') + levels['medium']
+        high = F('high_risk_count') + levels['high']
+        analyzed = F('analyzed_count') + sum(levels.values())
+        AnalysisReport.objects.filter(document_id=document_id).update(
+            low_risk_count=F('low_risk_count') + levels['low'],
+            medium_risk_count=medium,
+            high_risk_count=high,
+            analyzed_count=analyzed,
+            risk_score=(
+                Cast(RISK_WEIGHTS['medium'] * medium + RISK_WEIGHTS['high'] * high, FloatField())
+                / Cast(analyzed, FloatField())
+            )
+        )
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Document, Clause, ClauseAnalysis, AnalysisReport
+from .models import Document, Clause, ClauseAnalysis, AnalysisReport, AnalysisJob
 
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,13 +16,14 @@ class ClauseAnalysisSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClauseAnalysis
         fields = ['id', 'clause', 'simplified_explanation', 'risk_level', 
-                  'risk_explanation', 'keywords', 'created_at']
+                  'risk_explanation', 'keywords', 'model_version', 'created_at']
         read_only_fields = ['created_at']
 
 class AnalysisReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = AnalysisReport
-        fields = ['id', 'document', 'summary', 'risk_score', 'created_at']
+        fields = ['id', 'document', 'summary', 'risk_score', 'low_risk_count', 'medium_risk_count',
+                  'high_risk_count', 'analyzed_count', 'created_at']
         read_only_fields = ['created_at']
 
 class DocumentDetailSerializer(serializers.ModelSerializer):
@@ -32,4 +33,13 @@ class DocumentDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
         fields = ['id', 'title', 'file', 'uploaded_at', 'processed', 'clauses', 'report']
-        read_only_fields = ['uploaded_at', 'processed'] 
\ No newline at end of file
+        read_only_fields = ['uploaded_at', 'processed']
+
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = AnalysisJob
+        fields = ['id', 'document', 'status', 'progress', 'total_steps', 'completed_steps',
+                  'message', 'result', 'error', 'attempts', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
@@ -0,0 +1,187 @@
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from .explanation_rules import SUMMARY_CATEGORIES
+
+# Executive summary sections in the order they appear; 'other' holds clauses in none of SUMMARY_CATEGORIES.
+# Each section is rendered from the entries of its own clauses only, so sections can be stored and
+# recomposed one at a time when some clauses change.
+SECTION_KEYS = SUMMARY_CATEGORIES + ['other']
+
+# Clause details mentioned by the sections
+DETAIL_KEYS = ('notice_period', 'amount', 'duration', 'location')
+
+Entry = Dict[str, Any]
+
+EMPTY_SUMMARY = "This document contains multiple legal clauses. Please review each section carefully."
+
+
+def clause_entry(features: Dict[str, Any]) -> Tuple[List[str], Entry]:
+	"""Sections a clause belongs to, and the entry (JSON-serializable) it contributes to each of them.
+	A clause can belong to several sections, as clauses can have multiple aspects.
+	"""
+	found = features['summary_categories']
+	sections = [category for category in SUMMARY_CATEGORIES if category in found] or ['other']
+	entry = {'found': list(found)}
+	entry.update({key: features[key] for key in DETAIL_KEYS if features.get(key)})
+	return sections, entry
+
+
+def unique(items: Iterable[str]) -> List[str]:
+	"""Items without duplicates, in order of first appearance."""
+	return list(dict.fromkeys(items))
+
+
+def _termination(entries: List[Entry]) -> str:
+	termination_details = []
+	for entry in entries:
+		if 'immediate_termination' in entry['found']:
+			termination_details.append("immediate termination without notice")
+		elif 'notice_termination' in entry['found']:
+			notice_period = entry.get('notice_period')
+			if notice_period:
+				termination_details.append(f"termination with {notice_period} notice")
+			else:
+				termination_details.append("termination with advance notice")
+	if termination_details:
+		return f"**Termination:** The agreement can be ended {', or '.join(unique(termination_details))}."
+	return "**Termination:** The document includes terms for how and when the agreement can be terminated."
+
+
+def _payment(entries: List[Entry]) -> str:
+	payment_details = []
+	for entry in entries:
+		if entry.get('amount'):
+			payment_details.append(entry['amount'])
+		if 'monthly' in entry['found']:
+			payment_details.append("monthly payments")
+		if 'annual' in entry['found']:
+			payment_details.append("annual payments")
+	if payment_details:
+		unique_payments = unique(payment_details)[:3]  # Limit to 3 most important
+		return f"**Payment Terms:** The agreement specifies {', '.join(unique_payments)}."
+	return "**Payment Terms:** The document includes detailed payment terms, amounts, and schedules."
+
+
+def _confidentiality(entries: List[Entry]) -> str:
+	conf_details = [f"confidentiality obligations for {entry['duration']}" for entry in entries if entry.get('duration')]
+	if conf_details:
+		return f"**Confidentiality:** Both parties must keep sensitive information private. {', '.join(conf_details)}."
+	return "**Confidentiality:** The document requires both parties to maintain confidentiality of sensitive information."
+
+
+def _liability(entries: List[Entry]) -> str:
+	liability_details = []
+	for entry in entries:
+		if 'limited' in entry['found']:
+			liability_details.append("limited liability")
+		if 'waiver' in entry['found']:
+			liability_details.append("liability waivers")
+	if liability_details:
+		return f"**Liability:** The document includes {', '.join(unique(liability_details))} provisions."
+	return "**Liability:** The document specifies the responsibilities and liabilities of each party."
+
+
+def _dispute_resolution(entries: List[Entry]) -> str:
+	for entry in entries:
+		if 'arbitration' in entry['found']:
+			return "**Dispute Resolution:** Disagreements will be resolved through arbitration instead of court proceedings."
+		elif 'court' in entry['found']:
+			return "**Dispute Resolution:** Disagreements will be resolved through court proceedings."
+	return "**Dispute Resolution:** The document specifies how disputes will be resolved between the parties."
+
+
+def _non_compete(entries: List[Entry]) -> str:
+	nc_details = [f"{entry['duration']} restriction" for entry in entries if entry.get('duration')]
+	if nc_details:
+		return f"**Non-Compete:** The agreement restricts one party from competing for {', '.join(nc_details)} after termination."
+	return "**Non-Compete:** The document includes restrictions on competitive activities."
+
+
+def _governing_law(entries: List[Entry]) -> str:
+	# Only the first location is mentioned; without one the section is left out, and a document
+	# without governing law clauses gets the generic sentence
+	if not entries:
+		return "**Governing Law:** The document specifies which jurisdiction's laws apply to this agreement."
+	for entry in entries:
+		if entry.get('location'):
+			return f"**Governing Law:** The laws of {entry['location']} will govern this agreement."
+	return ""
+
+
+def _other(entries: List[Entry]) -> str:
+	# Try to identify other important clauses
+	other_important = []
+	for entry in entries[:5]:  # Check first 5 other clauses
+		found = entry['found']
+		if 'severability' in found:
+			other_important.append("severability")
+		if 'entire_agreement' in found:
+			other_important.append("entire agreement")
+		if 'notice' in found and 'termination_term' not in found:
+			other_important.append("notice requirements")
+		if 'assignment' in found:
+			other_important.append("assignment rights")
+	if other_important:
+		return f"**Additional Terms:** The document also includes {', '.join(unique(other_important))} provisions."
+	return ""
+
+
+def _fixed(text: str) -> Callable[[List[Entry]], str]:
+	return lambda entries: text
+
+
+SECTION_RENDERERS: Dict[str, Callable[[List[Entry]], str]] = {
+	'termination': _termination,
+	'payment': _payment,
+	'confidentiality': _confidentiality,
+	'indemnification': _fixed(
+		"**Indemnification:** One party agrees to compensate the other party for losses or damages arising from this agreement."),
+	'liability': _liability,
+	'dispute_resolution': _dispute_resolution,
+	'non_compete': _non_compete,
+	'intellectual_property': _fixed(
+		"**Intellectual Property:** The document specifies ownership rights for ideas, inventions, or creative work."),
+	'governing_law': _governing_law,
+	'amendment': _fixed(
+		"**Amendments:** The document explains how the agreement can be modified or updated in the future."),
+	'force_majeure': _fixed(
+		"**Force Majeure:** The document includes provisions for circumstances beyond either party's control (such as natural disasters)."),
+	'other': _other,
+}
+
+
+def render_section(key: str, entries: List[Entry]) -> str:
+	"""Text of a summary section given the entries of its clauses in document order ("" to leave it out)."""
+	if not entries and key != 'governing_law':
+		return ""
+	return SECTION_RENDERERS[key](entries)
+
+
+def compose(total_clauses: int, texts: Dict[str, str]) -> str:
+	"""Join the rendered sections into the executive summary, with the overview and risk considerations."""
+	summary_points = [
+		f"**Document Overview:** This document is a legal agreement containing {total_clauses} clause{'s' if total_clauses != 1 else ''}."
+	]
+	summary_points.extend(texts[key] for key in SECTION_KEYS if texts.get(key))
+	if texts.get('indemnification') or texts.get('liability'):
+		summary_points.append("**Risk Considerations:** This document contains indemnification and liability clauses that may have significant financial implications.")
+	# Join all points with double newlines for proper paragraph separation
+	return "\n\n".join(summary_points)
+
+
+def group_entries(clause_features: Iterable[Dict[str, Any]]) -> Dict[str, List[Entry]]:
+	"""Entries of each section, in document order, for the features of all clauses."""
+	grouped: Dict[str, List[Entry]] = {key: [] for key in SECTION_KEYS}
+	for features in clause_features:
+		sections, entry = clause_entry(features)
+		for key in sections:
+			grouped[key].append(entry)
+	return grouped
+
+
+def summarize(clause_features: List[Dict[str, Any]]) -> str:
+	"""Executive summary of a document from the features of its clauses, in document order."""
+	if not clause_features:
+		return EMPTY_SUMMARY
+	grouped = group_entries(clause_features)
+	return compose(len(clause_features), {key: render_section(key, entries) for key, entries in grouped.items()})
@@ -2,9 +2,46 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+import fitz
 
-from .models import Document, Clause, ClauseAnalysis, AnalysisReport
+from .models import Document, Clause, ClauseAnalysis, AnalysisReport, ClauseFingerprint, AnalysisJob
+from .jobs import active_job, claim_next_job, enqueue_analysis, run_worker
+from . import clause_memo, risk_stats, summary_sections
 from .document_service import DocumentService
+from legal_classifier.risk_classifier import classify_clauses_risk, risk_classifier, risk_model_version
+from .pdf_processor import PDFProcessor
+from .page_extraction import PageExtractor
+from .clause_segmenter import segment_clauses, segment_paragraphs
+from .generation_worker import GenerationWorker
+from .analysis_executor import ClauseAnalysisExecutor
+from . import explanation_rules
+from .clause_features import FEATURES_VERSION, extract_clause_features
+from .llm_processor import LLMProcessor, build_explanation_prompt
+from legaldoc_ai.lazy import LazyEngine, warm_engines
+
+
+def make_pdf(pages):
+    """Write a PDF with one page per string in pages and return its path."""
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    os.close(fd)
+    doc = fitz.open()
+    for page_text in pages:
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(72, 72, 540, 770), page_text, fontsize=10)
+    doc.save(path)
+    doc.close()
+    return path
 
 class DocumentModelTests(TestCase):
     """Tests for the Document model."""
@@ -128,6 +165,235 @@ class DocumentServiceTests(TestCase):
             # Restore the original function
             DocumentService.process_document = original_process_document
 
+class DuplicateUploadTests(TestCase):
+    """Tests for reusing results of byte-identical uploads."""
+    
+    def setUp(self):
+        """Create an analyzed document."""
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.original = Document.objects.create(
+            title='NDA',
+            file=SimpleUploadedFile('nda.pdf', b'Same NDA bytes'),
+            user=self.user,
+            processed=True
+        )
+        self.original.content_hash = self.original.compute_content_hash()
+        self.original.save()
+        for position, level in enumerate(['high', 'low']):
+            clause = Clause.objects.create(
+                document=self.original, text=f'Clause {position}', page_number=1, position=position
+            )
+            ClauseAnalysis.objects.create(
+                clause=clause, simplified_explanation='Plain', risk_level=level,
+                risk_explanation='Why', keywords=['waive']
+            )
+        AnalysisReport.objects.create(document=self.original, summary='Summary', risk_score=1.0)
+    
+    def test_identical_upload_is_cloned(self):
+        """A byte-identical upload copies clauses, analyses and report without parsing."""
+        duplicate = Document.objects.create(
+            title='NDA again',
+            file=SimpleUploadedFile('nda-copy.pdf', b'Same NDA bytes'),
+            user=self.user
+        )
+        with mock.patch('document_analyzer.document_service.process_document') as parse:
+            result = DocumentService.analyze_document(duplicate.id)
+        parse.assert_not_called()
+        self.assertEqual(result['clauses_processed'], 2)
+        duplicate.refresh_from_db()
+        self.assertTrue(duplicate.processed)
+        self.assertEqual(duplicate.content_hash, self.original.content_hash)
+        self.assertEqual(
+            list(duplicate.clauses.order_by('position').values_list('text', 'analysis__risk_level')),
+            [('Clause 0', 'high'), ('Clause 1', 'low')]
+        )
+        self.assertEqual(duplicate.report.summary, 'Summary')
+    
+    def test_different_upload_is_not_cloned(self):
+        """Different content is processed normally."""
+        other = Document.objects.create(
+            title='Other', file=SimpleUploadedFile('other.pdf', b'Other bytes'), user=self.user
+        )
+        other.content_hash = other.compute_content_hash()
+        self.assertIsNone(DocumentService.find_duplicate(other))
+
+class BulkWriteTests(TestCase):
+    """Tests for batched persistence of clauses and analyses."""
+    
+    def setUp(self):
+        """Create an unprocessed document."""
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.document = Document.objects.create(
+            title='Long contract', file=SimpleUploadedFile('long.pdf', b'Long contract bytes'), user=self.user
+        )
+    
+    def count_inserts(self, queries, table):
+        return sum(1 for q in queries if q['sql'].startswith(f'INSERT INTO "{table}"'))
+    
+    @override_settings(ANALYSIS_BULK_BATCH_SIZE=50)
+    def test_clauses_and_analyses_are_bulk_inserted(self):
+        """120 clauses are written in batches of 50 rather than one INSERT per row."""
+        extracted = [
+            {'text': f'Clause {i} of the agreement.', 'page_number': 1, 'position': i} for i in range(120)
+        ]
+        engine_result = {
+            'simplified_explanation': 'Plain', 'risk_level': 'low', 'risk_explanation': '',
+            'keywords': [], 'context_sources': []
+        }
+        with mock.patch('document_analyzer.document_service.process_document', return_value=extracted), \
+                mock.patch('document_analyzer.document_service.get_legal_context_for_clauses',
+                           side_effect=lambda texts: [{} for _ in texts]), \
+                mock.patch.object(DocumentService, '_run_engines', return_value=engine_result), \
+                mock.patch.object(DocumentService, 'generate_document_report', return_value={'success': True}), \
+                CaptureQueriesContext(connection) as ctx:
+            DocumentService.analyze_document(self.document.id)
+        self.assertEqual(self.count_inserts(ctx.captured_queries, 'document_analyzer_clause'), 3)
+        self.assertEqual(self.count_inserts(ctx.captured_queries, 'document_analyzer_clauseanalysis'), 3)
+        self.assertEqual(ClauseAnalysis.objects.filter(clause__document=self.document).count(), 120)
+        self.assertEqual(
+            list(self.document.clauses.order_by('position').values_list('position', flat=True)), list(range(120))
+        )
+
+class QueryCountTests(TestCase):
+    """Query-count regression tests: report paths must not issue a query per clause."""
+    
+    CLAUSES = 500
+    
+    def setUp(self):
+        """Create a processed document with 500 analyzed clauses."""
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.document = Document.objects.create(
+            title='Big contract', file=SimpleUploadedFile('big.pdf', b'Big contract bytes'),
+            user=self.user, processed=True
+        )
+        clauses = Clause.objects.bulk_create([
+            Clause(document=self.document, text=f'Clause {i} text.', page_number=1, position=i)
+            for i in range(self.CLAUSES)
+        ])
+        ClauseAnalysis.objects.bulk_create([
+            ClauseAnalysis(
+                clause=clause, simplified_explanation='Plain', risk_level=('low', 'medium', 'high')[i % 3],
+                risk_explanation='Why', keywords=[], features=extract_clause_features(clause.text)
+            )
+            for i, clause in enumerate(clauses)
+        ])
+    
+    def test_generate_report_query_count(self):
+        """Report generation uses a fixed number of queries regardless of clause count."""
+        with self.assertNumQueries(11):
+            result = DocumentService.generate_document_report(self.document.id)
+        self.assertEqual(result['analyses_count'], self.CLAUSES)
+        # 167 low (0), 167 medium (1), 166 high (2)
+        self.assertAlmostEqual(result['risk_score'], (166 * 2 + 167) / self.CLAUSES)
+        
+        # Regenerating without changes reuses the stored summary
+        with self.assertNumQueries(5):
+            again = DocumentService.generate_document_report(self.document.id)
+        self.assertEqual(again['summary'], result['summary'])
+        self.assertEqual(again['analyses_count'], self.CLAUSES)
+    
+    def test_report_view_query_count(self):
+        """The report page joins analyses instead of fetching them per clause."""
+        AnalysisReport.objects.create(document=self.document, summary='Summary', risk_score=1.0)
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('document_analyzer:analysis_report', kwargs={'pk': self.document.pk}))
+        self.assertEqual(len(response.context['high_risk_clauses']), 166)
+        self.assertEqual(len(response.context['medium_risk_clauses']), 167)
+    
+    def test_detail_view_query_count(self):
+        """The detail page loads clauses with their analyses in one query."""
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('document_analyzer:document_detail', kwargs={'pk': self.document.pk}))
+        self.assertContains(response, 'High Risk', count=166)
+
+class RiskStatsTests(TestCase):
+    """Tests for the per-document risk statistics stored on AnalysisReport."""
+    
+    def setUp(self):
+        """Create a document with five clauses."""
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.document = Document.objects.create(
+            title='Lease', file=SimpleUploadedFile('lease.pdf', b'Lease bytes'), user=self.user, processed=True
+        )
+        self.clauses = Clause.objects.bulk_create([
+            Clause(document=self.document, text=f'Clause {i}', page_number=1, position=i) for i in range(5)
+        ])
+    
+    def save_analyses(self, clauses, levels):
+        DocumentService._save_analyses([
+            ClauseAnalysis(clause=clause, simplified_explanation='Plain', risk_level=level,
+                           risk_explanation='', keywords=[])
+            for clause, level in zip(clauses, levels)
+        ])
+    
+    def test_counts_are_updated_incrementally(self):
+        """Each batch of saved analyses is added to the report counts and score."""
+        self.save_analyses(self.clauses[:2], ['high', 'low'])
+        report = AnalysisReport.objects.get(document=self.document)
+        self.assertEqual(report.summary, '')
+        self.assertEqual((report.high_risk_count, report.low_risk_count, report.analyzed_count), (1, 1, 2))
+        self.assertAlmostEqual(report.risk_score, 1.0)
+        
+        self.save_analyses(self.clauses[2:], ['medium', 'medium', 'low'])
+        report.refresh_from_db()
+        expected = risk_stats.aggregate_risk(self.document.id)
+        self.assertEqual({field: getattr(report, field) for field in expected}, expected)
+        self.assertAlmostEqual(report.risk_score, 4 / 5)
+        self.assertEqual(report.risk_percent, 40.0)
+    
+    def test_report_view_generates_summary_for_incremental_report(self):
+        """A report holding only counts is completed with a summary when viewed."""
+        self.save_analyses(self.clauses, ['low'] * 5)
+        response = self.client.get(reverse('document_analyzer:analysis_report', kwargs={'pk': self.document.pk}))
+        self.assertTrue(response.context['report'].summary.startswith('**Document Overview:**'))
+        self.assertContains(response, 'Low Risk (5)')
+
+class ClauseMemoTests(TestCase):
+    """Tests for memoizing clause analyses across documents."""
+    
+    def setUp(self):
+        """Create two documents sharing a boilerplate clause."""
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.clauses = []
+        for i, text in enumerate([
+            'This Agreement constitutes the entire agreement between the parties.',
+            'This Agreement  constitutes the entire\nagreement between the parties.',
+        ]):
+            document = Document.objects.create(
+                title=f'Doc {i}', file=SimpleUploadedFile(f'doc{i}.pdf', b'%d' % i), user=self.user
+            )
+            self.clauses.append(Clause.objects.create(document=document, text=text, page_number=1, position=0))
+    
+    def test_repeated_clause_skips_engines(self):
+        """A clause with the same normalized text reuses the stored outputs."""
+        with mock.patch('document_analyzer.document_service.classify_clauses_risk',
+                        wraps=classify_clauses_risk) as classify:
+            first = DocumentService.analyze_clause(self.clauses[0].id)
+            second = DocumentService.analyze_clause(self.clauses[1].id)
+        self.assertEqual([len(call.args[0]) for call in classify.call_args_list], [1, 0])
+        self.assertTrue(second['success'])
+        self.assertEqual(first['explanation'], second['explanation'])
+        self.assertEqual(first['risk_level'], second['risk_level'])
+        self.assertEqual(ClauseFingerprint.objects.get().hit_count, 1)
+        stats = clause_memo.memo_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+    
+    def test_model_key_change_invalidates(self):
+        """Results memoized under another model key are not reused."""
+        DocumentService.analyze_clause(self.clauses[0].id)
+        with self.settings(LLM_MODEL='another-model'):
+            self.assertEqual(clause_memo.lookup([clause_memo.clause_fingerprint(self.clauses[1].text)], clause_memo.model_key()), {})
+    
+    def test_risk_model_version_is_recorded_and_keys_memo(self):
+        """Analyses record the risk model version, and a new version invalidates memoized results."""
+        DocumentService.analyze_clause(self.clauses[0].id)
+        analysis = ClauseAnalysis.objects.get(clause=self.clauses[0])
+        self.assertEqual(analysis.model_version, risk_model_version())
+        with mock.patch('document_analyzer.clause_memo.risk_model_version', return_value='nb-retrained'):
+            self.assertEqual(clause_memo.lookup([clause_memo.clause_fingerprint(self.clauses[1].text)], clause_memo.model_key()), {})
+
 class ViewTests(TestCase):
     """Tests for views."""
     
@@ -168,3 +434,567 @@ class ViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Test Document')
         self.assertContains(response, 'This is a test clause.')
+
+class PDFProcessorTests(TestCase):
+    """Tests for PDF text extraction and clause segmentation."""
+    
+    def setUp(self):
+        """Create a three page contract."""
+        self.path = make_pdf([
+            "1. Term. This agreement starts today.\nIt continues for one year.",
+            "2. Payment. Fees are due monthly.",
+            "3. Termination. Either party may terminate on notice.",
+        ])
+        self.addCleanup(os.remove, self.path)
+    
+    def test_iter_pages_yields_offsets(self):
+        """Pages are yielded in order with offsets into the extracted text."""
+        processor = PDFProcessor(self.path)
+        pages = list(processor.iter_pages())
+        text = processor.extract_text()
+        self.assertEqual([p[0] for p in pages], [1, 2, 3])
+        for page_number, page_text, offset in pages:
+            self.assertEqual(text[offset:offset + len(page_text)], page_text)
+    
+    def test_clauses_record_real_page_numbers(self):
+        """Each clause carries the page its heading appears on."""
+        clauses = PDFProcessor(self.path).extract_clauses()
+        pages = {c['text'].split('.')[1].strip(): c['page_number'] for c in clauses}
+        self.assertEqual(pages, {'Term': 1, 'Payment': 2, 'Termination': 3})
+    
+    def test_parallel_extraction_matches_inline(self):
+        """The process pool returns the same pages, in order, as inline extraction."""
+        parallel = PDFProcessor(self.path, workers=2)
+        parallel.parallel_min_pages = 2
+        self.assertEqual(len(parallel._page_ranges()), 3)
+        self.assertEqual(list(parallel.iter_pages()), list(PDFProcessor(self.path, workers=1).iter_pages()))
+        self.assertEqual([s['page_number'] for s in parallel.page_stats], [1, 2, 3])
+    
+    def test_failed_page_falls_back_alone(self):
+        """Only the page PyMuPDF fails on is re-read with pdfplumber."""
+        original_get_text = fitz.Page.get_text
+        
+        def flaky_get_text(page, *args, **kwargs):
+            if page.number == 1:
+                raise RuntimeError('broken page')
+            return original_get_text(page, *args, **kwargs)
+        
+        extractor = PageExtractor(self.path)
+        with mock.patch.object(fitz.Page, 'get_text', flaky_get_text):
+            pages = list(extractor.iter_pages())
+        self.assertIn('Payment', pages[1][1])
+        self.assertEqual([s['backend'] for s in extractor.stats], ['pymupdf', 'pdfplumber', 'pymupdf'])
+
+class ClauseSegmenterTests(TestCase):
+    """Tests for the single-pass clause segmenter."""
+    
+    def test_clauses_are_ordered_and_non_overlapping(self):
+        """Mixed heading styles come back in document order without overlap."""
+        text = (
+            "ARTICLE I. DEFINITIONS.\n"
+            "Terms used here have these meanings:\n"
+            "(a) Services means the work.\n"
+            "(b) Fees means the charges.\n"
+            "Section 2. Payment.\n"
+            "Fees are due monthly.\n"
+            "3. Termination. Either party may terminate with 30 days notice.\n"
+        )
+        segments = segment_clauses(text)
+        self.assertEqual([s['text'].split()[0] for s in segments], ['ARTICLE', '(a)', '(b)', 'Section', '3.'])
+        for previous, current in zip(segments, segments[1:]):
+            self.assertLessEqual(previous['end'], current['start'])
+        for segment in segments:
+            self.assertEqual(text[segment['start']:segment['end']], segment['text'])
+        self.assertTrue(segments[-1]['text'].endswith('30 days notice.'))
+    
+    def test_inline_lettered_subclauses(self):
+        """Lettered subclauses after a colon or semicolon start new clauses."""
+        segments = segment_clauses("The Supplier shall: (a) deliver the goods; (b) invoice monthly.")
+        self.assertEqual([s['text'] for s in segments], ['(a) deliver the goods;', '(b) invoice monthly.'])
+    
+    def test_paragraph_fallback(self):
+        """Text without headings is split into substantial paragraphs."""
+        text = "Short.\n\nThis paragraph is long enough to count as a clause of the agreement.\n"
+        self.assertEqual(segment_clauses(text), [])
+        self.assertEqual(
+            [s['text'] for s in segment_paragraphs(text)],
+            ['This paragraph is long enough to count as a clause of the agreement.']
+        )
+
+class AnalysisJobTests(TestCase):
+    """Tests for the background analysis job queue."""
+    
+    def setUp(self):
+        """Create an unprocessed document."""
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.document = Document.objects.create(
+            title='Lease', file=SimpleUploadedFile('lease.pdf', b'Lease bytes'), user=self.user
+        )
+    
+    def test_enqueue_reuses_active_job(self):
+        """Enqueuing twice while a job is pending returns the same job."""
+        first = enqueue_analysis(self.document)
+        self.assertEqual(enqueue_analysis(self.document).pk, first.pk)
+        AnalysisJob.objects.filter(pk=first.pk).update(status='succeeded')
+        self.assertNotEqual(enqueue_analysis(self.document).pk, first.pk)
+    
+    def test_views_enqueue_without_analyzing(self):
+        """The detail page and analyze API queue a job instead of analyzing inline."""
+        with mock.patch.object(DocumentService, 'analyze_document') as analyze:
+            self.client.get(reverse('document_analyzer:document_detail', kwargs={'pk': self.document.pk}))
+            response = self.client.post(
+                reverse('document_analyzer:api_analyze_document', kwargs={'pk': self.document.pk})
+            )
+        analyze.assert_not_called()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertEqual(AnalysisJob.objects.filter(document=self.document).count(), 1)
+    
+    def test_worker_runs_job_and_records_progress(self):
+        """run_worker claims the queued job, reports progress and stores the result."""
+        job = enqueue_analysis(self.document)
+        
+        def fake_analyze(document_id, progress_callback=None):
+            progress_callback(1, 2, 'Analyzed 1 of 2 clauses.')
+            progress_callback(2, 2, 'Analyzed 2 of 2 clauses.')
+            return {'success': True, 'message': 'Document analyzed successfully'}
+        
+        with mock.patch.object(DocumentService, 'analyze_document', side_effect=fake_analyze):
+            self.assertEqual(run_worker(once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual((job.completed_steps, job.total_steps), (2, 2))
+        self.assertEqual(job.progress, 100.0)
+        self.assertIsNotNone(job.finished_at)
+        
+        response = self.client.get(reverse('document_analyzer:api_job_status', kwargs={'pk': job.pk}))
+        self.assertEqual(response.data['status'], 'succeeded')
+    
+    @override_settings(ANALYSIS_JOB_LEASE=60, ANALYSIS_MAX_ATTEMPTS=2)
+    def test_job_of_dead_worker_is_requeued_then_failed(self):
+        """A running job whose lease expired is no longer active and is requeued until its attempts run out."""
+        job = enqueue_analysis(self.document)
+        expired = timezone.now() - timedelta(seconds=120)
+        for attempt, worker in enumerate(['host:1', 'host:2'], start=1):
+            self.assertEqual(claim_next_job(worker).pk, job.pk)
+            self.assertEqual(active_job(self.document).pk, job.pk)
+            # The worker dies without reporting progress
+            AnalysisJob.objects.filter(pk=job.pk).update(heartbeat_at=expired)
+            self.assertIsNone(active_job(self.document))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('running', attempt))
+        self.assertIsNone(claim_next_job('host:3'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+    
+    @override_settings(ANALYSIS_MAX_ATTEMPTS=2)
+    def test_failing_document_stops_getting_jobs(self):
+        """After ANALYSIS_MAX_ATTEMPTS failed jobs in a row, viewing the document queues no new job."""
+        detail = reverse('document_analyzer:document_detail', kwargs={'pk': self.document.pk})
+        failure = {'success': False, 'message': 'Error processing document: corrupt PDF'}
+        with mock.patch.object(DocumentService, 'analyze_document', return_value=failure) as analyze:
+            for _ in range(4):
+                self.client.get(detail)
+                run_worker(once=True)
+        self.assertEqual(analyze.call_count, 2)
+        self.assertEqual(AnalysisJob.objects.filter(document=self.document).count(), 2)
+        response = self.client.get(detail)
+        self.assertEqual(response.context['job'].status, 'failed')
+        self.assertContains(response, 'corrupt PDF')
+        response = self.client.post(reverse('document_analyzer:api_analyze_document', kwargs={'pk': self.document.pk}))
+        self.assertEqual(response.status_code, 409)
+    
+    def test_partly_analyzed_document_is_not_extracted_again(self):
+        """Jobs queued for a partly analyzed document only analyze its remaining clauses."""
+        extracted = [{'text': text, 'page_number': 1, 'position': i}
+                     for i, text in enumerate(['Clause one.', 'Broken clause.', 'Clause three.'])]
+        engine_result = {
+            'simplified_explanation': 'Plain', 'risk_level': 'low', 'risk_explanation': '',
+            'keywords': [], 'context_sources': []
+        }
+        broken = [True]
+        
+        def run_engines(text, *args):
+            if text == 'Broken clause.' and broken[0]:
+                raise RuntimeError('engine failure')
+            return engine_result
+        
+        detail = reverse('document_analyzer:document_detail', kwargs={'pk': self.document.pk})
+        with mock.patch('document_analyzer.document_service.process_document', return_value=extracted) as parse, \
+                mock.patch('document_analyzer.document_service.get_legal_context_for_clauses',
+                           side_effect=lambda texts: [{} for _ in texts]), \
+                mock.patch.object(DocumentService, '_run_engines', side_effect=run_engines):
+            for _ in range(3):
+                self.client.get(detail)
+                run_worker(once=True)
+                self.assertEqual(self.document.clauses.count(), 3)
+                self.assertEqual(ClauseAnalysis.objects.filter(clause__document=self.document).count(), 2)
+            broken[0] = False
+            self.client.get(detail)
+            run_worker(once=True)
+        parse.assert_called_once()
+        self.assertEqual(self.document.clauses.count(), 3)
+        self.assertEqual(ClauseAnalysis.objects.filter(clause__document=self.document).count(), 3)
+        # Fully analyzed, so viewing the page queues nothing more
+        self.client.get(detail)
+        self.assertFalse(AnalysisJob.objects.filter(document=self.document, status='queued').exists())
+    
+    def test_progress_endpoint(self):
+        """The progress endpoint counts analyzed clauses."""
+        for position in range(2):
+            clause = Clause.objects.create(
+                document=self.document, text=f'Clause {position}', page_number=1, position=position
+            )
+        ClauseAnalysis.objects.create(
+            clause=clause, simplified_explanation='Plain', risk_level='low', risk_explanation='', keywords=[]
+        )
+        response = self.client.get(
+            reverse('document_analyzer:api_document_progress', kwargs={'pk': self.document.pk})
+        )
+        self.assertEqual(response.data['total_clauses'], 2)
+        self.assertEqual(response.data['analyzed_clauses'], 1)
+        self.assertEqual(response.data['progress'], 50.0)
+        self.assertFalse(response.data['completed'])
+
+class LazyEngineTests(TestCase):
+    """Tests for the lazily built engine singletons."""
+    
+    def test_factory_runs_once_across_threads(self):
+        """Concurrent first uses build the engine exactly once and share it."""
+        calls = []
+        barrier = threading.Barrier(8)
+        
+        def factory():
+            calls.append(1)
+            return mock.Mock(version='v1')
+        
+        engine = LazyEngine(factory, 'test engine')
+        self.assertFalse(engine.loaded)
+        results = []
+        
+        def use():
+            barrier.wait()
+            results.append(engine.get())
+        
+        threads = [threading.Thread(target=use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        # Attribute access is forwarded to the engine
+        self.assertEqual(engine.version, 'v1')
+    
+    def test_warm_runs_hook(self):
+        """warm builds the engine and runs its warm-up hook; unknown engine names are rejected."""
+        warmup = mock.Mock()
+        engine = LazyEngine(object, 'test engine', warmup=warmup)
+        instance = engine.warm()
+        warmup.assert_called_once_with(instance)
+        with self.assertRaises(ValueError):
+            warm_engines(['gpu'])
+    
+    def test_importing_service_builds_no_engines(self):
+        """Importing the document service in a fresh process neither builds engines nor imports transformers."""
+        probe = (
+            "import sys, django; django.setup();"
+            "import document_analyzer.document_service;"
+            "from legal_classifier.risk_classifier import risk_classifier;"
+            "from rag_pipeline.rag_processor import rag_processor;"
+            "from document_analyzer.llm_processor import llm_processor;"
+            "print(risk_classifier.loaded, rag_processor.loaded, llm_processor.loaded, 'transformers' in sys.modules)"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='legaldoc_ai.settings')
+        result = subprocess.run(
+            [sys.executable, '-c', probe], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        self.assertEqual(result.stdout.split()[-4:], ['False', 'False', 'False', 'False'], result.stderr)
+
+class ExplanationGenerationTests(TestCase):
+    """Tests for batched LLM explanations on the generation thread."""
+    
+    def make_processor(self, generate):
+        with mock.patch.object(LLMProcessor, '_initialize_llm'):
+            processor = LLMProcessor(generation=False)
+        processor.worker = GenerationWorker(generate, batch_size=4)
+        self.addCleanup(processor.worker.stop)
+        return processor
+    
+    def test_model_is_loaded_only_for_generation(self):
+        """Rule-based explanations load no model; with generation on, the model is loaded once."""
+        with mock.patch.object(LLMProcessor, '_initialize_llm') as initialize:
+            LLMProcessor(generation=False)
+            initialize.assert_not_called()
+            LLMProcessor(generation=True)
+            initialize.assert_called_once()
+    
+    def test_worker_batches_prompts(self):
+        """Queued prompts are generated in batches of at most batch_size, in order."""
+        batches = []
+        
+        def generate(prompts):
+            batches.append(len(prompts))
+            return [prompt.upper() for prompt in prompts]
+        
+        worker = GenerationWorker(generate, batch_size=4)
+        futures = worker.submit_many([f'clause {i}' for i in range(10)])
+        self.assertEqual([f.result(timeout=5) for f in futures], [f'CLAUSE {i}' for i in range(10)])
+        worker.stop()
+        self.assertEqual(sum(batches), 10)
+        self.assertLessEqual(max(batches), 4)
+        self.assertLess(len(batches), 10)
+    
+    def test_explanations_use_grounded_prompts(self):
+        """Generated explanations are returned and prompts include the retrieved passage."""
+        prompts = []
+        
+        def generate(batch):
+            prompts.extend(batch)
+            return [f'Explanation {len(prompts) - len(batch) + i}' for i in range(len(batch))]
+        
+        processor = self.make_processor(generate)
+        context = {'sources': ['kb.txt'], 'relevant_info': ['Indemnity shifts losses to the other party.']}
+        explanations = processor.explain_clauses(['You shall indemnify us.', 'Fees are due monthly.'], [context, None])
+        self.assertEqual(explanations, ['Explanation 0', 'Explanation 1'])
+        self.assertEqual(prompts[0], build_explanation_prompt('You shall indemnify us.', context))
+        self.assertIn('Background: Indemnity shifts losses', prompts[0])
+        self.assertNotIn('Background:', prompts[1])
+    
+    def test_timeout_and_errors_fall_back_to_rules(self):
+        """Clauses not generated in time, or whose generation fails, get the rule-based explanation."""
+        release = threading.Event()
+        
+        def slow_generate(batch):
+            release.wait(5)
+            return ['too late'] * len(batch)
+        
+        processor = self.make_processor(slow_generate)
+        clause = 'Either party may terminate this agreement with 30 days notice.'
+        self.assertEqual(processor.explain_clauses([clause], timeout=0.05), [processor._fallback_explanation(clause)])
+        release.set()
+        
+        def failing_generate(batch):
+            raise RuntimeError('out of memory')
+        
+        processor = self.make_processor(failing_generate)
+        self.assertEqual(processor.explain_clause(clause), processor._fallback_explanation(clause))
+
+class ExplanationRulesTests(TestCase):
+    """Tests for the rule table behind the rule-based explanations."""
+    
+    def test_first_matching_case_of_each_rule(self):
+        """Each rule adds the sentence of its first case whose categories and extractor match."""
+        sentences = explanation_rules.apply_rules(
+            {'notice_period': '30 days', 'amount': '$1,000'},
+            {'termination', 'with_notice', 'payment', 'monthly', 'due'}
+        )
+        self.assertEqual(sentences, [
+            'This clause allows either party to end the agreement by giving 30 days advance notice.',
+            'This clause specifies payment terms: $1,000 monthly and when payment is due.',
+        ])
+        # Without a notice period in the features, the next termination case applies
+        self.assertEqual(
+            explanation_rules.apply_rules({}, {'termination', 'with_notice'}),
+            ['This clause describes how and when the agreement can be ended by either party with advance notice.']
+        )
+    
+    def test_simplify_language_replaces_terms_in_order(self):
+        """Terms are replaced one after another, so earlier replacements shape later ones."""
+        self.assertEqual(
+            explanation_rules.simplify_language('Whereas the Party shall act pursuant to the terms herein.'),
+            'Given that the Party must act according to the terms in this document.'
+        )
+        # "herein" is replaced inside "therein" before "therein" is considered
+        self.assertEqual(explanation_rules.simplify_language('Stated therein'), 'Stated tin this document')
+        # "thereto" becomes "to it", which then completes "pursuant to"
+        self.assertEqual(explanation_rules.simplify_language('Pursuant thereto'), 'According to it')
+
+
+class ClauseFeaturesTests(TestCase):
+    """Tests for the clause features shared by explanations and summaries."""
+    
+    CLAUSES = [
+        'Either party may terminate this agreement with 30 days notice.',
+        'The Employee shall receive a monthly payment of $5,000 on the first day.',
+        'This agreement is governed by the laws of California.',
+        'Confidential information must not be disclosed for 2 years.',
+    ]
+    
+    def make_processor(self):
+        """Rule-based LLM processor that does not load the model."""
+        with mock.patch.object(LLMProcessor, '_initialize_llm'):
+            return LLMProcessor(generation=False)
+    
+    def test_summary_from_stored_features_matches_text(self):
+        """The summary built from stored features is the summary built from the clause texts."""
+        processor = self.make_processor()
+        from_text = processor.summarize_document([{'text': text} for text in self.CLAUSES])
+        from_features = processor.summarize_document(
+            [{'features': extract_clause_features(text), 'text': ''} for text in self.CLAUSES]
+        )
+        self.assertEqual(from_features, from_text)
+        self.assertIn('for 2 years', from_features)
+    
+    def test_outdated_features_are_recomputed(self):
+        """Features stored by an older FEATURES_VERSION are ignored and extracted again from the text."""
+        features = extract_clause_features(self.CLAUSES[1])
+        self.assertEqual(features['version'], FEATURES_VERSION)
+        self.assertEqual(features['amount'], '$5,000')
+        self.assertNotIn('location', features)
+        stale = dict(features, version=FEATURES_VERSION - 1, amount='$1')
+        processor = self.make_processor()
+        self.assertEqual(
+            processor._fallback_explanation(self.CLAUSES[1], stale),
+            processor._fallback_explanation(self.CLAUSES[1])
+        )
+
+
+class IncrementalReportTests(TestCase):
+    """Tests for regenerating reports from their stored summary sections."""
+    
+    TEXTS = [
+        'Either party may terminate this agreement with notice of 30 days.',
+        'The Company shall pay a monthly fee of $2,000.',
+        'The Contractor shall indemnify the Client against all claims.',
+        'This Agreement is governed by the laws of Texas.',
+        'Liability of either party is limited to direct damages.',
+    ]
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.document = Document.objects.create(
+            title='Services', file=SimpleUploadedFile('services.pdf', b'Services bytes'), user=self.user, processed=True
+        )
+        self.clauses = Clause.objects.bulk_create([
+            Clause(document=self.document, text=text, page_number=1, position=i) for i, text in enumerate(self.TEXTS)
+        ])
+    
+    def save_analyses(self, clauses, level='medium'):
+        DocumentService._save_analyses([
+            ClauseAnalysis(clause=clause, simplified_explanation='Plain', risk_level=level, risk_explanation='',
+                           keywords=[], features=extract_clause_features(clause.text))
+            for clause in clauses
+        ])
+    
+    def rebuilt_summary(self):
+        AnalysisReport.objects.filter(document=self.document).update(sections_version=0)
+        return DocumentService.generate_document_report(self.document.id)['summary']
+    
+    def test_new_analysis_only_updates_risk_counts(self):
+        """A clause analyzed after the report leaves the sections alone when its entries are unchanged."""
+        self.save_analyses(self.clauses[:4])
+        first = DocumentService.generate_document_report(self.document.id)
+        self.assertEqual(first['analyses_count'], 4)
+        
+        self.save_analyses(self.clauses[4:], level='high')
+        with mock.patch('document_analyzer.summary_sections.render_section') as render, self.assertNumQueries(7):
+            result = DocumentService.generate_document_report(self.document.id)
+        render.assert_not_called()
+        self.assertEqual(result['summary'], first['summary'])
+        self.assertEqual(result['analyses_count'], 5)
+        self.assertAlmostEqual(result['risk_score'], (4 + 2) / 5)
+        self.assertFalse(ClauseAnalysis.objects.filter(in_report=False).exists())
+        self.assertEqual(self.rebuilt_summary(), result['summary'])
+    
+    def test_changed_clause_moves_between_sections(self):
+        """Only the sections a changed clause leaves or joins are recomposed."""
+        self.save_analyses(self.clauses)
+        before = DocumentService.generate_document_report(self.document.id)['summary']
+        self.assertIn('**Payment Terms:**', before)
+        
+        features = extract_clause_features('Disputes shall be resolved by arbitration.')
+        ClauseAnalysis.objects.filter(clause=self.clauses[1]).update(features=features, in_report=False)
+        with mock.patch('document_analyzer.summary_sections.render_section',
+                        wraps=summary_sections.render_section) as render:
+            summary = DocumentService.generate_document_report(self.document.id)['summary']
+        self.assertEqual(sorted(call.args[0] for call in render.call_args_list), ['dispute_resolution', 'payment'])
+        self.assertNotIn('**Payment Terms:**', summary)
+        self.assertIn('through arbitration', summary)
+        self.assertEqual(self.rebuilt_summary(), summary)
+
+
+class AnalysisExecutorTests(TestCase):
+    """Tests for fanning clause analysis out over thread and process pools."""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        texts = [
+            'Either party may terminate this agreement with 30 days notice.',
+            'The user waives all rights to pursue legal action against the company.',
+            'Payments of $500 are due on the first of each month.',
+            'This agreement is governed by the laws of the state of California.',
+        ]
+        # Clauses repeat across chunks, so later chunks must reuse the first computation
+        self.extracted = [
+            {'text': f'{texts[i % 4]} Section {i % 7}.', 'page_number': 1, 'position': i} for i in range(60)
+        ]
+    
+    def analyze(self, executor):
+        document = Document.objects.create(
+            title=f'Contract {executor.mode}', user=self.user,
+            file=SimpleUploadedFile('contract.pdf', f'{executor.mode} {Document.objects.count()}'.encode())
+        )
+        ClauseFingerprint.objects.all().delete()
+        writers = set()
+        store = clause_memo.store
+        
+        def record_writer(*args):
+            writers.add(threading.current_thread().name)
+            return store(*args)
+        
+        progress = []
+        with mock.patch('document_analyzer.document_service.process_document', return_value=self.extracted), \
+                mock.patch('document_analyzer.document_service.get_legal_context_for_clauses',
+                           side_effect=lambda texts: [{'sources': []} for _ in texts]), \
+                mock.patch('document_analyzer.clause_memo.store', side_effect=record_writer), \
+                mock.patch.object(DocumentService, 'analysis_chunk_size', 16):
+            DocumentService.analyze_document(document.id, lambda done, total, message: progress.append(done),
+                                             executor=executor)
+        self.assertEqual(writers, {threading.current_thread().name})
+        self.assertEqual(progress, [0, 16, 32, 48, 60])
+        self.assertEqual(ClauseFingerprint.objects.count(), 28)
+        return list(
+            document.clauses.order_by('position')
+            .values_list('analysis__risk_level', 'analysis__simplified_explanation', 'analysis__features')
+        )
+    
+    def test_pools_match_serial_analysis(self):
+        """Thread and process pools produce the analyses of the serial path, writing from the calling thread."""
+        serial = self.analyze(ClauseAnalysisExecutor('serial'))
+        self.assertEqual(len(serial), 60)
+        with ClauseAnalysisExecutor('thread', workers=4) as executor:
+            self.assertEqual(self.analyze(executor), serial)
+        # Process pools start from a parent whose classifier is already built and keep serving later documents
+        risk_classifier.warm()
+        with ClauseAnalysisExecutor('process', workers=2) as executor:
+            self.assertEqual(self.analyze(executor), serial)
+            pool = executor._pool
+            self.assertEqual(self.analyze(executor), serial)
+            self.assertIs(executor._pool, pool)
+        self.assertIsNone(executor._pool)
+    
+    @override_settings(LLM_GENERATION=True)
+    def test_process_mode_is_refused_with_generation(self):
+        """With LLM generation on, a process pool falls back to threads sharing the generation thread."""
+        self.assertEqual(ClauseAnalysisExecutor('process', workers=2).mode, 'thread')
+    
+    def test_map_bounds_tasks_in_flight(self):
+        """Results come back in submission order with at most max_pending tasks submitted ahead."""
+        executor = ClauseAnalysisExecutor('thread', workers=2, max_pending=3)
+        self.addCleanup(executor.shutdown)
+        submitted = []
+        
+        def tasks():
+            for i in range(10):
+                submitted.append(i)
+                yield (i,)
+        
+        ahead = []
+        for n, result in enumerate(executor.map(lambda i: i * i, tasks())):
+            self.assertEqual(result, n * n)
+            ahead.append(len(submitted) - n)
+        self.assertLessEqual(max(ahead), 3)
+        self.assertEqual(ClauseAnalysisExecutor('thread', workers=1).mode, 'serial')
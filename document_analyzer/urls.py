@@ -14,9 +14,15 @@ urlpatterns = [
 	path('api/documents/', views.DocumentListCreateView.as_view(), name='api_document_list'),
 	path('api/documents/<int:pk>/', views.DocumentDetailView.as_view(), name='api_document_detail'),
 	path('api/documents/<int:pk>/analyze/', views.analyze_document, name='api_analyze_document'),
+	# GET analysis progress of a document
+	path('api/documents/<int:pk>/progress/', views.document_progress, name='api_document_progress'),
+	# GET status of a queued analysis job
+	path('api/jobs/<int:pk>/', views.job_status, name='api_job_status'),
 	path('api/clauses/<int:pk>/', views.ClauseDetailView.as_view(), name='api_clause_detail'),
 	# POST to analyze clause
 	path('api/clauses/<int:pk>/analysis/', views.analyze_clause, name='api_clause_analyze'),
 	# GET to fetch existing analysis result
 	path('api/clauses/<int:pk>/analysis/result/', views.ClauseAnalysisView.as_view(), name='api_clause_analysis_result'),
+	# GET clause memo hit rates (staff only)
+	path('api/analysis/stats/', views.analysis_stats, name='api_analysis_stats'),
 ] 
\ No newline at end of file
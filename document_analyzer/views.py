@@ -4,22 +4,25 @@ from django.http import JsonResponse
 from django.contrib import messages
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 
-from .models import Document, Clause, ClauseAnalysis, AnalysisReport
+from .models import Document, Clause, ClauseAnalysis, AnalysisReport, AnalysisJob
 from .serializers import (
     DocumentSerializer, ClauseSerializer, ClauseAnalysisSerializer,
-    AnalysisReportSerializer, DocumentDetailSerializer
+    AnalysisReportSerializer, DocumentDetailSerializer, AnalysisJobSerializer
 )
 from .forms import DocumentUploadForm
 from .document_service import DocumentService
+from .clause_memo import memo_stats
+from legal_classifier.risk_classifier import risk_model_version
+from .jobs import enqueue_analysis, active_job
 
 # Web UI Views
 def index(request):
     """Home page view."""
     if request.user.is_authenticated:
-        documents = Document.objects.filter(user=request.user).order_by('-uploaded_at')
+        documents = Document.objects.filter(user=request.user).select_related('report').order_by('-uploaded_at')
     else:
         documents = []
     return render(request, 'document_analyzer/index.html', {'documents': documents})
@@ -46,22 +49,17 @@ def document_detail(request, pk):
     """View for displaying document details and analysis."""
     document = get_object_or_404(Document, pk=pk, user=request.user)
     
-    # Check if document needs processing
-    if not document.processed:
-        # Process the document
-        DocumentService.process_document(document.id)
+    # Queue extraction and analysis rather than running it inside the request;
+    # the page polls the progress endpoint until the worker has finished
+    job = active_job(document)
+    if job is None and (not document.processed or document.clauses.filter(analysis__isnull=True).exists()):
+        job = enqueue_analysis(document)
     
-    clauses = document.clauses.all().order_by('position')
-    # Optionally trigger analysis for any clause missing analysis (best-effort)
-    for clause in clauses:
-        if not hasattr(clause, 'analysis'):
-            try:
-                DocumentService.analyze_clause(clause.id)
-            except Exception:
-                continue
+    clauses = document.clauses.select_related('analysis').order_by('position')
     return render(request, 'document_analyzer/document_detail.html', {
         'document': document,
-        'clauses': clauses
+        'clauses': clauses,
+        'job': job
     })
 
 @login_required
@@ -69,29 +67,22 @@ def analysis_report(request, pk):
     """View for displaying the full analysis report."""
     document = get_object_or_404(Document, pk=pk, user=request.user)
     
-    # Generate report if it doesn't exist
-    try:
-        report = document.report
-    except AnalysisReport.DoesNotExist:
-        result = DocumentService.generate_document_report(document.id)
-        if result['success']:
-            report = document.report
-        else:
-            report = None
+    # Generate the report if it doesn't exist or only holds the risk counts kept while analyzing
+    report = AnalysisReport.objects.filter(document=document).first()
+    if report is None or not report.summary:
+        DocumentService.generate_document_report(document.id)
+        report = AnalysisReport.objects.filter(document=document).first()
     
-    # Safely compute risk_percent for CSS (0-100 scale)
-    risk_percent = 0
-    if report is not None and isinstance(report.risk_score, (int, float)):
-        # Our risk score was averaged on scale 0:low,1:medium,2:high -> map to 0-100 by *50
-        try:
-            risk_percent = min(100, max(0, round(float(report.risk_score) * 50.0, 2)))
-        except Exception:
-            risk_percent = 0
+    # Risk highlights, with their analyses joined in, in one query per risk level
+    clauses = document.clauses.select_related('analysis').order_by('position')
     
     return render(request, 'document_analyzer/analysis_report.html', {
         'document': document,
         'report': report,
-        'risk_percent': risk_percent
+        'risk_percent': report.risk_percent if report else 0,
+        'has_clauses': document.clauses.exists(),
+        'high_risk_clauses': list(clauses.filter(analysis__risk_level='high')),
+        'medium_risk_clauses': list(clauses.filter(analysis__risk_level='medium'))
     })
 
 # API Views
@@ -133,13 +124,40 @@ class ClauseAnalysisView(generics.RetrieveAPIView):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def analyze_document(request, pk):
-    """API endpoint to trigger document analysis."""
+    """API endpoint to queue document analysis. Poll the returned job for progress."""
     document = get_object_or_404(Document, pk=pk, user=request.user)
     
-    # Process and analyze the document
-    result = DocumentService.analyze_document(document.id)
+    job = enqueue_analysis(document)
     
-    return Response(result, status=status.HTTP_202_ACCEPTED)
+    # The document failed ANALYSIS_MAX_ATTEMPTS times in a row, so no new job was queued
+    if job.status == 'failed':
+        return Response(AnalysisJobSerializer(job).data, status=status.HTTP_409_CONFLICT)
+    return Response(AnalysisJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_status(request, pk):
+    """API endpoint reporting the status and progress of an analysis job."""
+    job = get_object_or_404(AnalysisJob, pk=pk, document__user=request.user)
+    return Response(AnalysisJobSerializer(job).data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def document_progress(request, pk):
+    """API endpoint reporting how much of a document has been analyzed."""
+    document = get_object_or_404(Document, pk=pk, user=request.user)
+    total = document.clauses.count()
+    analyzed = ClauseAnalysis.objects.filter(clause__document=document).count()
+    job = document.jobs.order_by('-created_at').first()
+    return Response({
+        'document': document.id,
+        'processed': document.processed,
+        'total_clauses': total,
+        'analyzed_clauses': analyzed,
+        'progress': round(100.0 * analyzed / total, 2) if total else 0.0,
+        'completed': document.processed and analyzed == total and active_job(document) is None,
+        'job': AnalysisJobSerializer(job).data if job else None
+    })
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -151,3 +169,17 @@ def analyze_clause(request, pk):
     result = DocumentService.analyze_clause(clause.id)
     
     return Response(result, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def analysis_stats(request):
+    """API endpoint exposing clause memo hit rates and risk model coverage for monitoring."""
+    current_version = risk_model_version()
+    return Response({
+        'clause_memo': memo_stats(),
+        'risk_model': {
+            'version': current_version,
+            # Analyses produced by an older risk model, due to be redone
+            'stale_analyses': ClauseAnalysis.objects.exclude(model_version=current_version).count(),
+        }
+    })
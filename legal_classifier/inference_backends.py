@@ -0,0 +1,136 @@
+import os
+import glob
+from typing import Dict, Any, Optional
+from .model_registry import model_fingerprint
+
+# torch is imported inside the backends, as in risk_classifier, to keep imports cheap during migrations
+
+
+class InferenceBackend:
+    """Runs a sequence classification model on tokenizer output and returns its logits."""
+
+    name = 'base'
+
+    def logits(self, inputs: Dict[str, Any]):
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """Full-precision PyTorch model in eager mode."""
+
+    name = 'eager'
+
+    def __init__(self, model):
+        self.model = model.eval()
+
+    def logits(self, inputs: Dict[str, Any]):
+        import torch
+
+        with torch.no_grad():
+            return self.model(**inputs).logits
+
+
+class QuantizedBackend(EagerBackend):
+    """PyTorch model with its Linear layers dynamically quantized to int8 for CPU inference."""
+
+    name = 'quantized'
+
+    def __init__(self, model):
+        import torch
+        from torch.ao.quantization import quantize_dynamic
+
+        super().__init__(quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8))
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """Model exported to ONNX and run in an ONNX Runtime CPU session.
+
+    The export is written to <model_path>/model-<fingerprint>.onnx on first use and reused afterwards,
+    where fingerprint is the model_fingerprint of the weights it was exported from; new weights are
+    exported again and the stale export is removed. Requires the optional onnx and onnxruntime packages.
+    """
+
+    name = 'onnx'
+    FILENAME = 'model-{fingerprint}.onnx'
+
+    def __init__(self, model, model_path: str, onnx_path: Optional[str] = None, fingerprint: Optional[str] = None):
+        import onnxruntime
+
+        if onnx_path is None:
+            fingerprint = fingerprint or model_fingerprint(model_path)
+            onnx_path = os.path.join(model_path, self.FILENAME.format(fingerprint=fingerprint))
+        self.onnx_path = onnx_path
+        if not os.path.exists(self.onnx_path):
+            export_onnx(model, self.onnx_path)
+            self._remove_stale_exports()
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            self.onnx_path, options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def _remove_stale_exports(self):
+        directory = os.path.dirname(self.onnx_path)
+        for path in glob.glob(os.path.join(directory, self.FILENAME.format(fingerprint='*'))):
+            if path != self.onnx_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def logits(self, inputs: Dict[str, Any]):
+        import torch
+
+        feeds = {name: inputs[name].numpy() for name in self.input_names}
+        return torch.from_numpy(self.session.run(['logits'], feeds)[0])
+
+
+def export_onnx(model, onnx_path: str):
+    """Export a sequence classification model with dynamic batch and sequence axes."""
+    import torch
+
+    model = model.eval()
+    input_names = ['input_ids', 'attention_mask']
+    if getattr(model.config, 'type_vocab_size', 0):
+        input_names.append('token_type_ids')
+    dummy = {name: torch.ones((1, 8), dtype=torch.long) for name in input_names}
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+    tmp_path = onnx_path + '.tmp'
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (), tmp_path, kwargs=dummy, input_names=input_names, output_names=['logits'],
+            dynamic_axes=dynamic_axes, opset_version=17, dynamo=False
+        )
+    os.replace(tmp_path, onnx_path)
+
+
+def parity_report(reference, candidate) -> Dict[str, float]:
+    """Compare class probabilities of a backend against the eager reference, row per clause."""
+    import torch
+
+    agreement = (torch.argmax(reference, dim=1) == torch.argmax(candidate, dim=1)).float().mean().item()
+    differences = (reference - candidate).abs()
+    return {
+        'label_agreement': agreement,
+        'max_abs_diff': differences.max().item(),
+        'mean_abs_diff': differences.mean().item(),
+    }
+
+
+BACKENDS = {
+    'eager': EagerBackend,
+    'quantized': QuantizedBackend,
+    'onnx': OnnxRuntimeBackend,
+}
+
+
+def create_backend(name: str, model, model_path: Optional[str] = None,
+                   fingerprint: Optional[str] = None) -> InferenceBackend:
+    """Build the named backend around a loaded model; fingerprint is the model_fingerprint of model_path."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown risk inference backend '{name}'; expected one of {', '.join(BACKENDS)}")
+    if name == 'onnx':
+        return OnnxRuntimeBackend(model, model_path, fingerprint=fingerprint)
+    return BACKENDS[name](model)
@@ -0,0 +1,48 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Set
+
+
+class KeywordMatcher:
+    """Precompiled case-insensitive keyword matcher built once from a {category: [keywords]} table.
+
+    Matching keeps plain substring semantics ("terminat" matches "termination"). The text is
+    lower-cased once, each distinct keyword is checked once however many categories list it,
+    and the hits of recently scanned texts are cached, so asking about several categories of
+    the same clause costs a single scan.
+    """
+
+    def __init__(self, table: Dict[str, List[str]], cache_size: int = 2048):
+        self.table = {category: list(keywords) for category, keywords in table.items()}
+        # Lower-cased once here rather than on every comparison
+        self._entries = {
+            category: [(keyword, keyword.lower()) for keyword in keywords]
+            for category, keywords in self.table.items()
+        }
+        self._patterns = tuple(dict.fromkeys(
+            pattern for entries in self._entries.values() for _, pattern in entries
+        ))
+        # Categories listing each pattern, so categories() only visits the patterns found
+        self._pattern_categories: Dict[str, Set[str]] = {}
+        for category, entries in self._entries.items():
+            for _, pattern in entries:
+                self._pattern_categories.setdefault(pattern, set()).add(category)
+        self._scan = lru_cache(maxsize=cache_size)(self._scan_uncached)
+
+    def _scan_uncached(self, text: str) -> FrozenSet[str]:
+        text_lower = text.lower()
+        return frozenset(pattern for pattern in self._patterns if pattern in text_lower)
+
+    def find(self, text: str) -> Dict[str, List[str]]:
+        """Keywords of each category found in text, in table order (empty lists included)."""
+        found = self._scan(text)
+        return {
+            category: [keyword for keyword, pattern in entries if pattern in found]
+            for category, entries in self._entries.items()
+        }
+
+    def categories(self, text: str) -> Set[str]:
+        """Categories with at least one keyword in text."""
+        categories: Set[str] = set()
+        for pattern in self._scan(text):
+            categories |= self._pattern_categories[pattern]
+        return categories
@@ -0,0 +1,89 @@
+import glob
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from legal_classifier.inference_backends import BACKENDS, parity_report
+from legal_classifier.model_registry import TRAINING_TEXTS
+from legal_classifier.risk_classifier import RiskClassifier
+
+
+def default_corpus():
+    """Fixed clause corpus: the classifier's training clauses and the knowledge base paragraphs."""
+    from document_analyzer.clause_segmenter import segment_paragraphs
+
+    clauses = list(TRAINING_TEXTS)
+    pattern = os.path.join(settings.BASE_DIR, 'data', 'legal_knowledge', '*.txt')
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding='utf-8') as f:
+            clauses.extend(s['text'] for s in segment_paragraphs(f.read(), min_length=20))
+    return clauses
+
+
+class Command(BaseCommand):
+    help = ('Check accuracy parity of the risk model inference backends against eager PyTorch '
+            'and measure their latency and throughput on a fixed clause corpus.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model-path', required=True, help='Directory of the transformer risk model.')
+        parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+        parser.add_argument('--corpus', help='Text file with one clause per line (defaults to a built-in corpus).')
+        parser.add_argument('--batch-size', type=int, default=RiskClassifier.transformer_batch_size)
+        parser.add_argument('--repeat', type=int, default=3, help='Throughput runs per backend; the best is reported.')
+
+    def handle(self, *args, **options):
+        if options['corpus']:
+            with open(options['corpus'], encoding='utf-8') as f:
+                corpus = [line.strip() for line in f if line.strip()]
+        else:
+            corpus = default_corpus()
+        self.stdout.write(f"Corpus: {len(corpus)} clauses")
+
+        reference = None
+        backends = ['eager'] + [name for name in options['backends'] if name != 'eager']
+        rows = []
+        for name in backends:
+            classifier = RiskClassifier(model_path=options['model_path'], backend=name)
+            if classifier.model is None:
+                raise CommandError(f"Could not load a transformer model from {options['model_path']}")
+            if classifier.backend.name != name:
+                self.stderr.write(f"Skipping '{name}': the backend could not be created.")
+                continue
+
+            latencies = []
+            for text in corpus:
+                started = time.perf_counter()
+                classifier._classify_with_transformer(text)
+                latencies.append(time.perf_counter() - started)
+
+            best = None
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                probabilities = classifier.transformer_probabilities(corpus, options['batch_size'])
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            if reference is None:
+                reference = probabilities
+            parity = parity_report(reference, probabilities)
+            latencies.sort()
+            rows.append((
+                name,
+                statistics.median(latencies) * 1000,
+                latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+                len(corpus) / best,
+                parity,
+                classifier.batcher.padding_efficiency(),
+            ))
+
+        self.stdout.write(
+            f"{'backend':>10} {'p50 ms':>8} {'p95 ms':>8} {'clauses/s':>10} {'agreement':>10} {'max diff':>9} {'padding':>8}"
+        )
+        for name, p50, p95, throughput, parity, efficiency in rows:
+            self.stdout.write(
+                f"{name:>10} {p50:>8.2f} {p95:>8.2f} {throughput:>10.1f} "
+                f"{parity['label_agreement']:>10.2%} {parity['max_abs_diff']:>9.4f} {efficiency:>8.1%}"
+            )
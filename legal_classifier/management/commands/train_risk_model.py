@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from legal_classifier.model_registry import (
+    ModelRegistry, TRAINING_TEXTS, TRAINING_LABELS, train_fallback_pipeline, training_version
+)
+
+
+class Command(BaseCommand):
+    help = 'Train the fallback risk classifier and save it as the current model artifact.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model-dir', default=settings.RISK_MODEL_DIR,
+                            help='Registry directory (defaults to settings.RISK_MODEL_DIR).')
+        parser.add_argument('--force', action='store_true',
+                            help='Retrain even if the current artifact already has this version.')
+
+    def handle(self, *args, **options):
+        registry = ModelRegistry(options['model_dir'])
+        version = training_version(TRAINING_TEXTS, TRAINING_LABELS)
+        if registry.current_version() == version and registry.load() is not None and not options['force']:
+            self.stdout.write(f'Risk model {version} is already current in {registry.model_dir}.')
+            return
+        pipeline, version = train_fallback_pipeline()
+        manifest = registry.save(pipeline, version, training_examples=len(TRAINING_TEXTS))
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved risk model {manifest['version']} ({manifest['sha256'][:12]}) to {registry.model_dir}."
+        ))
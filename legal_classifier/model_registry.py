@@ -0,0 +1,182 @@
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+# scikit-learn and joblib are imported where they are used; importing them takes about a second
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+# Training data for the TF-IDF + Naive Bayes fallback classifier.
+# This is a very small set for demonstration purposes; a real deployment would use a larger corpus.
+TRAINING_TEXTS = [
+    # High risk clauses
+    "The user waives all rights to pursue legal action against the company.",
+    "You agree to indemnify and hold harmless the company from any claims.",
+    "The company reserves the right to terminate service without notice.",
+    "You forfeit all payments made if you cancel the service.",
+    "You waive your right to participate in a class action lawsuit.",
+
+    # Medium risk clauses
+    "Either party may terminate this agreement with 30 days notice.",
+    "You agree to keep all information confidential for a period of 5 years.",
+    "This agreement is governed by the laws of the state of California.",
+    "Any disputes shall be resolved through binding arbitration.",
+    "You agree not to compete with the company for 1 year after termination.",
+
+    # Low risk clauses
+    "Payments are due on the first of each month.",
+    "The term of this agreement is 12 months.",
+    "Notices must be sent in writing to the address provided.",
+    "This agreement constitutes the entire understanding between the parties.",
+    "If any provision is found invalid, the remainder shall remain in effect."
+]
+
+TRAINING_LABELS = ['high', 'high', 'high', 'high', 'high',
+                   'medium', 'medium', 'medium', 'medium', 'medium',
+                   'low', 'low', 'low', 'low', 'low']
+
+PIPELINE_PARAMS = {'tfidf__max_features': 1000}
+
+
+def build_pipeline() -> 'Pipeline':
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=PIPELINE_PARAMS['tfidf__max_features'])),
+        ('clf', MultinomialNB())
+    ])
+
+
+def training_version(texts: List[str], labels: List[str]) -> str:
+    """Version of a model: a hash of its training data, parameters and scikit-learn version."""
+    import sklearn
+
+    payload = json.dumps({
+        'texts': texts,
+        'labels': labels,
+        'params': PIPELINE_PARAMS,
+        'sklearn': sklearn.__version__,
+    }, sort_keys=True)
+    return "nb-" + hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def train_fallback_pipeline(texts: Optional[List[str]] = None, labels: Optional[List[str]] = None) -> Tuple['Pipeline', str]:
+    """Fit the fallback pipeline, returning it with its version."""
+    texts = TRAINING_TEXTS if texts is None else texts
+    labels = TRAINING_LABELS if labels is None else labels
+    pipeline = build_pipeline()
+    pipeline.fit(texts, labels)
+    return pipeline, training_version(texts, labels)
+
+
+def _update_digest(digest, path: str):
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    _update_digest(digest, path)
+    return digest.hexdigest()
+
+
+# Files of a transformer model directory that determine its predictions
+MODEL_FILE_SUFFIXES = ('.json', '.safetensors', '.bin')
+
+
+def model_fingerprint(model_path: str) -> str:
+    """Short hash of the config and weight files of a transformer model directory."""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(model_path)):
+        path = os.path.join(model_path, name)
+        if name.endswith(MODEL_FILE_SUFFIXES) and os.path.isfile(path):
+            digest.update(name.encode('utf-8') + b'\0')
+            _update_digest(digest, path)
+    return digest.hexdigest()[:12]
+
+
+class ModelRegistry:
+    """Directory of serialized risk model pipelines with a manifest naming the current one.
+
+    Artifacts are written as <version>.joblib next to manifest.json, which records the
+    current version and the SHA-256 of its artifact so a corrupted file is never loaded.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.model_dir, self.MANIFEST)
+
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def current_version(self) -> Optional[str]:
+        manifest = self.manifest()
+        return manifest['version'] if manifest else None
+
+    def save(self, pipeline: 'Pipeline', version: str, training_examples: int = 0) -> Dict[str, Any]:
+        """Serialize a fitted pipeline and make it the current version."""
+        import joblib
+        import sklearn
+
+        os.makedirs(self.model_dir, exist_ok=True)
+        artifact = f"{version}.joblib"
+        # Dump to a temporary file first, like the manifest, so a reader never loads a partial artifact
+        fd, tmp_path = tempfile.mkstemp(dir=self.model_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            joblib.dump(pipeline, tmp_path)
+            sha256 = _file_sha256(tmp_path)
+            os.replace(tmp_path, os.path.join(self.model_dir, artifact))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        manifest = {
+            'version': version,
+            'artifact': artifact,
+            'sha256': sha256,
+            'sklearn_version': sklearn.__version__,
+            'training_examples': training_examples,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        # Write the manifest atomically so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.model_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path())
+        return manifest
+
+    def load(self) -> Optional[Tuple['Pipeline', str]]:
+        """Load the current pipeline and its version, or None if there is no valid artifact."""
+        import joblib
+
+        manifest = self.manifest()
+        if manifest is None:
+            return None
+        path = os.path.join(self.model_dir, manifest['artifact'])
+        try:
+            if _file_sha256(path) != manifest['sha256']:
+                print(f"Risk model artifact {path} does not match its manifest hash; ignoring it")
+                return None
+            return joblib.load(path), manifest['version']
+        except Exception as e:
+            print(f"Error loading risk model artifact {path}: {e}")
+            return None
+
+
+def default_registry() -> ModelRegistry:
+    from django.conf import settings
+    return ModelRegistry(settings.RISK_MODEL_DIR)
@@ -1,12 +1,17 @@
 import os
 import json
 import sys
+import threading
 import numpy as np
-from typing import Dict, Any, List, Tuple, Optional
-from transformers.pipelines import pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple, Optional
+from legaldoc_ai.lazy import LazyEngine
+from .keyword_matcher import KeywordMatcher
+from .model_registry import ModelRegistry, default_registry, model_fingerprint, train_fallback_pipeline
+from .inference_backends import InferenceBackend, create_backend
+from .transformer_batching import TransformerBatcher
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
 # Check if we're running migrations
 RUNNING_MIGRATIONS = 'makemigrations' in sys.argv or 'migrate' in sys.argv
@@ -14,11 +19,30 @@ RUNNING_MIGRATIONS = 'makemigrations' in sys.argv or 'migrate' in sys.argv
 class RiskClassifier:
     """Class for classifying legal clauses based on risk level."""
     
-    def __init__(self, model_path: Optional[str] = None):
-        """Initialize the risk classifier."""
+    # Windows per padded forward pass in classify_many
+    transformer_batch_size = 16
+    # Clauses longer than transformer_max_length tokens are read in windows overlapping by transformer_stride
+    transformer_max_length = 512
+    transformer_stride = 128
+    
+    def __init__(self, model_path: Optional[str] = None, registry: Optional[ModelRegistry] = None,
+                 backend: Optional[str] = None):
+        """Initialize the risk classifier.
+        The fallback pipeline is loaded from the model registry (settings.RISK_MODEL_DIR by default) on first use.
+        backend selects how a transformer model is run (settings.RISK_INFERENCE_BACKEND by default).
+        """
         self.model_path = model_path
         self.model = None
         self.tokenizer = None
+        # Hash of the transformer config and weights, part of its model_version
+        self.model_fingerprint = None
+        self.backend_name = backend
+        self.backend: Optional[InferenceBackend] = None
+        self.batcher: Optional[TransformerBatcher] = None
+        self.registry = registry
+        self._fallback_classifier = None
+        self._fallback_version = None
+        self._fallback_lock = threading.Lock()
         self.risk_keywords = {
             'high': [
                 'waive', 'waiver', 'indemnify', 'indemnification', 'liability', 
@@ -36,9 +60,7 @@ class RiskClassifier:
                 'communication', 'severability', 'entire agreement'
             ]
         }
-        
-        # Initialize fallback classifier
-        self.fallback_classifier = self._create_fallback_classifier()
+        self.keyword_matcher = KeywordMatcher(self.risk_keywords)
         
         # Try to load the transformer model if available and not running migrations
         if not RUNNING_MIGRATIONS:
@@ -54,7 +76,13 @@ class RiskClassifier:
                 
                 self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
                 self.model = AutoModelForSequenceClassification.from_pretrained(self.model_path)
-                print(f"Loaded transformer model from {self.model_path}")
+                self.model_fingerprint = model_fingerprint(self.model_path)
+                self.batcher = TransformerBatcher(
+                    self.tokenizer, max_length=self.transformer_max_length, stride=self.transformer_stride,
+                    batch_size=self.transformer_batch_size
+                )
+                self._load_backend()
+                print(f"Loaded transformer model from {self.model_path} ({self.backend.name} backend)")
             else:
                 # In a real application, you might download a pre-trained model
                 # or use a hosted API for inference
@@ -63,84 +91,76 @@ class RiskClassifier:
             print(f"Error loading transformer model: {e}")
             print("Using fallback classifier")
     
-    def _create_fallback_classifier(self):
-        """Create a simple fallback classifier using TF-IDF and Naive Bayes."""
-        # This is a very simple classifier for demonstration purposes
-        # In a real application, you would use a more sophisticated model
-        
-        # Sample training data
-        X = [
-            # High risk clauses
-            "The user waives all rights to pursue legal action against the company.",
-            "You agree to indemnify and hold harmless the company from any claims.",
-            "The company reserves the right to terminate service without notice.",
-            "You forfeit all payments made if you cancel the service.",
-            "You waive your right to participate in a class action lawsuit.",
-            
-            # Medium risk clauses
-            "Either party may terminate this agreement with 30 days notice.",
-            "You agree to keep all information confidential for a period of 5 years.",
-            "This agreement is governed by the laws of the state of California.",
-            "Any disputes shall be resolved through binding arbitration.",
-            "You agree not to compete with the company for 1 year after termination.",
-            
-            # Low risk clauses
-            "Payments are due on the first of each month.",
-            "The term of this agreement is 12 months.",
-            "Notices must be sent in writing to the address provided.",
-            "This agreement constitutes the entire understanding between the parties.",
-            "If any provision is found invalid, the remainder shall remain in effect."
-        ]
-        
-        y = ['high', 'high', 'high', 'high', 'high',
-             'medium', 'medium', 'medium', 'medium', 'medium',
-             'low', 'low', 'low', 'low', 'low']
-        
-        # Create and train the pipeline
-        pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=1000)),
-            ('clf', MultinomialNB())
-        ])
-        
-        pipeline.fit(X, y)
-        return pipeline
+    def _load_backend(self):
+        """Wrap the loaded model in the configured inference backend, falling back to eager PyTorch."""
+        if self.backend_name is None:
+            from django.conf import settings
+            self.backend_name = getattr(settings, 'RISK_INFERENCE_BACKEND', 'eager')
+        try:
+            self.backend = create_backend(self.backend_name, self.model, self.model_path, self.model_fingerprint)
+        except Exception as e:
+            print(f"Error creating '{self.backend_name}' inference backend: {e}")
+            print("Using eager PyTorch inference")
+            self.backend = create_backend('eager', self.model)
+    
+    def _load_fallback_classifier(self):
+        """Load the trained fallback pipeline, training one in process if none has been saved."""
+        with self._fallback_lock:
+            if self._fallback_classifier is not None:
+                return
+            loaded = (self.registry or default_registry()).load()
+            if loaded is None:
+                print("No trained risk model found (run 'python manage.py train_risk_model'); training the fallback classifier in process")
+                loaded = train_fallback_pipeline()
+            self._fallback_classifier, self._fallback_version = loaded
+    
+    @property
+    def fallback_classifier(self) -> 'Pipeline':
+        """TF-IDF and Naive Bayes pipeline used when no transformer model is loaded."""
+        if self._fallback_classifier is None:
+            self._load_fallback_classifier()
+        return self._fallback_classifier
+    
+    @property
+    def model_version(self) -> str:
+        """Version of the model that classifies clauses, recorded with each analysis."""
+        if self.model and self.tokenizer:
+            # Truncated so the version fits ClauseAnalysis.model_version with the backend suffix
+            name = os.path.basename(os.path.normpath(self.model_path))[:28]
+            # Retrained weights saved over the same directory get a new version
+            version = f"transformer-{name}-{self.model_fingerprint}"
+            # Quantized and exported models can differ slightly from the eager one
+            return version if self.backend.name == 'eager' else f"{version}-{self.backend.name}"
+        if self._fallback_version is None:
+            self._load_fallback_classifier()
+        return self._fallback_version
     
     def _extract_keywords(self, text: str) -> Dict[str, List[str]]:
         """Extract risk keywords from the text."""
-        text_lower = text.lower()
-        found_keywords = {
-            'high': [],
-            'medium': [],
-            'low': []
-        }
-        
-        for risk_level, keywords in self.risk_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    found_keywords[risk_level].append(keyword)
-        
-        return found_keywords
+        return self.keyword_matcher.find(text)
     
     def _classify_with_transformer(self, text: str) -> Tuple[str, float]:
         """Classify text using the transformer model."""
-        # Import torch only when needed to avoid issues during migrations
+        return self._classify_many_with_transformer([text], 1)[0]
+    
+    def transformer_probabilities(self, texts: List[str], batch_size: Optional[int] = None):
+        """Class probabilities (low, medium, high) from the transformer.
+        Clauses are batched by length and long clauses are read in overlapping windows (see TransformerBatcher).
+        """
         import torch
         
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=512)
-        
         with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            probabilities = torch.nn.functional.softmax(logits, dim=1)
-            
-            # Assuming labels are ordered as ['low', 'medium', 'high']
-            predicted_class_idx = torch.argmax(probabilities, dim=1).item()
-            confidence = probabilities[0][predicted_class_idx].item()
-            
-            risk_levels = ['low', 'medium', 'high']
-            predicted_risk = risk_levels[predicted_class_idx]
-            
-            return predicted_risk, confidence
+            logits = self.batcher.logits(texts, self.backend.logits, batch_size)
+            return torch.nn.functional.softmax(logits, dim=1)
+    
+    def _classify_many_with_transformer(self, texts: List[str], batch_size: int) -> List[Tuple[str, float]]:
+        """Classify texts with the transformer in length-bucketed mini-batches."""
+        import torch
+        
+        risk_levels = ['low', 'medium', 'high']
+        probabilities = self.transformer_probabilities(texts, batch_size)
+        predicted = torch.argmax(probabilities, dim=1)
+        return [(risk_levels[idx], row[idx].item()) for row, idx in zip(probabilities, predicted.tolist())]
     
     def _classify_with_fallback(self, text: str) -> Tuple[str, float]:
         """Classify text using the fallback classifier."""
@@ -157,6 +177,13 @@ class RiskClassifier:
         
         return predicted_risk, confidence
     
+    def _classify_many_with_fallback(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Classify texts with the fallback classifier, vectorized as one sparse matrix."""
+        probas = self.fallback_classifier.predict_proba(texts)
+        predicted = np.argmax(probas, axis=1)
+        classes = self.fallback_classifier.classes_
+        return [(classes[idx], probas[row, idx]) for row, idx in enumerate(predicted)]
+    
     def classify(self, clause_text: str) -> Dict[str, Any]:
         """Classify a legal clause based on risk level."""
         if RUNNING_MIGRATIONS:
@@ -167,6 +194,35 @@ class RiskClassifier:
                 'explanation': "This is a placeholder during migrations."
             }
             
+        # Use transformer model if available, otherwise use fallback
+        if self.model and self.tokenizer:
+            model_risk, confidence = self._classify_with_transformer(clause_text)
+        else:
+            model_risk, confidence = self._classify_with_fallback(clause_text)
+        
+        return self._combine(clause_text, model_risk, confidence)
+    
+    def classify_many(self, clause_texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Classify many clauses at once, with the same results as calling classify on each."""
+        if RUNNING_MIGRATIONS:
+            return [self.classify(text) for text in clause_texts]
+        if not clause_texts:
+            return []
+        
+        if self.model and self.tokenizer:
+            predictions = self._classify_many_with_transformer(
+                clause_texts, batch_size or self.transformer_batch_size
+            )
+        else:
+            predictions = self._classify_many_with_fallback(clause_texts)
+        
+        return [
+            self._combine(text, model_risk, confidence)
+            for text, (model_risk, confidence) in zip(clause_texts, predictions)
+        ]
+    
+    def _combine(self, clause_text: str, model_risk: str, confidence: float) -> Dict[str, Any]:
+        """Combine the model prediction with keyword-based risk into the classification result."""
         # Extract keywords
         keywords = self._extract_keywords(clause_text)
         
@@ -177,12 +233,6 @@ class RiskClassifier:
         elif keywords['medium']:
             keyword_risk = 'medium'
         
-        # Use transformer model if available, otherwise use fallback
-        if self.model and self.tokenizer:
-            model_risk, confidence = self._classify_with_transformer(clause_text)
-        else:
-            model_risk, confidence = self._classify_with_fallback(clause_text)
-        
         # Combine keyword-based and model-based classifications
         # If high-risk keywords are found, increase the risk level
         final_risk = model_risk
@@ -224,9 +274,17 @@ class RiskClassifier:
         return explanation
 
 
-# Initialize a global risk classifier instance
-risk_classifier = RiskClassifier()
+# Global risk classifier, built on first use; warming it up also loads the fallback pipeline
+risk_classifier = LazyEngine(RiskClassifier, 'risk classifier', warmup=lambda classifier: classifier.fallback_classifier)
 
 def classify_clause_risk(clause_text: str) -> Dict[str, Any]:
     """Classify a clause's risk level using the risk classifier."""
-    return risk_classifier.classify(clause_text) 
\ No newline at end of file
+    return risk_classifier.classify(clause_text)
+
+def classify_clauses_risk(clause_texts: List[str]) -> List[Dict[str, Any]]:
+    """Classify the risk levels of many clauses in one batch."""
+    return risk_classifier.classify_many(clause_texts)
+
+def risk_model_version() -> str:
+    """Version of the model used by classify_clause_risk."""
+    return risk_classifier.model_version
@@ -1,3 +1,240 @@
 from django.test import TestCase
+from django.core.management import call_command
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from .risk_classifier import RiskClassifier
+from .model_registry import ModelRegistry, train_fallback_pipeline
+from .inference_backends import parity_report
+from .keyword_matcher import KeywordMatcher
+from .transformer_batching import TransformerBatcher
+
+CLAUSES = [
+    "The user waives all rights to pursue legal action against the company.",
+    "Payments are due on the first of each month.",
+    "Either party may terminate this agreement with 30 days notice.",
+    "This agreement is governed by the laws of the state of California.",
+    "The company may assign this agreement and will provide written notice of any amendment.",
+    "Short clause.",
+]
+
+
+def make_tiny_transformer(directory):
+    """Save a small randomly initialized BERT classifier and its tokenizer to directory."""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+
+    words = sorted({w.strip('.,').lower() for clause in CLAUSES for w in clause.split()})
+    vocab_path = os.path.join(directory, 'vocab.txt')
+    with open(vocab_path, 'w') as f:
+        f.write('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', '.', ','] + words))
+    BertTokenizer(vocab_path).save_pretrained(directory)
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(words) + 7, hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=64, num_labels=3
+    )
+    BertForSequenceClassification(config).eval().save_pretrained(directory)
+
+
+class ClassifyManyTests(TestCase):
+    """Tests for batched risk classification."""
+
+    def test_fallback_matches_single_clause_path(self):
+        """classify_many gives exactly the results of classify for the TF-IDF pipeline."""
+        classifier = RiskClassifier()
+        self.assertEqual(classifier.classify_many(CLAUSES), [classifier.classify(text) for text in CLAUSES])
+        self.assertEqual(classifier.classify_many([]), [])
+
+    def test_transformer_matches_single_clause_path(self):
+        """Padded mini-batches give the same predictions as one forward pass per clause."""
+        with tempfile.TemporaryDirectory() as directory:
+            make_tiny_transformer(directory)
+            classifier = RiskClassifier(model_path=directory)
+        self.assertIsNotNone(classifier.model)
+        single = [classifier.classify(text) for text in CLAUSES]
+        batched = classifier.classify_many(CLAUSES, batch_size=4)
+        self.assertEqual([r['risk_level'] for r in batched], [r['risk_level'] for r in single])
+        for expected, result in zip(single, batched):
+            self.assertEqual(
+                {key: value for key, value in result.items() if key != 'confidence'},
+                {key: value for key, value in expected.items() if key != 'confidence'}
+            )
+            # Padded positions are masked out, but a padded batch changes the shapes of the float32
+            # matrix products, and BLAS may then sum in a different order: only the last bits can differ
+            self.assertAlmostEqual(result['confidence'], expected['confidence'], delta=1e-6)
+
+
+class TransformerBatcherTests(TestCase):
+    """Tests for length-bucketed batching and windowing of long clauses."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model_dir = tempfile.mkdtemp()
+        make_tiny_transformer(cls.model_dir)
+        cls.classifier = RiskClassifier(model_path=cls.model_dir)
+
+    def make_batcher(self, **kwargs):
+        return TransformerBatcher(self.classifier.tokenizer, **kwargs)
+
+    def test_long_clause_is_windowed_not_truncated(self):
+        """A clause longer than max_length is read in overlapping windows whose logits are averaged."""
+        import torch
+
+        long_clause = ' '.join(CLAUSES[:5])
+        batcher = self.make_batcher(max_length=16, stride=4)
+        windows = batcher.encode([long_clause])[0]
+        self.assertGreater(len(windows), 1)
+        self.assertTrue(all(len(w['input_ids']) <= 16 for w in windows))
+
+        run = self.classifier.backend.logits
+        separate = [run(self.classifier.tokenizer.pad([w], return_tensors='pt'))[0] for w in windows]
+        logits = batcher.logits([long_clause], run)
+        self.assertTrue(torch.allclose(logits[0], torch.stack(separate).mean(dim=0), atol=1e-5))
+
+    def test_tokenizes_each_clause_once(self):
+        """Repeated clauses are served from the cache instead of being tokenized again."""
+        batcher = self.make_batcher()
+        batcher.encode(CLAUSES[:3])
+        with mock.patch.object(batcher, 'tokenizer', wraps=batcher.tokenizer) as tokenizer:
+            windows = batcher.encode([CLAUSES[0], CLAUSES[0], CLAUSES[2]])
+        tokenizer.assert_not_called()
+        self.assertEqual(len(windows), 3)
+
+    def test_plan_groups_windows_of_similar_length(self):
+        """Batches are cut from windows sorted by length and respect the token budget."""
+        windows = [[{'input_ids': [0] * length}] for length in [30, 5, 28, 6, 31, 4]]
+        batcher = self.make_batcher(batch_size=3, max_batch_tokens=64)
+        self.assertEqual(batcher.plan(windows), [[(5, 0), (1, 0), (3, 0)], [(2, 0), (0, 0)], [(4, 0)]])
+        self.assertEqual(batcher.plan(windows, batch_size=6)[0], [(5, 0), (1, 0), (3, 0)])
+
+
+class KeywordMatcherTests(TestCase):
+    """Tests for the shared keyword matcher."""
+
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            'high': ['Waive', 'unlimited liability', 'liability'],
+            'medium': ['terminat', 'liability'],
+            'low': ['notice'],
+        })
+
+    def test_find_keeps_substring_semantics_and_table_order(self):
+        """Keywords match inside longer words, case-insensitively, listed in table order."""
+        found = self.matcher.find("UNLIMITED LIABILITY applies; the user waives termination rights.")
+        self.assertEqual(found, {
+            'high': ['Waive', 'unlimited liability', 'liability'],
+            'medium': ['terminat', 'liability'],
+            'low': [],
+        })
+
+    def test_categories(self):
+        self.assertEqual(self.matcher.categories("Written notice is required."), {'low'})
+        self.assertEqual(self.matcher.categories("Nothing relevant."), set())
+
+
+class ModelRegistryTests(TestCase):
+    """Tests for persisted risk model artifacts."""
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        self.registry = ModelRegistry(self.model_dir)
+
+    def test_command_saves_artifact_loaded_without_training(self):
+        """train_risk_model writes a versioned artifact that the classifier loads lazily."""
+        call_command('train_risk_model', model_dir=self.model_dir, stdout=io.StringIO())
+        version = self.registry.current_version()
+        self.assertTrue(version.startswith('nb-'))
+        with mock.patch('legal_classifier.risk_classifier.train_fallback_pipeline') as train:
+            classifier = RiskClassifier(registry=self.registry)
+            self.assertIsNone(classifier._fallback_classifier)
+            result = classifier.classify(CLAUSES[0])
+        train.assert_not_called()
+        self.assertEqual(classifier.model_version, version)
+        self.assertEqual(result, RiskClassifier(registry=ModelRegistry(tempfile.mkdtemp())).classify(CLAUSES[0]))
+
+    def test_corrupted_artifact_is_ignored(self):
+        """An artifact that does not match its manifest hash is not loaded."""
+        pipeline, version = train_fallback_pipeline()
+        manifest = self.registry.save(pipeline, version)
+        with open(os.path.join(self.model_dir, manifest['artifact']), 'ab') as f:
+            f.write(b'tampered')
+        self.assertIsNone(self.registry.load())
+
+    def test_save_replaces_artifact_atomically(self):
+        """Saving again over an existing version leaves only the artifact and the manifest behind."""
+        pipeline, version = train_fallback_pipeline()
+        self.registry.save(pipeline, version)
+        manifest = self.registry.save(pipeline, version)
+        self.assertEqual(sorted(os.listdir(self.model_dir)), sorted([manifest['artifact'], ModelRegistry.MANIFEST]))
+        self.assertEqual(self.registry.load()[1], version)
+
+    def test_retrained_transformer_gets_new_version(self):
+        """The transformer version changes when new weights are saved to the same directory."""
+        with tempfile.TemporaryDirectory() as directory:
+            make_tiny_transformer(directory)
+            classifier = RiskClassifier(model_path=directory, backend='eager')
+            version = classifier.model_version
+            self.assertTrue(version.startswith(f'transformer-{os.path.basename(directory)}-'))
+            self.assertEqual(RiskClassifier(model_path=directory, backend='eager').model_version, version)
+            classifier.model.classifier.bias.data += 1
+            classifier.model.save_pretrained(directory)
+            self.assertNotEqual(RiskClassifier(model_path=directory, backend='eager').model_version, version)
+
+
+class InferenceBackendTests(TestCase):
+    """Tests for the pluggable transformer inference backends."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model_dir = tempfile.mkdtemp()
+        make_tiny_transformer(cls.model_dir)
+        cls.reference = RiskClassifier(model_path=cls.model_dir, backend='eager').transformer_probabilities(CLAUSES)
+
+    def assert_parity(self, backend, tolerance):
+        classifier = RiskClassifier(model_path=self.model_dir, backend=backend)
+        self.assertEqual(classifier.backend.name, backend)
+        self.assertTrue(classifier.model_version.endswith(f'-{backend}'))
+        report = parity_report(self.reference, classifier.transformer_probabilities(CLAUSES))
+        self.assertEqual(report['label_agreement'], 1.0)
+        self.assertLess(report['max_abs_diff'], tolerance)
+
+    def test_quantized_backend_matches_eager(self):
+        self.assert_parity('quantized', 0.05)
+
+    @unittest.skipUnless(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('onnx'),
+                         'onnx and onnxruntime are not installed')
+    def test_onnx_backend_matches_eager(self):
+        self.assert_parity('onnx', 1e-4)
+
+    @unittest.skipUnless(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('onnx'),
+                         'onnx and onnxruntime are not installed')
+    def test_onnx_export_follows_new_weights(self):
+        """Weights saved over the model directory are exported again, with a new model version."""
+        import torch
+
+        with tempfile.TemporaryDirectory() as directory:
+            make_tiny_transformer(directory)
+            first = RiskClassifier(model_path=directory, backend='onnx')
+            eager = RiskClassifier(model_path=directory, backend='eager')
+            eager.model.classifier.bias.data += torch.tensor([0.0, 0.0, 5.0])
+            eager.model.save_pretrained(directory)
+
+            second = RiskClassifier(model_path=directory, backend='onnx')
+            self.assertNotEqual(second.model_version, first.model_version)
+            self.assertEqual(os.listdir(directory).count(os.path.basename(second.backend.onnx_path)), 1)
+            self.assertFalse(os.path.exists(first.backend.onnx_path))
+            reference = RiskClassifier(model_path=directory, backend='eager').transformer_probabilities(CLAUSES)
+            report = parity_report(reference, second.transformer_probabilities(CLAUSES))
+            self.assertLess(report['max_abs_diff'], 1e-4)
+
+    def test_unknown_backend_falls_back_to_eager(self):
+        classifier = RiskClassifier(model_path=self.model_dir, backend='tpu')
+        self.assertEqual(classifier.backend.name, 'eager')
 
-# Create your tests here.
@@ -0,0 +1,99 @@
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from legaldoc_ai.lru_cache import LRUCache
+
+Window = Dict[str, List[int]]
+
+
+class TransformerBatcher:
+    """Schedules clauses through a sequence classification model.
+
+    Clauses are tokenized once and cached by the hash of their text. A clause longer than
+    max_length tokens is split into windows that overlap by stride tokens, instead of being
+    truncated, and its logits are the mean of its windows' logits. Windows from all clauses
+    are sorted by length before being cut into batches, so each batch is padded only to the
+    length of similar windows.
+    """
+
+    def __init__(self, tokenizer, max_length: int = 512, stride: int = 128, batch_size: int = 16,
+                 max_batch_tokens: int = 8192, cache_size: int = 4096):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.stride = stride
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.cache = LRUCache(maxsize=cache_size)
+        self.real_tokens = 0
+        self.padded_tokens = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def encode(self, texts: List[str]) -> List[List[Window]]:
+        """Token windows of each text, tokenizing only the texts not seen before."""
+        keys = [self._key(text) for text in texts]
+        windows = [self.cache.get(key) for key in keys]
+        missing = {}
+        for i, (key, cached) in enumerate(zip(keys, windows)):
+            if cached is None:
+                missing.setdefault(key, texts[i])
+        if missing:
+            encoded = self.tokenizer(
+                list(missing.values()), truncation=True, max_length=self.max_length, stride=self.stride,
+                return_overflowing_tokens=True, padding=False
+            )
+            # Slow tokenizers do not split into windows; each text then has a single truncated window
+            mapping = encoded.get('overflow_to_sample_mapping', list(range(len(missing))))
+            fields = [name for name in self.tokenizer.model_input_names if name in encoded]
+            by_text: Dict[int, List[Window]] = {}
+            for row, sample in enumerate(mapping):
+                by_text.setdefault(sample, []).append({name: encoded[name][row] for name in fields})
+            fresh = {key: by_text[sample] for sample, key in enumerate(missing)}
+            for key, text_windows in fresh.items():
+                self.cache.set(key, text_windows)
+            windows = [cached if cached is not None else fresh[key] for key, cached in zip(keys, windows)]
+        return windows
+
+    def plan(self, windows: List[List[Window]], batch_size: Optional[int] = None) -> List[List[Tuple[int, int]]]:
+        """Batches of (text index, window index), grouping windows of similar length."""
+        batch_size = batch_size or self.batch_size
+        order = sorted(
+            ((i, j) for i, text_windows in enumerate(windows) for j in range(len(text_windows))),
+            key=lambda item: len(windows[item[0]][item[1]]['input_ids'])
+        )
+        batches = []
+        batch: List[Tuple[int, int]] = []
+        for item in order:
+            length = len(windows[item[0]][item[1]]['input_ids'])
+            # Sorted by length, so the new window is the longest of the batch
+            if batch and (len(batch) >= batch_size or length * (len(batch) + 1) > self.max_batch_tokens):
+                batches.append(batch)
+                batch = []
+            batch.append(item)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def logits(self, texts: List[str], run: Callable[[Dict[str, Any]], Any], batch_size: Optional[int] = None):
+        """Logits of each text, one row per text, calling run on each padded batch."""
+        import torch
+
+        windows = self.encode(texts)
+        sums: List[Any] = [None] * len(texts)
+        counts = [0] * len(texts)
+        for batch in self.plan(windows, batch_size):
+            features = [windows[i][j] for i, j in batch]
+            inputs = self.tokenizer.pad(features, padding=True, return_tensors='pt')
+            self.real_tokens += sum(len(f['input_ids']) for f in features)
+            self.padded_tokens += inputs['input_ids'].numel()
+            batch_logits = run(inputs)
+            for (i, _), row in zip(batch, batch_logits):
+                sums[i] = row if sums[i] is None else sums[i] + row
+                counts[i] += 1
+        return torch.stack([total / count for total, count in zip(sums, counts)])
+
+    def padding_efficiency(self) -> float:
+        """Share of the tokens fed to the model that were real rather than padding."""
+        return self.real_tokens / self.padded_tokens if self.padded_tokens else 1.0
@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.utils.module_loading import import_string
+
+# Engines that can be preloaded, by name, with the dotted path of their LazyEngine
+ENGINES = {
+    'risk': 'legal_classifier.risk_classifier.risk_classifier',
+    'rag': 'rag_pipeline.rag_processor.rag_processor',
+    'llm': 'document_analyzer.llm_processor.llm_processor',
+}
+
+
+class LazyEngine:
+    """Module-level singleton built on first use instead of on import.
+
+    Attribute access is forwarded to the engine, so a LazyEngine can stand in for the
+    instance it wraps. The factory runs at most once, even when several threads ask for
+    the engine at the same time. warmup, if given, is called with the engine by warm() to
+    load anything the engine would otherwise load on its first request.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str, warmup: Optional[Callable[[Any], Any]] = None):
+        self._factory = factory
+        self._name = name
+        self._warmup = warmup
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    started = time.perf_counter()
+                    self._instance = self._factory()
+                    print(f"Initialized {self._name} in {time.perf_counter() - started:.2f}s")
+                instance = self._instance
+        return instance
+
+    def warm(self) -> Any:
+        """Build the engine and run its warm-up hook."""
+        instance = self.get()
+        if self._warmup is not None:
+            self._warmup(instance)
+        return instance
+
+    def reset(self):
+        """Drop the engine so that it is built again on next use."""
+        with self._lock:
+            self._instance = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyEngine {self._name} ({state})>"
+
+
+def preload_engines() -> Dict[str, float]:
+    """Warm up the engines listed in settings.PRELOAD_ENGINES; called when a worker process starts."""
+    from django.conf import settings
+
+    names = getattr(settings, 'PRELOAD_ENGINES', [])
+    if not names:
+        return {}
+    return warm_engines(None if 'all' in names else names)
+
+
+def warm_engines(names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """Build and warm up the named engines (all of them by default), returning seconds spent on each."""
+    timings = {}
+    for name in names if names is not None else ENGINES:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown engine '{name}'; expected one of {', '.join(ENGINES)}")
+        started = time.perf_counter()
+        import_string(ENGINES[name]).warm()
+        timings[name] = time.perf_counter() - started
+    return timings
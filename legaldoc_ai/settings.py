@@ -165,5 +165,54 @@ SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 # Use a smaller, publicly available model
 LLM_MODEL = os.getenv('LLM_MODEL', 'google/flan-t5-small')
 
+# Explain clauses with the LLM instead of the rule-based explanations. Prompts are batched
+# on a generation thread; a clause not explained within LLM_GENERATION_TIMEOUT seconds
+# gets the rule-based explanation.
+LLM_GENERATION = os.getenv('LLM_GENERATION', 'False') == 'True'
+LLM_GENERATION_BATCH_SIZE = int(os.getenv('LLM_GENERATION_BATCH_SIZE', '8'))
+LLM_MAX_NEW_TOKENS = int(os.getenv('LLM_MAX_NEW_TOKENS', '96'))
+LLM_GENERATION_TIMEOUT = float(os.getenv('LLM_GENERATION_TIMEOUT', '30'))
+
 # Embedding model settings
 EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL')
+
+# Persisted FAISS index for the RAG knowledge base
+RAG_INDEX_DIR = os.getenv('RAG_INDEX_DIR', os.path.join(BASE_DIR, 'data', 'vector_index'))
+
+# Content-addressed embedding cache shared by all workers (set to an empty string to disable)
+RAG_EMBEDDING_CACHE_DIR = os.getenv('RAG_EMBEDDING_CACHE_DIR', os.path.join(BASE_DIR, 'data', 'embedding_cache'))
+# Query embeddings are only kept in memory, in an LRU of this many entries per process
+RAG_QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv('RAG_QUERY_EMBEDDING_CACHE_SIZE', '1024'))
+
+# LRU cache of RAG query results (TTL in seconds, unset for no expiry)
+RAG_QUERY_CACHE_SIZE = int(os.getenv('RAG_QUERY_CACHE_SIZE', '1024'))
+RAG_QUERY_CACHE_TTL = float(os.getenv('RAG_QUERY_CACHE_TTL')) if os.getenv('RAG_QUERY_CACHE_TTL') else None
+
+# PDF extraction: documents with at least PDF_PARALLEL_MIN_PAGES pages are split
+# across PDF_EXTRACTION_WORKERS processes (1 disables the process pool)
+PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', '1'))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '100'))
+
+# Clause analysis: batches of clauses are analyzed serially ('serial'), on a thread pool ('thread')
+# or on a process pool ('process') of ANALYSIS_WORKERS workers (1 analyzes serially)
+ANALYSIS_EXECUTOR = os.getenv('ANALYSIS_EXECUTOR', 'serial')
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '1'))
+
+# Analysis jobs whose worker has not reported progress for ANALYSIS_JOB_LEASE seconds are requeued;
+# a job is run at most ANALYSIS_MAX_ATTEMPTS times, and a document gets no new job after that many failures
+ANALYSIS_JOB_LEASE = float(os.getenv('ANALYSIS_JOB_LEASE', '600'))
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv('ANALYSIS_MAX_ATTEMPTS', '3'))
+
+# Rows per INSERT when clauses and clause analyses are bulk-created
+ANALYSIS_BULK_BATCH_SIZE = int(os.getenv('ANALYSIS_BULK_BATCH_SIZE', '500'))
+
+# Trained risk model artifacts, written by "python manage.py train_risk_model"
+RISK_MODEL_DIR = os.getenv('RISK_MODEL_DIR', os.path.join(BASE_DIR, 'data', 'risk_model'))
+
+# How a transformer risk model is run: 'eager' (PyTorch), 'quantized' (dynamic int8)
+# or 'onnx' (ONNX Runtime; needs the onnx and onnxruntime packages)
+RISK_INFERENCE_BACKEND = os.getenv('RISK_INFERENCE_BACKEND', 'eager')
+
+# AI engines (risk, rag, llm) are built on first use; engines listed here, comma-separated,
+# are built when a web or analysis worker starts instead ('all' for every engine)
+PRELOAD_ENGINES = [name.strip() for name in os.getenv('PRELOAD_ENGINES', '').split(',') if name.strip()]
@@ -13,6 +13,7 @@ urlpatterns = [
     path('', include('user_auth.urls')),
     # API URLs
     path('api/', include('document_analyzer.urls', namespace='document_analyzer_api')),
+    path('api/rag/', include('rag_pipeline.urls', namespace='rag_pipeline')),
     # Main app URLs
     path('', RedirectView.as_view(url='document_analyzer/', permanent=True)),
     path('document_analyzer/', include('document_analyzer.urls', namespace='document_analyzer')),
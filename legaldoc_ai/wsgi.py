@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'legaldoc_ai.settings')
 
 application = get_wsgi_application()
+
+# Build the engines listed in PRELOAD_ENGINES now rather than on the first request
+from legaldoc_ai.lazy import preload_engines  # noqa: E402
+
+preload_engines()
@@ -0,0 +1,168 @@
+import os
+import json
+import hashlib
+import threading
+from typing import List, Dict, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from legaldoc_ai.lru_cache import LRUCache
+from .vector_store import file_lock
+
+
+def text_sha256(text: str) -> str:
+	return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+	"""Content-addressed embedding store shared by every process on the host.
+
+	Each embedding model gets its own directory holding:
+		vectors.f32  - append-only float32 rows, read through a read-only memmap
+		keys.txt     - one chunk hash per line; line N is row N of vectors.f32
+		meta.json    - model name and embedding dimension
+
+	Writers append under a file lock (vectors first, then keys), so readers never
+	see a key before its row exists and never need the lock themselves.
+	"""
+
+	def __init__(self, cache_dir: str, model_name: str):
+		self.model_name = model_name
+		self.cache_dir = os.path.join(cache_dir, hashlib.sha1(model_name.encode('utf-8')).hexdigest()[:16])
+		self.vectors_path = os.path.join(self.cache_dir, 'vectors.f32')
+		self.keys_path = os.path.join(self.cache_dir, 'keys.txt')
+		self.meta_path = os.path.join(self.cache_dir, 'meta.json')
+		self.lock_path = os.path.join(self.cache_dir, '.lock')
+		self.dim: Optional[int] = None
+		self._rows: Dict[str, int] = {}
+		self._row_count = 0
+		self._keys_offset = 0
+		self._vectors = None
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		with self._lock:
+			self._refresh()
+			return len(self._rows)
+
+	def _refresh(self):
+		"""Pick up rows appended by other processes since the last read."""
+		try:
+			size = os.path.getsize(self.keys_path)
+		except OSError:
+			return
+		if size <= self._keys_offset:
+			return
+		if self.dim is None:
+			with open(self.meta_path, 'r', encoding='utf-8') as f:
+				self.dim = json.load(f)['dim']
+		with open(self.keys_path, 'rb') as f:
+			f.seek(self._keys_offset)
+			data = f.read(size - self._keys_offset)
+		# Ignore a trailing line that is still being written
+		complete = data[:data.rfind(b'\n') + 1]
+		for line in complete.splitlines():
+			self._rows.setdefault(line.decode('ascii'), self._row_count)
+			self._row_count += 1
+		self._keys_offset += len(complete)
+		if self._row_count:
+			self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(self._row_count, self.dim))
+
+	def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+		"""Return the cached vectors for whichever of keys are present."""
+		with self._lock:
+			self._refresh()
+			found = {}
+			for key in keys:
+				row = self._rows.get(key)
+				if row is not None:
+					found[key] = self._vectors[row].tolist()
+			return found
+
+	def put_many(self, keys: List[str], vectors: List[List[float]]):
+		"""Append vectors for keys that are not cached yet."""
+		if not keys:
+			return
+		array = np.asarray(vectors, dtype=np.float32)
+		os.makedirs(self.cache_dir, exist_ok=True)
+		with self._lock, file_lock(self.lock_path):
+			self._refresh()
+			if self.dim is None:
+				self.dim = int(array.shape[1])
+				with open(self.meta_path, 'w', encoding='utf-8') as f:
+					json.dump({'model_name': self.model_name, 'dim': self.dim}, f)
+			if array.shape[1] != self.dim:
+				return
+			new_rows = {}
+			for key, vector in zip(keys, array):
+				if key not in self._rows and key not in new_rows:
+					new_rows[key] = vector
+			if not new_rows:
+				return
+			with open(self.vectors_path, 'ab') as f:
+				# Drop rows left behind by a writer that died before appending its keys
+				f.truncate(self._row_count * self.dim * 4)
+				f.write(np.stack(list(new_rows.values())).tobytes())
+			with open(self.keys_path, 'a', encoding='ascii') as f:
+				f.write(''.join(f"{key}\n" for key in new_rows))
+			self._refresh()
+
+
+class QueryEmbeddingCache:
+	"""In-memory LRU of query embeddings, with the get_many/put_many interface of EmbeddingCache.
+	Queries are rarely repeated across documents, so they are kept out of the persistent cache.
+	"""
+
+	def __init__(self, maxsize: int):
+		self.entries = LRUCache(maxsize=maxsize)
+
+	def __len__(self) -> int:
+		return self.entries.stats()['size']
+
+	def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+		found = {}
+		for key in keys:
+			vector = self.entries.get(key)
+			if vector is not None:
+				found[key] = vector
+		return found
+
+	def put_many(self, keys: List[str], vectors: List[List[float]]):
+		for key, vector in zip(keys, vectors):
+			self.entries.set(key, vector)
+
+
+class CachedEmbeddings(Embeddings):
+	"""Embeddings wrapper that checks the shared EmbeddingCache before running the model.
+
+	Only documents (knowledge base chunks) are written to the shared cache; queries go through
+	a bounded in-memory LRU of query_cache_size entries.
+	"""
+
+	def __init__(self, underlying: Embeddings, cache: EmbeddingCache, query_cache_size: int = 1024):
+		self.underlying = underlying
+		self.cache = cache
+		self.query_cache = QueryEmbeddingCache(query_cache_size)
+
+	def _embed(self, texts: List[str], embed_fn, cache) -> List[List[float]]:
+		keys = [text_sha256(text) for text in texts]
+		found = cache.get_many(keys)
+		missing = {}
+		for key, text in zip(keys, texts):
+			if key not in found:
+				missing.setdefault(key, text)
+		if missing:
+			# Round through float32 so fresh and cached vectors are bit-identical
+			vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32).tolist()
+			cache.put_many(list(missing.keys()), vectors)
+			found.update(zip(missing.keys(), vectors))
+		return [found[key] for key in keys]
+
+	def embed_documents(self, texts: List[str]) -> List[List[float]]:
+		return self._embed(texts, self.underlying.embed_documents, self.cache)
+
+	def embed_queries(self, texts: List[str]) -> List[List[float]]:
+		"""Embed many queries in one batch; the embedding models used here encode queries like documents."""
+		return self._embed(texts, self.underlying.embed_documents, self.query_cache)
+
+	def embed_query(self, text: str) -> List[float]:
+		return self._embed([text], lambda texts: [self.underlying.embed_query(texts[0])], self.query_cache)[0]
@@ -1,13 +1,19 @@
 import os
 import sys
+import json
+import hashlib
+import numpy as np
 from typing import List, Dict, Any
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import TextLoader
 from langchain.schema import Document
 from django.conf import settings
-import pdfplumber
+from legaldoc_ai.lazy import LazyEngine
+from legaldoc_ai.lru_cache import LRUCache
+from document_analyzer.page_extraction import extract_pdf_text
+from .vector_store import VectorIndexStore, file_sha256, chunk_ids_for
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
 
 # Check if we're running migrations
 RUNNING_MIGRATIONS = 'makemigrations' in sys.argv or 'migrate' in sys.argv
@@ -15,15 +21,23 @@ RUNNING_MIGRATIONS = 'makemigrations' in sys.argv or 'migrate' in sys.argv
 class RAGProcessor:
 	"""Class for Retrieval-Augmented Generation on legal documents."""
 	
-	def __init__(self, model_name: str = None):
+	def __init__(self, model_name: str = None, embeddings=None, index_dir: str = None, embedding_cache_dir: str = None):
 		"""Initialize the RAG processor with the specified embedding model."""
 		# Get embedding model from settings or use default
 		self.model_name = model_name or settings.EMBEDDING_MODEL
-		self.embeddings = None
+		self.embeddings = embeddings
 		self.vector_store = None
+		# Stamp of the indexed knowledge base; changes whenever the index is rebuilt
+		self.kb_version = None
+		self.query_cache = LRUCache(
+			maxsize=settings.RAG_QUERY_CACHE_SIZE,
+			ttl=settings.RAG_QUERY_CACHE_TTL
+		)
+		self.chunk_size = 1200
+		self.chunk_overlap = 200
 		self.text_splitter = RecursiveCharacterTextSplitter(
-			chunk_size=1200,
-			chunk_overlap=200
+			chunk_size=self.chunk_size,
+			chunk_overlap=self.chunk_overlap
 		)
 		
 		# Directories containing legal knowledge base documents
@@ -33,14 +47,27 @@ class RAGProcessor:
 			os.path.join(base_dir, 'data', 'legal_cases'),
 		]
 		
+		# Persisted vector index, updated incrementally from the knowledge base files
+		self.index_store = VectorIndexStore(index_dir or settings.RAG_INDEX_DIR)
+		
 		# Only initialize embeddings if not running migrations
-		if not RUNNING_MIGRATIONS:
+		if self.embeddings is None and not RUNNING_MIGRATIONS:
 			try:
+				from langchain_huggingface import HuggingFaceEmbeddings
 				self.embeddings = HuggingFaceEmbeddings(model_name=self.model_name)
 			except Exception as e:
 				print(f"Error initializing embeddings: {e}")
 				print("RAG functionality will be limited.")
 		
+		# Share computed embeddings with every other worker through the on-disk cache
+		cache_dir = embedding_cache_dir or settings.RAG_EMBEDDING_CACHE_DIR
+		if self.embeddings is not None and cache_dir:
+			self.embeddings = CachedEmbeddings(
+				self.embeddings,
+				EmbeddingCache(cache_dir, self.model_name),
+				query_cache_size=settings.RAG_QUERY_EMBEDDING_CACHE_SIZE
+			)
+		
 	def _ensure_dirs(self):
 		for d in self.knowledge_base_dirs:
 			os.makedirs(d, exist_ok=True)
@@ -52,13 +79,9 @@ class RAGProcessor:
 	def _load_pdf(self, file_path: str) -> List[Document]:
 		texts: List[Document] = []
 		try:
-			with pdfplumber.open(file_path) as pdf:
-				content_parts: List[str] = []
-				for page in pdf.pages:
-					content_parts.append(page.extract_text() or '')
-				full_text = "\n\n".join(content_parts).strip()
-				if full_text:
-					texts.append(Document(page_content=full_text, metadata={"source": file_path}))
+			full_text = extract_pdf_text(file_path, separator="\n\n").strip()
+			if full_text:
+				texts.append(Document(page_content=full_text, metadata={"source": file_path}))
 		except Exception as e:
 			print(f"Error loading PDF {file_path}: {e}")
 		return texts
@@ -98,9 +121,113 @@ A provision that limits the amount one party can be required to pay if there is
 """
 				)
 	
+	def _load_file(self, file_path: str) -> List[Document]:
+		lower = file_path.lower()
+		if lower.endswith('.txt') or lower.endswith('.md'):
+			return self._load_txt_md(file_path)
+		if lower.endswith('.pdf'):
+			return self._load_pdf(file_path)
+		return []
+	
+	def _scan_sources(self, search_dirs: List[str]) -> Dict[str, Dict[str, Any]]:
+		"""Collect the knowledge base files with their mtime and size."""
+		sources = {}
+		for directory in search_dirs:
+			if not os.path.exists(directory):
+				continue
+			for root, _, files in os.walk(directory):
+				for name in files:
+					lower = name.lower()
+					if lower.endswith(('.txt', '.md', '.pdf')):
+						file_path = os.path.join(root, name)
+						stat = os.stat(file_path)
+						sources[file_path] = {'mtime': stat.st_mtime, 'size': stat.st_size}
+		return sources
+	
+	def _chunk_file(self, file_path: str):
+		"""Load and split one source file, returning its chunks and their docstore ids."""
+		chunks = self.text_splitter.split_documents(self._load_file(file_path))
+		return chunks, chunk_ids_for(file_path, len(chunks))
+	
+	def _manifest_settings(self) -> Dict[str, Any]:
+		return {
+			'embedding_model': self.model_name,
+			'chunk_size': self.chunk_size,
+			'chunk_overlap': self.chunk_overlap,
+		}
+	
+	def _diff_sources(self, sources: Dict[str, Dict[str, Any]], manifest: Dict[str, Any]):
+		"""Compare the files on disk to the manifest.
+		Returns (file entries for the new manifest, changed or new paths, removed paths).
+		Content hashes are only computed for files whose mtime or size moved.
+		"""
+		previous = manifest.get('files', {})
+		files = {}
+		changed = []
+		for path, stat in sources.items():
+			entry = previous.get(path)
+			if entry and entry['mtime'] == stat['mtime'] and entry['size'] == stat['size']:
+				files[path] = entry
+				continue
+			sha256 = file_sha256(path)
+			if entry and entry['sha256'] == sha256:
+				# Touched but not modified: keep the existing vectors
+				files[path] = dict(entry, mtime=stat['mtime'], size=stat['size'])
+				continue
+			files[path] = dict(stat, sha256=sha256, ids=[])
+			changed.append(path)
+		removed = [path for path in previous if path not in sources]
+		return files, changed, removed
+	
+	def _build_index(self, sources: Dict[str, Dict[str, Any]]):
+		"""Embed every source file into a fresh vector store and persist it."""
+		texts: List[Document] = []
+		ids: List[str] = []
+		files = {}
+		for path, stat in sources.items():
+			chunks, chunk_ids = self._chunk_file(path)
+			texts.extend(chunks)
+			ids.extend(chunk_ids)
+			files[path] = dict(stat, sha256=file_sha256(path), ids=chunk_ids)
+		if not texts:
+			return None
+		vector_store = FAISS.from_documents(texts, self.embeddings, ids=ids)
+		self.index_store.save(vector_store, dict(self._manifest_settings(), files=files))
+		return vector_store
+	
+	def _update_index(self, manifest: Dict[str, Any], files: Dict[str, Dict[str, Any]], changed: List[str], removed: List[str]):
+		"""Apply changed and removed source files to the persisted vector store."""
+		vector_store = self.index_store.load(self.embeddings, mmap=False)
+		previous = manifest['files']
+		stale_ids = []
+		for path in changed + removed:
+			stale_ids.extend(previous.get(path, {}).get('ids', []))
+		if stale_ids:
+			vector_store.delete(stale_ids)
+		for path in changed:
+			chunks, chunk_ids = self._chunk_file(path)
+			if chunks:
+				vector_store.add_documents(chunks, ids=chunk_ids)
+			files[path]['ids'] = chunk_ids
+		self.index_store.save(vector_store, dict(self._manifest_settings(), files=files))
+		return vector_store
+	
+	def _set_kb_version(self, manifest: Dict[str, Any]):
+		"""Derive the knowledge base version from the manifest and drop cached results of older versions."""
+		files = manifest.get('files', {})
+		stamp = json.dumps({
+			'settings': self._manifest_settings(),
+			'files': sorted((path, entry['sha256']) for path, entry in files.items()),
+		})
+		version = hashlib.sha1(stamp.encode('utf-8')).hexdigest()
+		if version != self.kb_version:
+			self.query_cache.clear()
+			self.kb_version = version
+	
 	def load_knowledge_base(self, extra_dirs: List[str] | None = None):
 		"""Load the legal knowledge base into the vector store.
 		Optionally include additional directories (absolute or relative) containing .txt, .md, .pdf files.
+		The index is persisted to disk and only new, changed or deleted files are re-embedded on later loads.
 		"""
 		if RUNNING_MIGRATIONS:
 			return None
@@ -109,64 +236,132 @@ A provision that limits the amount one party can be required to pay if there is
 			return None
 		
 		self._ensure_dirs()
-		documents: List[Document] = []
 		search_dirs = list(self.knowledge_base_dirs)
 		if extra_dirs:
 			for d in extra_dirs:
 				search_dirs.append(os.path.abspath(d))
 		
-		for directory in search_dirs:
-			if not os.path.exists(directory):
-				continue
-			for root, _, files in os.walk(directory):
-				for name in files:
-					file_path = os.path.join(root, name)
-					lower = name.lower()
-					if lower.endswith('.txt') or lower.endswith('.md'):
-						documents.extend(self._load_txt_md(file_path))
-					elif lower.endswith('.pdf'):
-						documents.extend(self._load_pdf(file_path))
+		sources = self._scan_sources(search_dirs)
 		
 		# If no documents found, create a minimal knowledge base and try again
-		if not documents:
+		if not sources:
 			print("No knowledge base documents found. Creating minimal knowledge base.")
 			self._create_minimal_knowledge_base()
 			return self.load_knowledge_base(extra_dirs)
 		
-		# Split documents into chunks and build vector store
-		texts = self.text_splitter.split_documents(documents)
-		self.vector_store = FAISS.from_documents(texts, self.embeddings)
+		with self.index_store.lock():
+			manifest = self.index_store.load_manifest()
+			if manifest is None or any(manifest.get(k) != v for k, v in self._manifest_settings().items()):
+				self.vector_store = self._build_index(sources)
+				self._set_kb_version(self.index_store.load_manifest() or {})
+				return self.vector_store
+			
+			files, changed, removed = self._diff_sources(sources, manifest)
+			if changed or removed:
+				self.vector_store = self._update_index(manifest, files, changed, removed)
+			else:
+				if files != manifest['files']:
+					self.index_store.save_manifest(dict(manifest, files=files))
+				self.vector_store = self.index_store.load(self.embeddings)
+			self._set_kb_version({'files': files})
 		return self.vector_store
 	
+	def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+		"""Embed all queries in one batch.
+		The sentence-transformer embeddings used here encode queries and documents identically.
+		"""
+		if isinstance(self.embeddings, CachedEmbeddings):
+			return self.embeddings.embed_queries(queries)
+		return self.embeddings.embed_documents(queries)
+	
+	def retrieve_contexts(self, queries: List[str], top_k: int = 5) -> List[List[Document]]:
+		"""Retrieve relevant context for many queries with one batched embedding and one index search."""
+		if RUNNING_MIGRATIONS or not queries:
+			return [[] for _ in queries]
+		if self.vector_store is None:
+			self.load_knowledge_base()
+		if self.vector_store is None:
+			return [[] for _ in queries]
+		vectors = np.asarray(self._embed_queries(queries), dtype=np.float32)
+		_, indices = self.vector_store.index.search(vectors, top_k)
+		results = []
+		for row in indices:
+			docs = []
+			for i in row:
+				# FAISS pads with -1 when the index holds fewer than top_k vectors
+				if i == -1:
+					continue
+				doc_id = self.vector_store.index_to_docstore_id[i]
+				docs.append(self.vector_store.docstore.search(doc_id))
+			results.append(docs)
+		return results
+	
 	def retrieve_context(self, query: str, top_k: int = 5) -> List[Document]:
 		"""Retrieve relevant context from the knowledge base for a given query."""
+		return self.retrieve_contexts([query], top_k)[0]
+	
+	@staticmethod
+	def _normalize_query(clause_text: str) -> str:
+		"""Build the retrieval query for a clause: its first 200 characters with whitespace collapsed."""
+		return " ".join(clause_text[:200].split())
+	
+	def get_legal_contexts(self, clause_texts: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
+		"""Get legal context for many clauses at once.
+		Results are cached per (normalized query, top_k, knowledge base version); only misses are retrieved.
+		"""
 		if RUNNING_MIGRATIONS:
-			return []
+			return [{'sources': [], 'relevant_info': []} for _ in clause_texts]
 		if self.vector_store is None:
 			self.load_knowledge_base()
-		if self.vector_store is None:
-			return []
-		retriever = self.vector_store.as_retriever(search_kwargs={"k": top_k})
-		return retriever.invoke(query)
+		
+		queries = [self._normalize_query(clause_text) for clause_text in clause_texts]
+		results = {}
+		missing = []
+		for query in queries:
+			if query in results:
+				continue
+			cached = self.query_cache.get((query, top_k, self.kb_version))
+			if cached is None:
+				missing.append(query)
+				results[query] = None
+			else:
+				results[query] = cached
+		
+		for query, context_docs in zip(missing, self.retrieve_contexts(missing, top_k)):
+			cached = (
+				tuple(doc.metadata.get('source', 'Unknown source') for doc in context_docs),
+				tuple(doc.page_content for doc in context_docs),
+			)
+			if self.vector_store is not None:
+				self.query_cache.set((query, top_k, self.kb_version), cached)
+			results[query] = cached
+		
+		return [
+			{'sources': list(results[query][0]), 'relevant_info': list(results[query][1])}
+			for query in queries
+		]
 	
-	def get_legal_context(self, clause_text: str) -> Dict[str, Any]:
+	def get_legal_context(self, clause_text: str, top_k: int = 5) -> Dict[str, Any]:
 		"""Get legal context for a specific clause."""
-		if RUNNING_MIGRATIONS:
-			return {'sources': [], 'relevant_info': []}
-		query = clause_text[:200]
-		context_docs = self.retrieve_context(query)
-		context = {
-			'sources': [],
-			'relevant_info': []
-		}
-		for doc in context_docs:
-			context['sources'].append(doc.metadata.get('source', 'Unknown source'))
-			context['relevant_info'].append(doc.page_content)
-		return context
+		return self.get_legal_contexts([clause_text], top_k)[0]
 
-# Initialize a global RAG processor instance
-rag_processor = RAGProcessor()
+# Global RAG processor, built on first use; warming it up also loads the knowledge base index
+rag_processor = LazyEngine(RAGProcessor, 'RAG processor', warmup=lambda processor: processor.load_knowledge_base())
 
-def get_legal_context_for_clause(clause_text: str) -> Dict[str, Any]:
+def get_legal_context_for_clause(clause_text: str, top_k: int = 5) -> Dict[str, Any]:
 	"""Get legal context for a clause using the RAG processor."""
-	return rag_processor.get_legal_context(clause_text) 
\ No newline at end of file
+	return rag_processor.get_legal_context(clause_text, top_k)
+
+def get_legal_context_for_clauses(clause_texts: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
+	"""Get legal context for a batch of clauses using the RAG processor."""
+	return rag_processor.get_legal_contexts(clause_texts, top_k)
+
+def get_query_cache_stats() -> Dict[str, Any]:
+	"""Hit/miss counters of the RAG query-result cache.
+	Does not build the RAG processor: before its first use the counters are empty.
+	"""
+	if not rag_processor.loaded:
+		empty = LRUCache(maxsize=settings.RAG_QUERY_CACHE_SIZE, ttl=settings.RAG_QUERY_CACHE_TTL)
+		return dict(empty.stats(), kb_version=None, loaded=False)
+	processor = rag_processor.get()
+	return dict(processor.query_cache.stats(), kb_version=processor.kb_version, loaded=True)
@@ -1,3 +1,249 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from unittest import mock, skipUnless
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from legaldoc_ai.lru_cache import LRUCache
 
-# Create your tests here.
+from .rag_processor import RAGProcessor, rag_processor
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+	"""Deterministic fake embeddings that record which texts were embedded."""
+
+	embedded: list = []
+
+	def embed_documents(self, texts):
+		self.embedded.extend(texts)
+		return super().embed_documents(texts)
+
+
+class RAGTestMixin:
+	"""Builds RAG processors over a temporary knowledge base and index directory."""
+
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+		self.kb_dir = os.path.join(self.tmp_dir, 'kb')
+		self.index_dir = os.path.join(self.tmp_dir, 'index')
+		self.cache_dir = os.path.join(self.tmp_dir, 'embedding_cache')
+		os.makedirs(self.kb_dir)
+		self.write_file('termination.txt', 'Either party may terminate this agreement with 30 days notice.')
+		self.write_file('indemnity.md', 'The supplier shall indemnify the customer against third party claims.')
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+
+	def write_file(self, name, content):
+		with open(os.path.join(self.kb_dir, name), 'w', encoding='utf-8') as f:
+			f.write(content)
+
+	def make_processor(self, index_dir=None):
+		self.counting = CountingEmbeddings(size=16, embedded=[])
+		processor = RAGProcessor(
+			model_name='fake',
+			embeddings=self.counting,
+			index_dir=index_dir or self.index_dir,
+			embedding_cache_dir=self.cache_dir
+		)
+		processor.knowledge_base_dirs = [self.kb_dir]
+		return processor
+
+
+class PersistentIndexTests(RAGTestMixin, SimpleTestCase):
+	"""Tests for the on-disk FAISS index and incremental rebuilds."""
+
+	def test_index_is_persisted_and_reused(self):
+		"""A second processor loads the saved index without re-embedding anything."""
+		first = self.make_processor()
+		first.load_knowledge_base()
+		self.assertEqual(len(self.counting.embedded), 2)
+
+		second = self.make_processor()
+		second.load_knowledge_base()
+		self.assertEqual(self.counting.embedded, [])
+		self.assertEqual(second.vector_store.index.ntotal, 2)
+		self.assertEqual(
+			[d.page_content for d in first.retrieve_context('terminate', top_k=2)],
+			[d.page_content for d in second.retrieve_context('terminate', top_k=2)]
+		)
+
+	def test_only_changed_files_are_reembedded(self):
+		"""Changed and new files are re-embedded, deleted files lose their vectors."""
+		self.make_processor().load_knowledge_base()
+
+		self.write_file('termination.txt', 'Either party may terminate this agreement immediately.')
+		self.write_file('notices.txt', 'Notices must be sent in writing.')
+		os.remove(os.path.join(self.kb_dir, 'indemnity.md'))
+
+		processor = self.make_processor()
+		processor.load_knowledge_base()
+		self.assertEqual(sorted(self.counting.embedded), [
+			'Either party may terminate this agreement immediately.',
+			'Notices must be sent in writing.',
+		])
+		contents = {d.page_content for d in processor.retrieve_context('agreement', top_k=10)}
+		self.assertEqual(contents, {
+			'Either party may terminate this agreement immediately.',
+			'Notices must be sent in writing.',
+		})
+
+
+class EmbeddingCacheTests(RAGTestMixin, SimpleTestCase):
+	"""Tests for the shared content-addressed embedding cache."""
+
+	def test_rebuild_reads_embeddings_from_cache(self):
+		"""A fresh index built by another worker reuses cached chunk embeddings."""
+		self.make_processor().load_knowledge_base()
+		processor = self.make_processor(index_dir=os.path.join(self.tmp_dir, 'other_index'))
+		processor.load_knowledge_base()
+		self.assertEqual(self.counting.embedded, [])
+		self.assertEqual(processor.vector_store.index.ntotal, 2)
+
+	def test_cache_is_shared_between_instances(self):
+		"""Vectors written through one cache instance are visible to another."""
+		underlying = CountingEmbeddings(size=8, embedded=[])
+		writer = CachedEmbeddings(underlying, EmbeddingCache(self.cache_dir, 'fake'))
+		vectors = writer.embed_documents(['alpha', 'beta', 'alpha'])
+		self.assertEqual(underlying.embedded, ['alpha', 'beta'])
+
+		reader = CachedEmbeddings(underlying, EmbeddingCache(self.cache_dir, 'fake'))
+		self.assertEqual(reader.embed_documents(['beta', 'alpha']), [vectors[1], vectors[0]])
+		self.assertEqual(underlying.embedded, ['alpha', 'beta'])
+		self.assertEqual(len(EmbeddingCache(self.cache_dir, 'other-model')), 0)
+
+	def test_query_embeddings_are_not_persisted(self):
+		"""Query embeddings stay in a bounded in-memory LRU and never reach the shared cache."""
+		underlying = CountingEmbeddings(size=8, embedded=[])
+		embeddings = CachedEmbeddings(underlying, EmbeddingCache(self.cache_dir, 'fake'), query_cache_size=2)
+		embeddings.embed_documents(['chunk'])
+		first = embeddings.embed_queries(['q1', 'q2'])
+		self.assertEqual(embeddings.embed_queries(['q2', 'q1']), [first[1], first[0]])
+		self.assertEqual(underlying.embedded, ['chunk', 'q1', 'q2'])
+		embeddings.embed_query('q3')
+		self.assertEqual(len(embeddings.query_cache), 2)
+		self.assertEqual(len(EmbeddingCache(self.cache_dir, 'fake')), 1)
+
+
+class BatchedRetrievalTests(RAGTestMixin, SimpleTestCase):
+	"""Tests for multi-clause retrieval."""
+
+	def test_batch_matches_per_query_search(self):
+		"""get_legal_contexts returns what a per-query FAISS similarity_search returns, on the batched BLAS path."""
+		for i in range(30):
+			self.write_file(f'kb_{i}.txt', f'Knowledge base entry {i} about clause topic number {i * 7}.')
+		processor = self.make_processor()
+		processor.load_knowledge_base()
+		# FAISS switches from its per-query loop to a BLAS matrix product at 20 queries
+		clauses = [f'Clause {i}: the parties agree to term {i} of  this\nagreement.' for i in range(25)]
+		batched = processor.get_legal_contexts(clauses, top_k=3)
+
+		expected = []
+		for clause in clauses:
+			docs = processor.vector_store.similarity_search(processor._normalize_query(clause), k=3)
+			expected.append({
+				'sources': [doc.metadata.get('source', 'Unknown source') for doc in docs],
+				'relevant_info': [doc.page_content for doc in docs],
+			})
+		self.assertEqual(batched, expected)
+		self.assertTrue(all(len(c['sources']) == 3 for c in batched))
+
+	def test_batched_query_vectors_match_embed_query(self):
+		"""Queries embedded as one batch get the same vectors as embedding them one by one."""
+		processor = self.make_processor()
+		queries = [f'query number {i}' for i in range(25)]
+		# The embedding cache stores float32, which is also what the index is searched with
+		np.testing.assert_array_equal(
+			np.asarray(processor._embed_queries(queries), dtype=np.float32),
+			np.asarray([processor.embeddings.underlying.embed_query(query) for query in queries], dtype=np.float32)
+		)
+
+	@skipUnless(settings.EMBEDDING_MODEL, 'EMBEDDING_MODEL is not configured')
+	def test_configured_model_encodes_queries_like_documents(self):
+		"""The configured embedding model gives a batch of queries the vectors embed_query gives each of them."""
+		try:
+			from langchain_huggingface import HuggingFaceEmbeddings
+			embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
+		except Exception as e:
+			self.skipTest(f'embedding model is not available: {e}')
+		processor = self.make_processor()
+		processor.embeddings = embeddings
+		queries = ['Either party may terminate on notice.', 'The supplier shall indemnify the customer.', 'Notices']
+		batched = np.asarray(processor._embed_queries(queries))
+		single = np.asarray([embeddings.embed_query(query) for query in queries])
+		# Padding a batch to its longest query may change the float32 sums in the last bits
+		np.testing.assert_allclose(batched, single, rtol=0, atol=1e-5)
+
+	def test_batch_embeds_queries_once(self):
+		"""All queries are embedded in a single call."""
+		processor = self.make_processor()
+		processor.load_knowledge_base()
+		self.counting.embedded = []
+		processor.get_legal_contexts(['first clause', 'second clause', 'third clause'])
+		self.assertEqual(self.counting.embedded, ['first clause', 'second clause', 'third clause'])
+
+
+class QueryCacheTests(RAGTestMixin, SimpleTestCase):
+	"""Tests for the query-result LRU cache."""
+
+	def test_repeated_clauses_hit_the_cache(self):
+		"""Clauses with the same normalized query are retrieved only once."""
+		processor = self.make_processor()
+		first = processor.get_legal_context('Either party may terminate this agreement.')
+		self.counting.embedded = []
+		second = processor.get_legal_context('Either  party may\nterminate this agreement.')
+		self.assertEqual(first, second)
+		self.assertEqual(self.counting.embedded, [])
+		stats = processor.query_cache.stats()
+		self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+	def test_rebuilt_index_invalidates_cache(self):
+		"""A changed knowledge base gets a new version stamp and fresh results."""
+		processor = self.make_processor()
+		processor.get_legal_context('indemnify')
+		version = processor.kb_version
+
+		self.write_file('indemnity.md', 'The customer shall indemnify the supplier.')
+		processor.load_knowledge_base()
+		self.assertNotEqual(processor.kb_version, version)
+		context = processor.get_legal_context('indemnify', top_k=10)
+		self.assertIn('The customer shall indemnify the supplier.', context['relevant_info'])
+		self.assertEqual(processor.query_cache.stats()['hits'], 0)
+
+	def test_lru_eviction_and_ttl(self):
+		"""The cache is bounded and entries expire after the TTL."""
+		cache = LRUCache(maxsize=2)
+		cache.set('a', 1)
+		cache.set('b', 2)
+		cache.get('a')
+		cache.set('c', 3)
+		self.assertIsNone(cache.get('b'))
+		self.assertEqual(cache.get('a'), 1)
+		self.assertEqual(cache.stats()['evictions'], 1)
+
+		expiring = LRUCache(maxsize=2, ttl=0)
+		expiring.set('a', 1)
+		self.assertIsNone(expiring.get('a'))
+
+
+class CacheStatsViewTests(TestCase):
+	"""Tests for the RAG cache monitoring endpoint."""
+
+	def test_stats_do_not_build_the_engine(self):
+		"""Scraping the stats before any retrieval leaves the RAG processor unbuilt."""
+		admin = User.objects.create_user(username='admin', password='adminpassword', is_staff=True)
+		self.client.force_login(admin)
+		factory = mock.Mock(side_effect=AssertionError('RAG processor was built'))
+		with mock.patch.object(rag_processor, '_instance', None), mock.patch.object(rag_processor, '_factory', factory):
+			response = self.client.get(reverse('rag_pipeline:cache_stats'))
+			self.assertFalse(rag_processor.loaded)
+		factory.assert_not_called()
+		self.assertEqual(response.status_code, 200)
+		stats = response.data['query_cache']
+		self.assertFalse(stats['loaded'])
+		self.assertEqual((stats['hits'], stats['misses'], stats['size']), (0, 0, 0))
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'rag_pipeline'
+
+urlpatterns = [
+	path('stats/', views.cache_stats, name='cache_stats'),
+]
@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain.schema import Document
+
+try:
+	import fcntl
+except ImportError:  # Windows: fall back to unlocked writes
+	fcntl = None
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(file_path: str) -> str:
+	"""Return the SHA-256 hex digest of a file, read in chunks."""
+	digest = hashlib.sha256()
+	with open(file_path, 'rb') as f:
+		for block in iter(lambda: f.read(1024 * 1024), b''):
+			digest.update(block)
+	return digest.hexdigest()
+
+
+@contextmanager
+def file_lock(lock_path: str):
+	"""Hold an exclusive advisory lock on lock_path for the duration of the block."""
+	os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+	with open(lock_path, 'a') as lock_file:
+		if fcntl:
+			fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+		try:
+			yield
+		finally:
+			if fcntl:
+				fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _atomic_write_json(path: str, data: Any):
+	tmp_path = f"{path}.tmp"
+	with open(tmp_path, 'w', encoding='utf-8') as f:
+		json.dump(data, f)
+	os.replace(tmp_path, path)
+
+
+class VectorIndexStore:
+	"""On-disk FAISS index plus a manifest of the source files it was built from.
+
+	Layout of index_dir:
+		index.faiss    - raw FAISS index (memory-mapped on load)
+		docstore.json  - chunk texts/metadata and the FAISS row -> docstore id mapping
+		manifest.json  - embedding settings and per-file mtime, size, sha256 and chunk ids
+	"""
+
+	def __init__(self, index_dir: str):
+		self.index_dir = index_dir
+		self.index_path = os.path.join(index_dir, 'index.faiss')
+		self.docstore_path = os.path.join(index_dir, 'docstore.json')
+		self.manifest_path = os.path.join(index_dir, 'manifest.json')
+		self.lock_path = os.path.join(index_dir, '.lock')
+
+	def exists(self) -> bool:
+		return all(os.path.exists(p) for p in (self.index_path, self.docstore_path, self.manifest_path))
+
+	def lock(self):
+		return file_lock(self.lock_path)
+
+	def load_manifest(self) -> Optional[Dict[str, Any]]:
+		if not self.exists():
+			return None
+		try:
+			with open(self.manifest_path, 'r', encoding='utf-8') as f:
+				manifest = json.load(f)
+		except (OSError, ValueError):
+			return None
+		if manifest.get('version') != MANIFEST_VERSION:
+			return None
+		return manifest
+
+	def load(self, embeddings, mmap: bool = True) -> FAISS:
+		"""Load the persisted vector store. Memory-mapped by default so workers share pages."""
+		flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+		index = faiss.read_index(self.index_path, flags)
+		with open(self.docstore_path, 'r', encoding='utf-8') as f:
+			data = json.load(f)
+		docstore = InMemoryDocstore({
+			doc_id: Document(page_content=doc['page_content'], metadata=doc['metadata'])
+			for doc_id, doc in data['documents'].items()
+		})
+		index_to_docstore_id = dict(enumerate(data['index_to_docstore_id']))
+		return FAISS(
+			embedding_function=embeddings,
+			index=index,
+			docstore=docstore,
+			index_to_docstore_id=index_to_docstore_id
+		)
+
+	def save(self, vector_store: FAISS, manifest: Dict[str, Any]):
+		"""Persist the vector store and its manifest. The manifest is written last."""
+		os.makedirs(self.index_dir, exist_ok=True)
+		tmp_index_path = f"{self.index_path}.tmp"
+		faiss.write_index(vector_store.index, tmp_index_path)
+		os.replace(tmp_index_path, self.index_path)
+
+		index_to_docstore_id = [
+			vector_store.index_to_docstore_id[i] for i in range(len(vector_store.index_to_docstore_id))
+		]
+		documents = {}
+		for doc_id in index_to_docstore_id:
+			doc = vector_store.docstore.search(doc_id)
+			documents[doc_id] = {'page_content': doc.page_content, 'metadata': doc.metadata}
+		_atomic_write_json(self.docstore_path, {
+			'index_to_docstore_id': index_to_docstore_id,
+			'documents': documents
+		})
+
+		manifest = dict(manifest, version=MANIFEST_VERSION)
+		_atomic_write_json(self.manifest_path, manifest)
+
+	def save_manifest(self, manifest: Dict[str, Any]):
+		_atomic_write_json(self.manifest_path, dict(manifest, version=MANIFEST_VERSION))
+
+
+def chunk_ids_for(file_path: str, count: int) -> List[str]:
+	"""Stable docstore ids for the chunks of a source file."""
+	prefix = hashlib.sha1(file_path.encode('utf-8')).hexdigest()[:16]
+	return [f"{prefix}-{i}" for i in range(count)]
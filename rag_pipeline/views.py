@@ -1,3 +1,12 @@
-from django.shortcuts import render
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
-# Create your views here.
+from .rag_processor import get_query_cache_stats
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+	"""API endpoint exposing RAG cache counters for monitoring."""
+	return Response({'query_cache': get_query_cache_stats()})